@@ -5,11 +5,12 @@ import json
 import jwt as pyjwt
 from datetime import datetime, timedelta
 from functools import wraps
-from flask import Flask, request, jsonify, send_from_directory, g
+from flask import Flask, request, jsonify, send_from_directory, send_file, g, Response, stream_with_context
 from flask_cors import CORS
 from flask_security import Security, SQLAlchemyUserDatastore, hash_password
 from flask_mail import Mail
-from sqlalchemy import text
+from sqlalchemy import text, select
+from sqlalchemy.orm import lazyload
 from sqlalchemy.exc import IntegrityError, ProgrammingError, OperationalError
 
 # Load environment variables from .env file
@@ -21,19 +22,57 @@ try:
     from backend.models import (Project, Chapter, Scene, Character, WorldNode, User, Role,
                                   SceneNote, SceneTask, ChapterNote, ChapterTask, CharacterNote, CharacterTask,
                                   WorldNodeNote, WorldNodeTask)
-    from backend.word_parser import parse_word_document
+    from backend.word_import import import_word_project, run_import_job, ImportPool
     from backend.security_config import get_security_config
     from backend.console_mail import ConsoleMailBackend
     from backend.auto_migrate import auto_migrate
+    from backend import authz
+    from backend.principal_cache import Principal, cache_from_env, install_invalidation, start_pg_listener
+    from backend.scene_delta import content_revision, apply_ops, DeltaError
+    from backend.text_stats import derived_scene_fields
+    from backend.word_counts import apply_delta, apply_scene_counts, write_transaction
+    from backend.scene_entities import sync_scene_entities
+    from backend.scene_stream import SceneStreamParser, split_reply
+    from backend.jobs import (runner_from_env, pdf_runner_from_env, import_runner_from_env,
+                              mention_runner_from_env, JobLimitExceeded, JobQueueFull, JobAborted)
+    from backend.llm_client import client_from_env
+    from backend.response_cache import response_cache_from_env, cache_key
+    from backend import context_packer, prompt_prefix
+    from backend.write_buffer import buffer_from_env
+    from backend.manuscript import snapshot_connection, iter_manuscript_events
+    from backend import pdf_export
+    from backend.pdf_cache import fragment_cache_from_env
+    from backend.fieldsets import Field, FieldsetError, parse_fields, select_columns, render
+    from backend import search_index, mentions
 except ImportError:
     from extensions import db
     from models import (Project, Chapter, Scene, Character, WorldNode, User, Role,
                         SceneNote, SceneTask, ChapterNote, ChapterTask, CharacterNote, CharacterTask,
                         WorldNodeNote, WorldNodeTask)
-    from word_parser import parse_word_document
+    from word_import import import_word_project, run_import_job, ImportPool
     from security_config import get_security_config
     from console_mail import ConsoleMailBackend
     from auto_migrate import auto_migrate
+    import authz
+    from principal_cache import Principal, cache_from_env, install_invalidation, start_pg_listener
+    from scene_delta import content_revision, apply_ops, DeltaError
+    from text_stats import derived_scene_fields
+    from word_counts import apply_delta, apply_scene_counts, write_transaction
+    from scene_entities import sync_scene_entities
+    from scene_stream import SceneStreamParser, split_reply
+    from jobs import (runner_from_env, pdf_runner_from_env, import_runner_from_env,
+                      mention_runner_from_env, JobLimitExceeded, JobQueueFull, JobAborted)
+    from llm_client import client_from_env
+    from response_cache import response_cache_from_env, cache_key
+    import context_packer
+    import prompt_prefix
+    from write_buffer import buffer_from_env
+    from manuscript import snapshot_connection, iter_manuscript_events
+    import pdf_export
+    from pdf_cache import fragment_cache_from_env
+    from fieldsets import Field, FieldsetError, parse_fields, select_columns, render
+    import search_index
+    import mentions
 
 
 # ---------- DB URI helpers ----------
@@ -71,6 +110,17 @@ def _dumps(d: dict) -> str:
         return "{}"
 
 
+def _int_ids(values) -> set:
+    """IDs aus Client-Listen, nicht-numerische Einträge werden verworfen"""
+    ids = set()
+    for v in values or []:
+        try:
+            ids.add(int(v))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
 # ---------- App Factory ----------
 def create_app():
     app = Flask(__name__, static_folder="static", static_url_path="")
@@ -189,6 +239,51 @@ def create_app():
             except:
                 pass
 
+    # Principal-Cache: authentifizierte Requests lesen den User nicht bei jedem Call aus der DB
+    principal_cache = cache_from_env()
+    app.extensions["principal_cache"] = principal_cache
+    install_invalidation(principal_cache, db.session, User)
+    with app.app_context():
+        try:
+            start_pg_listener(db.engine, principal_cache)
+        except Exception as e:
+            print(f"WARNING: Principal cache listener not started: {e}")
+
+    # Write-Behind-Puffer für Szenen-Saves (optional, siehe write_buffer.py)
+    SCENE_BUFFER_COLUMNS = ("title", "content", "status", "context_manifest", "revision",
+                            "preview", "word_count", "char_count")
+
+    def _write_scene_updates(scene_id, updates, base_revision):
+        cols = [c for c in SCENE_BUFFER_COLUMNS if c in updates]
+        if not cols:
+            return True
+        params = {c: updates[c] for c in cols}
+        params["id"] = scene_id
+        params["base_revision"] = base_revision
+        with app.app_context():
+            with write_transaction(db.engine) as conn:
+                if "word_count" in updates:
+                    apply_scene_counts(conn, scene_id, updates["word_count"], updates.get("char_count"))
+                # Compare-and-Swap wie bei PATCH /content: hat ein anderer Worker
+                # die Szene inzwischen gespeichert, wird nichts geschrieben
+                result = conn.execute(text(f"""
+                    UPDATE scene
+                    SET {', '.join(f'{c} = :{c}' for c in cols)}, updated_at = CURRENT_TIMESTAMP
+                    WHERE id = :id AND (revision = :base_revision OR revision IS NULL)
+                """), params)
+                if result.rowcount != 1:
+                    conn.rollback()
+                    return False
+                if "content" in updates:
+                    mentions.index_scene(conn, scene_id, updates["content"])
+                if "context_manifest" in updates:
+                    sync_scene_entities(conn, scene_id, updates["context_manifest"])
+        return True
+
+    scene_write_buffer = buffer_from_env(_write_scene_updates)
+    app.extensions["scene_write_buffer"] = scene_write_buffer
+    scene_write_buffer.start()
+
     # ---------- SPA fallback (für Deep Links) - nur wenn Frontend existiert ----------
     @app.before_request
     def spa_fallback():
@@ -218,30 +313,33 @@ def create_app():
     def forbidden():          return ok({"error": "forbidden"}, 403)
 
     def verify_project_ownership(project_id, user_id):
-        """Prüft ob das Projekt dem User gehört"""
-        project = Project.query.filter_by(id=project_id, user_id=user_id).first()
-        return project
+        """Prüft ob das Projekt dem User gehört (nur IDs, keine ORM-Hydration)"""
+        return authz.owned(authz.project_access(db.session, project_id), user_id)
 
     def verify_chapter_ownership(chapter_id, user_id):
         """Prüft ob das Chapter dem User gehört (über project)"""
-        chapter = Chapter.query.get(chapter_id)
-        if not chapter:
-            return None
-        return chapter if verify_project_ownership(chapter.project_id, user_id) else None
+        return authz.owned(authz.chapter_access(db.session, chapter_id), user_id)
+
+    def verify_scene_ownership(scene_id, user_id):
+        """Prüft ob die Szene dem User gehört (über chapter -> project)"""
+        return authz.owned(authz.scene_access(db.session, scene_id), user_id)
 
     def verify_character_ownership(character_id, user_id):
         """Prüft ob der Character dem User gehört (über project)"""
-        character = Character.query.get(character_id)
-        if not character:
-            return None
-        return character if verify_project_ownership(character.project_id, user_id) else None
+        return authz.owned(authz.character_access(db.session, character_id), user_id)
 
     def verify_world_ownership(world_id, user_id):
         """Prüft ob das World-Element dem User gehört (über project)"""
-        world = WorldNode.query.get(world_id)
-        if not world:
-            return None
-        return world if verify_project_ownership(world.project_id, user_id) else None
+        return authz.owned(authz.worldnode_access(db.session, world_id), user_id)
+
+    def load_owned(model, ident):
+        """Lädt ein einzelnes Objekt ohne seine selectin-Relationships (Kapitel, Szenen, ...)"""
+        return db.session.get(model, ident, options=[lazyload("*")])
+
+    def load_owned_project(project_id, user_id):
+        """Lädt das Projekt des Users ohne Kapitel/Szenen/Charaktere/Welt mitzuladen"""
+        return (Project.query.options(lazyload("*"))
+                .filter_by(id=project_id, user_id=user_id).first())
 
     # ---------- JWT Helper (Custom JWT statt Flask-Security Token) ----------
     def generate_jwt_token(user_id):
@@ -268,15 +366,17 @@ def create_app():
             try:
                 payload = pyjwt.decode(token, app.config["SECRET_KEY"], algorithms=["HS256"])
                 user_id = payload["user_id"]
-                user = User.query.get(user_id)
-
-                if not user:
-                    return ok({"error": "User nicht gefunden"}, 401)
-
-                if not user.active:
+                principal = principal_cache.get(user_id)
+                if principal is None:
+                    user = db.session.get(User, user_id)
+                    if not user:
+                        return ok({"error": "User nicht gefunden"}, 401)
+                    principal = principal_cache.put(Principal.from_user(user))
+
+                if not principal.active:
                     return ok({"error": "Account deactivated"}, 401)
 
-                g.current_user = user
+                g.current_user = principal
 
             except pyjwt.ExpiredSignatureError:
                 return ok({"error": "Token expired"}, 401)
@@ -290,10 +390,15 @@ def create_app():
 
         return decorated_view
 
-    # Helper um current_user zu bekommen
+    # Helper um current_user zu bekommen (read-only Principal aus dem Cache)
     def get_current_user():
         return getattr(g, 'current_user', None)
 
+    def load_current_user():
+        """Lädt den aktuellen User als ORM-Objekt – nur für Routen, die ihn ändern"""
+        principal = get_current_user()
+        return db.session.get(User, principal.id) if principal else None
+
     # ---------- Health ----------
     @app.get("/api/health")
     def health():
@@ -581,7 +686,7 @@ def create_app():
     @token_auth_required
     def update_user_language():
         """Update user language preference"""
-        user = get_current_user()
+        user = load_current_user()
         data = request.get_json() or {}
         language = data.get("language", "en")
 
@@ -831,16 +936,187 @@ Sent from WriteHaven Feedback Form
             sys.stdout.flush()
             raise
 
+    # ---------- Sparse Fieldsets (?fields= / ?exclude=) ----------
+    def _iso(v): return v.isoformat() if v else None
+    def _json_obj(v): return _loads(v or "{}")
+    def _json_list(v): return _loads(v or "[]")
+
+    PROJECT_FIELDS = {
+        "id": Field(Project.id), "title": Field(Project.title),
+        "description": Field(Project.description), "author": Field(Project.author),
+        "genre": Field(Project.genre), "language": Field(Project.language),
+        "updated_at": Field(Project.updated_at, _iso),
+        "estimated_word_count": Field(Project.estimated_word_count),
+        "word_count": Field(Project.word_count), "char_count": Field(Project.char_count),
+        "import_status": Field(Project.import_status),
+    }
+    CHAPTER_FIELDS = {
+        "id": Field(Chapter.id), "project_id": Field(Chapter.project_id),
+        "title": Field(Chapter.title), "order_index": Field(Chapter.order_index),
+        "content": Field(Chapter.content),
+        "word_count": Field(Chapter.word_count), "char_count": Field(Chapter.char_count),
+    }
+    SCENE_FIELDS = {
+        "id": Field(Scene.id), "chapter_id": Field(Scene.chapter_id),
+        "title": Field(Scene.title), "order_index": Field(Scene.order_index),
+        "content": Field(Scene.content), "status": Field(Scene.status),
+        "context_manifest": Field(Scene.context_manifest, _json_obj),
+        "revision": Field(Scene.revision), "preview": Field(Scene.preview),
+        "word_count": Field(Scene.word_count), "char_count": Field(Scene.char_count),
+    }
+    CHARACTER_FIELDS = {
+        "id": Field(Character.id), "project_id": Field(Character.project_id),
+        "name": Field(Character.name), "summary": Field(Character.summary),
+        "avatar_url": Field(Character.avatar_url),
+        "gallery": Field(Character.gallery_json, _json_list),
+        "profile": Field(Character.profile_json, _json_obj),
+    }
+    WORLD_FIELDS = {
+        "id": Field(WorldNode.id), "project_id": Field(WorldNode.project_id),
+        "title": Field(WorldNode.title), "kind": Field(WorldNode.kind),
+        "summary": Field(WorldNode.summary), "icon": Field(WorldNode.icon),
+        "relations": Field(WorldNode.relations_json, _json_obj),
+        "regionId": Field(WorldNode.region_id),
+    }
+
+    def _note_fields(model, parent_key):
+        return {
+            "id": Field(model.id), parent_key: Field(getattr(model, parent_key)),
+            "title": Field(model.title), "content": Field(model.content),
+            "created_at": Field(model.created_at, _iso), "updated_at": Field(model.updated_at, _iso),
+        }
+
+    def _task_fields(model, parent_key):
+        return {
+            "id": Field(model.id), parent_key: Field(getattr(model, parent_key)),
+            "title": Field(model.title), "completed": Field(model.completed),
+            "created_at": Field(model.created_at, _iso), "updated_at": Field(model.updated_at, _iso),
+        }
+
+    def fetch_fields(spec, default, *criteria, order_by=()):
+        """SELECT nur der angeforderten Spalten -> Liste von Dicts"""
+        names = parse_fields(request.args, spec, default)
+        stmt = select(*select_columns(spec, names)).where(*criteria).order_by(*order_by)
+        return [render(row, spec, names) for row in db.session.execute(stmt).mappings()]
+
+    def fetch_one_fields(spec, default, *criteria):
+        rows = fetch_fields(spec, default, *criteria)
+        return rows[0] if rows else None
+
+    @app.errorhandler(FieldsetError)
+    def handle_fieldset_error(e):
+        return bad_request(str(e))
+
+    # ---------- Word-Import (optional im Hintergrund, siehe word_import.py / jobs.py) ----------
+    with app.app_context():
+        import_jobs = import_runner_from_env(db.engine)
+        import_db_url = db.engine.url.render_as_string(hide_password=False)
+    # IMPORT_JOB_PROCESSES=0: Import im Job-Thread statt in eigenen Prozessen
+    import_pool = ImportPool(int(os.getenv("IMPORT_JOB_PROCESSES", str(import_jobs.max_workers))))
+    app.extensions["import_jobs"] = import_jobs
+    app.extensions["import_pool"] = import_pool
+    import tempfile
+    import_spool_dir = os.getenv("IMPORT_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "writehaven-import")
+    IMPORT_SWEEP_GRACE = 300  # Sekunden Reserve nach der Job-Deadline, bevor aufgeräumt wird
+
+    def sweep_word_imports():
+        """
+        Reste abgestürzter Importe: alte Spool-Dateien und hängengebliebene
+        Projekte. Läuft beim Start und danach periodisch im Hintergrund – nur
+        für Importe, deren Job-Deadline (plus Reserve) sicher vorbei ist.
+        """
+        import time
+        age = import_jobs.timeout + IMPORT_SWEEP_GRACE
+        try:
+            cutoff = time.time() - age
+            with os.scandir(import_spool_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[WordImport] Spool-Verzeichnis nicht aufgeräumt: {e}", flush=True)
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text("""
+                    DELETE FROM project WHERE import_status = 'importing' AND created_at < :cutoff
+                """), {"cutoff": datetime.utcnow() - timedelta(seconds=age)})
+        except Exception as e:
+            print(f"[WordImport] Abgebrochene Importe nicht aufgeräumt: {e}", flush=True)
+
+    def _sweep_loop():
+        import time
+        while True:
+            time.sleep(max(import_jobs.timeout / 2, 60))
+            with app.app_context():
+                sweep_word_imports()
+
+    with app.app_context():
+        sweep_word_imports()
+    import threading
+    threading.Thread(target=_sweep_loop, name="word-import-sweep", daemon=True).start()
+
+    def submit_word_import(user_id, title, description, file):
+        """
+        Spoolt die Datei, legt das Projekt im Zustand 'importing' an und reiht
+        den Import ein. Gibt (Projekt, Job-ID) zurück.
+        """
+        import uuid
+        os.makedirs(import_spool_dir, exist_ok=True)
+        path = os.path.join(import_spool_dir, f"{uuid.uuid4().hex}.docx")
+        file.save(path)
+        p = Project(user_id=user_id, title=title, description=description, import_status="importing")
+        db.session.add(p)
+        db.session.commit()
+        pid = p.id
+        engine = db.engine
+
+        def job(progress):
+            try:
+                # Nur die Restzeit bis zur Job-Deadline (die Wartezeit in der Queue zählt mit)
+                stats = import_pool.run(run_import_job, import_db_url, progress.job_id, pid, path,
+                                        progress.interval, timeout=progress.remaining())
+            except JobAborted:
+                raise
+            except TimeoutError:
+                print(f"[WordImport] Import-Job für Projekt {pid} an der Deadline abgebrochen", flush=True)
+                return {"error": "import_timeout", "project_id": pid}, 504
+            except ValueError as e:
+                # Datei nicht lesbar (word_parser) – Fehler des Uploads
+                return {"error": f"Fehler beim Verarbeiten des Word-Dokuments: {str(e)}", "project_id": pid}, 400
+            except Exception:
+                import traceback
+                print(f"[WordImport] Import-Job für Projekt {pid} fehlgeschlagen", flush=True)
+                traceback.print_exc()
+                return {"error": "Word-Import fehlgeschlagen", "project_id": pid}, 500
+            print(f"[WordImport] Projekt {pid}: {stats['chapters']} Kapitel, {stats['scenes']} Szenen, "
+                  f"{stats['rows']} Zeilen in {stats['seconds']}s ({stats['rows_per_sec']} Zeilen/s)", flush=True)
+            return dict(stats, project_id=pid), 200
+
+        def cleanup():
+            """Spool-Datei löschen; ein nicht fertig importiertes Projekt wieder entfernen"""
+            if os.path.exists(path):
+                os.unlink(path)
+            with engine.begin() as conn:
+                conn.execute(text("DELETE FROM project WHERE id = :pid AND import_status = 'importing'"),
+                             {"pid": pid})
+
+        try:
+            job_id = import_jobs.submit(user_id, "word_import", job, with_progress=True, on_done=cleanup)
+        except (JobLimitExceeded, JobQueueFull):
+            cleanup()
+            raise
+        return p, job_id
+
     # ---------- Projects ----------
     @app.get("/api/projects")
     @token_auth_required
     def list_projects():
-        rows = (Project.query.filter_by(user_id=get_current_user().id)
-                .order_by(Project.updated_at.desc()).all()
-                if hasattr(Project, "updated_at")
-                else Project.query.filter_by(user_id=get_current_user().id)
-                .order_by(Project.id.desc()).all())
-        return ok([{"id": p.id, "title": p.title, "description": p.description} for p in rows])
+        order = Project.updated_at.desc() if hasattr(Project, "updated_at") else Project.id.desc()
+        return ok(fetch_fields(PROJECT_FIELDS, ("id", "title", "description", "estimated_word_count",
+                                                "word_count", "char_count", "import_status"),
+                               Project.user_id == get_current_user().id, order_by=(order,)))
 
     @app.post("/api/projects")
     @token_auth_required
@@ -851,50 +1127,46 @@ Sent from WriteHaven Feedback Form
             description = request.form.get("description", "")
             file = request.files.get("file")
 
+            user_id = get_current_user().id
+
+            # Word-Dokument mit ?async=1: Import als Job (202 + job_id), Fortschritt unter
+            # GET /api/jobs/<id> ("progress": paragraphs, chapters, scenes)
+            if file and file.filename and request_flag("async"):
+                try:
+                    p, job_id = submit_word_import(user_id, title, description, file)
+                except JobLimitExceeded:
+                    return ok({"error": "too_many_jobs"}, 429)
+                except JobQueueFull:
+                    return ok({"error": "job_queue_full"}, 503)
+                return ok({"id": p.id, "title": p.title, "description": p.description,
+                           "import_status": "importing", "job_id": job_id, "status": "queued"}, 202)
+
+            # Word-Dokument: Projekt, Kapitel und Szenen in einer Transaktion
+            if file and file.filename:
+                try:
+                    project_id, stats = import_word_project(db.engine, user_id, title, description, file.stream)
+                except ValueError as e:
+                    # Datei nicht lesbar (word_parser) – Fehler des Uploads
+                    return ok({"error": f"Fehler beim Verarbeiten des Word-Dokuments: {str(e)}"}, 400)
+                except Exception:
+                    # DB-Fehler o.ä.: loggen, aber kein SQL an den Client
+                    import traceback
+                    print(f"[WordImport] Import für User {user_id} fehlgeschlagen", flush=True)
+                    traceback.print_exc()
+                    return ok({"error": "Word-Import fehlgeschlagen"}, 500)
+                print(f"[WordImport] Projekt {project_id}: {stats['chapters']} Kapitel, {stats['scenes']} Szenen, "
+                      f"{stats['rows']} Zeilen in {stats['seconds']}s ({stats['rows_per_sec']} Zeilen/s, "
+                      f"{stats['round_trips']} Round-Trips)", flush=True)
+                return ok({"id": project_id, "title": title, "description": description, "import": stats}, 201)
+
             # Erstelle Projekt
             p = Project(
-                user_id=get_current_user().id,
+                user_id=user_id,
                 title=title,
                 description=description
             )
             db.session.add(p)
             db.session.commit()
-
-            # Verarbeite Word-Dokument falls vorhanden
-            if file and file.filename:
-                try:
-                    # Parse Word-Dokument
-                    parsed = parse_word_document(file.stream)
-
-                    # Erstelle Kapitel und Szenen
-                    for chapter_data in parsed.get("chapters", []):
-                        chapter = Chapter(
-                            project_id=p.id,
-                            title=chapter_data.get("title", "Kapitel"),
-                            order_index=chapter_data.get("order_index", 0)
-                        )
-                        db.session.add(chapter)
-                        db.session.flush()  # Get chapter ID
-
-                        # Erstelle Szenen für dieses Kapitel
-                        for scene_data in chapter_data.get("scenes", []):
-                            scene = Scene(
-                                chapter_id=chapter.id,
-                                title=scene_data.get("title", "Szene"),
-                                content=scene_data.get("content", ""),
-                                order_index=scene_data.get("order_index", 0)
-                            )
-                            db.session.add(scene)
-
-                    db.session.commit()
-
-                except Exception as e:
-                    db.session.rollback()
-                    # Lösche Projekt bei Fehler
-                    db.session.delete(p)
-                    db.session.commit()
-                    return ok({"error": f"Fehler beim Verarbeiten des Word-Dokuments: {str(e)}"}, 400)
-
             return ok({"id": p.id, "title": p.title, "description": p.description}, 201)
 
         else:
@@ -912,14 +1184,15 @@ Sent from WriteHaven Feedback Form
     @app.get("/api/projects/<int:pid>")
     @token_auth_required
     def get_project(pid):
-        p = Project.query.filter_by(id=pid, user_id=get_current_user().id).first()
+        p = fetch_one_fields(PROJECT_FIELDS, ("id", "title", "description"),
+                             Project.id == pid, Project.user_id == get_current_user().id)
         if not p: return not_found()
-        return ok({"id": p.id, "title": p.title, "description": p.description})
+        return ok(p)
 
     @app.put("/api/projects/<int:pid>")
     @token_auth_required
     def update_project(pid):
-        p = Project.query.filter_by(id=pid, user_id=get_current_user().id).first()
+        p = load_owned_project(pid, get_current_user().id)
         if not p: return not_found()
         data = request.get_json() or {}
         p.title = data.get("title", p.title)
@@ -930,8 +1203,9 @@ Sent from WriteHaven Feedback Form
     @app.delete("/api/projects/<int:pid>")
     @token_auth_required
     def delete_project(pid):
-        p = Project.query.filter_by(id=pid, user_id=get_current_user().id).first()
-        if not p: return not_found()
+        if not verify_project_ownership(pid, get_current_user().id): return not_found()
+        scene_write_buffer.flush(project_id=pid)
+        p = load_owned(Project, pid)
         db.session.delete(p)
         db.session.commit()
         return ok({"ok": True})
@@ -940,7 +1214,7 @@ Sent from WriteHaven Feedback Form
     @token_auth_required
     def ignore_entity(pid):
         """Add a word to the project's ignored entities list"""
-        p = Project.query.filter_by(id=pid, user_id=get_current_user().id).first()
+        p = load_owned_project(pid, get_current_user().id)
         if not p: return not_found()
 
         data = request.get_json() or {}
@@ -970,13 +1244,11 @@ Sent from WriteHaven Feedback Form
     def list_chapters(pid):
         if not verify_project_ownership(pid, get_current_user().id):
             return forbidden()
-        rows = (Chapter.query.filter_by(project_id=pid)
-                .order_by(Chapter.order_index.asc(), Chapter.id.asc())
-                .all())
-        return ok([{
-            "id": c.id, "project_id": c.project_id, "title": c.title,
-            "order_index": c.order_index, "content": getattr(c, "content", None)
-        } for c in rows])
+        scene_write_buffer.flush(project_id=pid)
+        return ok(fetch_fields(CHAPTER_FIELDS, ("id", "project_id", "title", "order_index", "content",
+                                                "word_count", "char_count"),
+                               Chapter.project_id == pid,
+                               order_by=(Chapter.order_index.asc(), Chapter.id.asc())))
 
     @app.post("/api/projects/<int:pid>/chapters")
     @token_auth_required
@@ -993,16 +1265,17 @@ Sent from WriteHaven Feedback Form
     @app.get("/api/chapters/<int:cid>")
     @token_auth_required
     def get_chapter(cid):
-        c = verify_chapter_ownership(cid, get_current_user().id)
+        if not verify_chapter_ownership(cid, get_current_user().id): return not_found()
+        c = fetch_one_fields(CHAPTER_FIELDS, ("id", "project_id", "title", "order_index", "content"),
+                             Chapter.id == cid)
         if not c: return not_found()
-        return ok({"id": c.id, "project_id": c.project_id, "title": c.title,
-                   "order_index": c.order_index, "content": getattr(c, "content", None)})
+        return ok(c)
 
     @app.put("/api/chapters/<int:cid>")
     @token_auth_required
     def update_chapter(cid):
-        c = verify_chapter_ownership(cid, get_current_user().id)
-        if not c: return not_found()
+        if not verify_chapter_ownership(cid, get_current_user().id): return not_found()
+        c = load_owned(Chapter, cid)
         data = request.get_json() or {}
         title = data.get("title")
         if title is not None:
@@ -1015,8 +1288,9 @@ Sent from WriteHaven Feedback Form
     @app.delete("/api/chapters/<int:cid>")
     @token_auth_required
     def delete_chapter(cid):
-        c = verify_chapter_ownership(cid, get_current_user().id)
-        if not c: return not_found()
+        if not verify_chapter_ownership(cid, get_current_user().id): return not_found()
+        scene_write_buffer.flush(chapter_id=cid)
+        c = load_owned(Chapter, cid)
         db.session.delete(c); db.session.commit()
         return ok({"ok": True})
 
@@ -1026,20 +1300,10 @@ Sent from WriteHaven Feedback Form
     def list_scenes(cid):
         if not verify_chapter_ownership(cid, get_current_user().id):
             return forbidden()
-        rows = db.session.execute(text("""
-            SELECT id, chapter_id, title, content, status, order_index
-            FROM scene
-            WHERE chapter_id = :cid
-            ORDER BY order_index ASC, id ASC
-        """), {"cid": cid}).mappings().all()
-        return ok([{
-            "id": row["id"],
-            "chapter_id": row["chapter_id"],
-            "title": row["title"],
-            "order_index": row["order_index"],
-            "content": row["content"],
-            "status": row["status"]
-        } for row in rows])
+        scene_write_buffer.flush(chapter_id=cid)
+        return ok(fetch_fields(SCENE_FIELDS, ("id", "chapter_id", "title", "order_index", "content", "status"),
+                               Scene.chapter_id == cid,
+                               order_by=(Scene.order_index.asc(), Scene.id.asc())))
 
     @app.post("/api/chapters/<int:cid>/scenes")
     @token_auth_required
@@ -1053,15 +1317,20 @@ Sent from WriteHaven Feedback Form
             "content": data.get("content", "") or "",
             "status": data.get("status") or "Idea"
         }
+        payload.update(derived_scene_fields(payload["content"]))
         try:
-            row = db.session.execute(text("""
-                INSERT INTO scene (chapter_id, title, order_index, content, status)
-                VALUES (:chapter_id, :title, :order_index, :content, :status)
-                RETURNING id, chapter_id, title, content, status, order_index
-            """), payload).mappings().first()
-            db.session.commit()
+            with write_transaction(db.engine) as conn:
+                row = conn.execute(text("""
+                    INSERT INTO scene (chapter_id, title, order_index, content, status,
+                                       revision, preview, word_count, char_count)
+                    VALUES (:chapter_id, :title, :order_index, :content, :status,
+                            :revision, :preview, :word_count, :char_count)
+                    RETURNING id, chapter_id, title, content, status, order_index, revision
+                """), payload).mappings().first()
+                apply_delta(conn, cid, payload["word_count"], payload["char_count"])
+                if payload["content"]:
+                    mentions.index_scene(conn, row["id"], payload["content"])
         except IntegrityError:
-            db.session.rollback()
             return bad_request("Database integrity error while creating scene.")
         return ok({
             "id": row["id"],
@@ -1069,42 +1338,40 @@ Sent from WriteHaven Feedback Form
             "order_index": row["order_index"],
             "chapter_id": row["chapter_id"],
             "content": row["content"],
-            "status": row["status"]
+            "status": row["status"],
+            "revision": row["revision"]
         }, 201)
 
+    def scene_access_or_error(sid):
+        """Ownership-Check für die Raw-SQL-Szenenrouten: (access, None) oder (None, Fehlerantwort)"""
+        access = authz.scene_access(db.session, sid)
+        if not access: return None, not_found()
+        if not authz.owned(access, get_current_user().id): return None, forbidden()
+        return access, None
+
     @app.get("/api/scenes/<int:sid>")
     @token_auth_required
     def get_scene(sid):
-        row = db.session.execute(text("""
-            SELECT id, chapter_id, title, content, status, order_index, context_manifest
-            FROM scene
-            WHERE id = :id
-        """), {"id": sid}).mappings().first()
-        if row and not verify_chapter_ownership(row["chapter_id"], get_current_user().id):
-            return forbidden()
+        _, err = scene_access_or_error(sid)
+        if err: return err
+        scene_write_buffer.flush(scene_id=sid)
+        row = fetch_one_fields(SCENE_FIELDS, ("id", "chapter_id", "title", "order_index", "content",
+                                              "status", "context_manifest", "revision"),
+                               Scene.id == sid)
         if not row: return not_found()
-        return ok({
-            "id": row["id"],
-            "chapter_id": row["chapter_id"],
-            "title": row["title"],
-            "order_index": row["order_index"],
-            "content": row["content"],
-            "status": row["status"],
-            "context_manifest": _loads(row["context_manifest"] or "{}")
-        })
+        if "revision" in row and not row["revision"] and "content" in row:
+            row["revision"] = content_revision(row["content"])
+        return ok(row)
 
     @app.put("/api/scenes/<int:sid>")
     @token_auth_required
     def update_scene(sid):
-        existing = db.session.execute(text("""
-            SELECT id, chapter_id, title, content, status, order_index
-            FROM scene
-            WHERE id = :id
-        """), {"id": sid}).mappings().first()
-        if not existing: return not_found()
-        if not verify_chapter_ownership(existing["chapter_id"], get_current_user().id):
-            return forbidden()
+        access, err = scene_access_or_error(sid)
+        if err: return err
         data = request.get_json() or {}
+        if scene_write_buffer.enabled and data.get("content") is not None:
+            return stage_scene_update(access, data)
+        scene_write_buffer.flush(scene_id=sid)
         updates = []
         params = {"id": sid}
         if (t := data.get("title")) is not None:
@@ -1113,6 +1380,9 @@ Sent from WriteHaven Feedback Form
         if (c := data.get("content")) is not None:
             updates.append("content = :content")
             params["content"] = c
+            for name, value in derived_scene_fields(c).items():
+                updates.append(f"{name} = :{name}")
+                params[name] = value
         if (st := data.get("status")) is not None:
             updates.append("status = :status")
             params["status"] = st
@@ -1121,6 +1391,11 @@ Sent from WriteHaven Feedback Form
             params["context_manifest"] = json.dumps(data["context_manifest"] or {})
 
         if not updates:
+            existing = db.session.execute(text("""
+                SELECT id, chapter_id, title, content, status, order_index, context_manifest, revision
+                FROM scene
+                WHERE id = :id
+            """), {"id": sid}).mappings().first()
             return ok({
                 "id": existing["id"],
                 "title": existing["title"],
@@ -1128,17 +1403,25 @@ Sent from WriteHaven Feedback Form
                 "chapter_id": existing["chapter_id"],
                 "content": existing["content"],
                 "status": existing["status"],
-                "context_manifest": _loads(existing.get("context_manifest") or "{}")
+                "context_manifest": _loads(existing["context_manifest"] or "{}"),
+                "revision": existing["revision"] or content_revision(existing["content"])
             })
 
         update_sql = text(f"""
             UPDATE scene
             SET {', '.join(updates)}, updated_at = CURRENT_TIMESTAMP
             WHERE id = :id
-            RETURNING id, chapter_id, title, content, status, order_index, context_manifest
+            RETURNING id, chapter_id, title, content, status, order_index, context_manifest, revision
         """)
-        row = db.session.execute(update_sql, params).mappings().first()
-        db.session.commit()
+        # Zähler-Delta und Szenen-Update in einer Transaktion (sonst AUTOCOMMIT)
+        with write_transaction(db.engine) as conn:
+            if "content" in params:
+                apply_scene_counts(conn, sid, params["word_count"], params["char_count"])
+            row = conn.execute(update_sql, params).mappings().first()
+            if "content" in params:
+                mentions.index_scene(conn, sid, params["content"], access.project_id)
+            if "context_manifest" in params:
+                sync_scene_entities(conn, sid, params["context_manifest"])
         return ok({
             "id": row["id"],
             "title": row["title"],
@@ -1146,38 +1429,272 @@ Sent from WriteHaven Feedback Form
             "chapter_id": row["chapter_id"],
             "content": row["content"],
             "status": row["status"],
-            "context_manifest": _loads(row["context_manifest"] or "{}")
+            "context_manifest": _loads(row["context_manifest"] or "{}"),
+            "revision": row["revision"] or content_revision(row["content"])
         })
 
+    def buffered_scene_row(sid):
+        """Aktueller Stand einer Szene: aus dem Write-Behind-Puffer oder aus der DB"""
+        row = scene_write_buffer.get(sid)
+        if row is not None:
+            return row
+        row = db.session.execute(text("""
+            SELECT id, chapter_id, title, content, status, order_index, context_manifest, revision
+            FROM scene
+            WHERE id = :id
+        """), {"id": sid}).mappings().first()
+        if not row:
+            return None
+        row = dict(row)
+        row["revision"] = row["revision"] or content_revision(row["content"])
+        return row
+
+    def stage_scene_update(access, data):
+        """PUT über den Write-Behind-Puffer: Antwort aus dem Speicher, DB-Write später"""
+        row = buffered_scene_row(access.scene_id)
+        if not row: return not_found()
+        updates = {}
+        if (t := data.get("title")) is not None:
+            updates["title"] = t.strip()
+        updates["content"] = data["content"]
+        updates.update(derived_scene_fields(data["content"]))
+        if (st := data.get("status")) is not None:
+            updates["status"] = st
+        if "context_manifest" in data:
+            updates["context_manifest"] = json.dumps(data["context_manifest"] or {})
+        base = row["revision"]
+        row.update(updates)
+        scene_write_buffer.stage(access.scene_id, access.chapter_id, access.project_id, row, updates, base)
+        return ok({
+            "id": row["id"],
+            "title": row["title"],
+            "order_index": row["order_index"],
+            "chapter_id": row["chapter_id"],
+            "content": row["content"],
+            "status": row["status"],
+            "context_manifest": _loads(row["context_manifest"] or "{}"),
+            "revision": row["revision"]
+        })
+
+    @app.patch("/api/scenes/<int:sid>/content")
+    @token_auth_required
+    def patch_scene_content(sid):
+        """
+        Delta-Autosave: wendet Textoperationen gegen eine Basis-Revision an.
+        Body: {"base_revision": "...", "ops": [{"at": 0, "del": 0, "ins": "..."}]}
+        Antwort: {"revision": "..."} oder 409 mit der aktuellen Revision.
+        """
+        access, err = scene_access_or_error(sid)
+        if err: return err
+        data = request.get_json() or {}
+        base = data.get("base_revision")
+        if not base:
+            return bad_request("base_revision required")
+
+        if scene_write_buffer.enabled:
+            current = buffered_scene_row(sid)
+        else:
+            current = db.session.execute(text(
+                "SELECT content, revision, word_count, char_count FROM scene WHERE id = :id"
+            ), {"id": sid}).mappings().first()
+        if not current: return not_found()
+        current_rev = current["revision"] or content_revision(current["content"])
+        if base != current_rev:
+            return ok({"error": "revision_mismatch", "revision": current_rev}, 409)
+
+        try:
+            new_content = apply_ops(current["content"] or "", data.get("ops") or [])
+        except DeltaError as e:
+            return bad_request(f"invalid_ops: {e}")
+
+        derived = derived_scene_fields(new_content)
+        new_rev = derived["revision"]
+        if new_rev == current_rev:
+            return ok({"revision": current_rev})
+
+        if scene_write_buffer.enabled:
+            updates = {"content": new_content, **derived}
+            current.update(updates)
+            scene_write_buffer.stage(sid, access.chapter_id, access.project_id, current, updates, current_rev)
+            return ok({"revision": new_rev})
+
+        # Compare-and-Swap: nur schreiben, wenn niemand zwischendurch gespeichert hat
+        with write_transaction(db.engine) as conn:
+            result = conn.execute(text("""
+                UPDATE scene
+                SET content = :content, revision = :new_rev, preview = :preview,
+                    word_count = :word_count, char_count = :char_count, updated_at = CURRENT_TIMESTAMP
+                WHERE id = :id AND (revision = :base OR revision IS NULL)
+            """), {"id": sid, "content": new_content, "new_rev": new_rev, "base": base,
+                  "preview": derived["preview"], "word_count": derived["word_count"],
+                  "char_count": derived["char_count"]})
+            if result.rowcount == 1:
+                # Der CAS garantiert: die gelesenen Zähler gehören zum überschriebenen Stand
+                apply_delta(conn, access.chapter_id,
+                            derived["word_count"] - (current["word_count"] or 0),
+                            derived["char_count"] - (current["char_count"] or 0))
+                mentions.index_scene(conn, sid, new_content, access.project_id)
+        if result.rowcount != 1:
+            row = db.session.execute(text(
+                "SELECT content, revision FROM scene WHERE id = :id"
+            ), {"id": sid}).mappings().first()
+            latest = (row["revision"] or content_revision(row["content"])) if row else None
+            return ok({"error": "revision_mismatch", "revision": latest}, 409)
+        return ok({"revision": new_rev})
+
     @app.delete("/api/scenes/<int:sid>")
     @token_auth_required
     def delete_scene(sid):
-        row = db.session.execute(text("SELECT chapter_id FROM scene WHERE id = :id"), {"id": sid}).first()
-        if not row: return not_found()
-        chapter_id = row.chapter_id if hasattr(row, "chapter_id") else row[0]
-        if not verify_chapter_ownership(chapter_id, get_current_user().id):
-            return forbidden()
-        db.session.execute(text("DELETE FROM scene WHERE id = :id"), {"id": sid})
-        db.session.commit()
+        _, err = scene_access_or_error(sid)
+        if err: return err
+        scene_write_buffer.discard(sid)
+        with write_transaction(db.engine) as conn:
+            apply_scene_counts(conn, sid, 0, 0)
+            conn.execute(text("DELETE FROM scene WHERE id = :id"), {"id": sid})
         return ok({"ok": True})
 
+    # ---------- Szenen-Vorschauen (gespeichert, ohne content) ----------
+    def _preview_dict(row):
+        return {
+            "id": row["id"],
+            "chapter_id": row["chapter_id"],
+            "title": row["title"],
+            "order_index": row["order_index"],
+            "status": row["status"],
+            "preview": row["preview"] or "",
+            "word_count": row["word_count"] or 0
+        }
+
+    @app.get("/api/chapters/<int:cid>/scene-previews")
+    @token_auth_required
+    def list_chapter_scene_previews(cid):
+        if not verify_chapter_ownership(cid, get_current_user().id):
+            return forbidden()
+        scene_write_buffer.flush(chapter_id=cid)
+        rows = db.session.execute(text("""
+            SELECT id, chapter_id, title, status, order_index, preview, word_count
+            FROM scene
+            WHERE chapter_id = :cid
+            ORDER BY order_index ASC, id ASC
+        """), {"cid": cid}).mappings().all()
+        return ok([_preview_dict(r) for r in rows])
+
+    @app.get("/api/projects/<int:pid>/scene-previews")
+    @token_auth_required
+    def list_project_scene_previews(pid):
+        if not verify_project_ownership(pid, get_current_user().id):
+            return forbidden()
+        scene_write_buffer.flush(project_id=pid)
+        rows = db.session.execute(text("""
+            SELECT s.id, s.chapter_id, s.title, s.status, s.order_index, s.preview, s.word_count
+            FROM scene s
+            JOIN chapter c ON c.id = s.chapter_id
+            WHERE c.project_id = :pid
+            ORDER BY c.order_index ASC, c.id ASC, s.order_index ASC, s.id ASC
+        """), {"pid": pid}).mappings().all()
+        return ok([_preview_dict(r) for r in rows])
+
+    # ---------- Getaggte Szenen (Reverse-Lookup über scene_entity) ----------
+    def _tagged_scenes(entity_type, entity_id):
+        rows = db.session.execute(text("""
+            SELECT s.id, s.chapter_id, s.title, s.status, s.order_index, s.preview, s.word_count
+            FROM scene_entity se
+            JOIN scene s ON s.id = se.scene_id
+            JOIN chapter c ON c.id = s.chapter_id
+            WHERE se.entity_type = :type AND se.entity_id = :eid
+            ORDER BY c.order_index ASC, c.id ASC, s.order_index ASC, s.id ASC
+        """), {"type": entity_type, "eid": entity_id}).mappings().all()
+        return [_preview_dict(r) for r in rows]
+
+    @app.get("/api/characters/<int:cid>/tagged-scenes")
+    @token_auth_required
+    def list_character_tagged_scenes(cid):
+        access = authz.character_access(db.session, cid)
+        if not access: return not_found()
+        if not authz.owned(access, get_current_user().id): return forbidden()
+        scene_write_buffer.flush(project_id=access.project_id)
+        return ok(_tagged_scenes("character", cid))
+
+    @app.get("/api/world/<int:wid>/tagged-scenes")
+    @token_auth_required
+    def list_world_tagged_scenes(wid):
+        access = authz.worldnode_access(db.session, wid)
+        if not access: return not_found()
+        if not authz.owned(access, get_current_user().id): return forbidden()
+        scene_write_buffer.flush(project_id=access.project_id)
+        return ok(_tagged_scenes("location", wid))
+
+    # ---------- Volltextsuche ----------
+    @app.get("/api/projects/<int:pid>/search")
+    @token_auth_required
+    def search_project(pid):
+        """
+        ?q=<Begriffe>&limit=20&cursor=<next_cursor>&types=scene,character
+        Treffer nach Relevanz, Fundstellen in snippet mit \\x02 … \\x03 markiert.
+        """
+        if not verify_project_ownership(pid, get_current_user().id):
+            return forbidden()
+        q = (request.args.get("q") or "").strip()
+        if not q:
+            return bad_request("q required")
+        types = [t for t in (request.args.get("types") or "").split(",") if t] or None
+        try:
+            limit = int(request.args.get("limit", 20))
+        except ValueError:
+            return bad_request("limit must be an integer")
+        scene_write_buffer.flush(project_id=pid)
+        try:
+            results, next_cursor = search_index.search(
+                db.session.connection(), pid, q, limit=limit,
+                cursor=request.args.get("cursor"), types=types)
+        except ValueError as e:
+            return bad_request(str(e))
+        except search_index.SearchUnavailable:
+            return ok({"error": "search_unavailable"}, 503)
+        return ok({"results": results, "next_cursor": next_cursor})
+
+    # ---------- Manuskript (ein Request statt N+1) ----------
+    @app.get("/api/projects/<int:pid>/manuscript")
+    @token_auth_required
+    def get_manuscript(pid):
+        """
+        Ganzes Buch als NDJSON-Stream: eine Zeile für das Projekt, dann Kapitel-
+        und Szenen-Zeilen in Buchreihenfolge, zum Schluss {"type": "end"}.
+        """
+        p = load_owned_project(pid, get_current_user().id)
+        if not p: return not_found()
+        scene_write_buffer.flush(project_id=pid)
+        header = {"type": "project", "id": p.id, "title": p.title, "description": p.description,
+                  "author": p.author or "", "language": p.language or "en"}
+        engine = db.engine
+
+        def generate():
+            yield json.dumps(header, ensure_ascii=False) + "\n"
+            counts = {"chapter": 0, "scene": 0}
+            with snapshot_connection(engine) as conn:
+                for event in iter_manuscript_events(conn, pid):
+                    counts[event["type"]] += 1
+                    yield json.dumps(event, ensure_ascii=False) + "\n"
+            yield json.dumps({"type": "end", "chapters": counts["chapter"],
+                              "scenes": counts["scene"]}) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson",
+                        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"})
+
     # ---------- Scene Notes ----------
     @app.get("/api/scenes/<int:sid>/notes")
     @token_auth_required
     def list_scene_notes(sid):
-        s = Scene.query.get(sid)
-        if not s or not verify_chapter_ownership(s.chapter_id, get_current_user().id):
+        if not verify_scene_ownership(sid, get_current_user().id):
             return forbidden()
-        notes = SceneNote.query.filter_by(scene_id=sid).order_by(SceneNote.created_at.desc()).all()
-        return ok([{"id": n.id, "scene_id": n.scene_id, "title": n.title,
-                    "content": n.content, "created_at": n.created_at.isoformat() if n.created_at else None,
-                    "updated_at": n.updated_at.isoformat() if n.updated_at else None} for n in notes])
+        return ok(fetch_fields(_note_fields(SceneNote, "scene_id"),
+                               ("id", "scene_id", "title", "content", "created_at", "updated_at"),
+                               SceneNote.scene_id == sid, order_by=(SceneNote.created_at.desc(),)))
 
     @app.post("/api/scenes/<int:sid>/notes")
     @token_auth_required
     def create_scene_note(sid):
-        s = Scene.query.get(sid)
-        if not s or not verify_chapter_ownership(s.chapter_id, get_current_user().id):
+        if not verify_scene_ownership(sid, get_current_user().id):
             return forbidden()
         data = request.get_json() or {}
         note = SceneNote(scene_id=sid, title=data.get("title", ""), content=data.get("content", ""))
@@ -1190,8 +1707,7 @@ Sent from WriteHaven Feedback Form
     def update_scene_note(sid, nid):
         note = SceneNote.query.get(nid)
         if not note or note.scene_id != sid: return not_found()
-        s = Scene.query.get(sid)
-        if not s or not verify_chapter_ownership(s.chapter_id, get_current_user().id):
+        if not verify_scene_ownership(sid, get_current_user().id):
             return forbidden()
         data = request.get_json() or {}
         if (t := data.get("title")) is not None: note.title = t
@@ -1204,8 +1720,7 @@ Sent from WriteHaven Feedback Form
     def delete_scene_note(sid, nid):
         note = SceneNote.query.get(nid)
         if not note or note.scene_id != sid: return not_found()
-        s = Scene.query.get(sid)
-        if not s or not verify_chapter_ownership(s.chapter_id, get_current_user().id):
+        if not verify_scene_ownership(sid, get_current_user().id):
             return forbidden()
         db.session.delete(note); db.session.commit()
         return ok({"ok": True})
@@ -1214,18 +1729,16 @@ Sent from WriteHaven Feedback Form
     @app.get("/api/scenes/<int:sid>/tasks")
     @token_auth_required
     def list_scene_tasks(sid):
-        s = Scene.query.get(sid)
-        if not s or not verify_chapter_ownership(s.chapter_id, get_current_user().id):
+        if not verify_scene_ownership(sid, get_current_user().id):
             return forbidden()
-        tasks = SceneTask.query.filter_by(scene_id=sid).order_by(SceneTask.created_at.asc()).all()
-        return ok([{"id": t.id, "scene_id": t.scene_id, "title": t.title, "completed": t.completed,
-                    "created_at": t.created_at.isoformat() if t.created_at else None} for t in tasks])
+        return ok(fetch_fields(_task_fields(SceneTask, "scene_id"),
+                               ("id", "scene_id", "title", "completed", "created_at"),
+                               SceneTask.scene_id == sid, order_by=(SceneTask.created_at.asc(),)))
 
     @app.post("/api/scenes/<int:sid>/tasks")
     @token_auth_required
     def create_scene_task(sid):
-        s = Scene.query.get(sid)
-        if not s or not verify_chapter_ownership(s.chapter_id, get_current_user().id):
+        if not verify_scene_ownership(sid, get_current_user().id):
             return forbidden()
         data = request.get_json() or {}
         task = SceneTask(scene_id=sid, title=data.get("title", ""), completed=False)
@@ -1237,8 +1750,7 @@ Sent from WriteHaven Feedback Form
     def update_scene_task(sid, tid):
         task = SceneTask.query.get(tid)
         if not task or task.scene_id != sid: return not_found()
-        s = Scene.query.get(sid)
-        if not s or not verify_chapter_ownership(s.chapter_id, get_current_user().id):
+        if not verify_scene_ownership(sid, get_current_user().id):
             return forbidden()
         data = request.get_json() or {}
         if (t := data.get("title")) is not None: task.title = t
@@ -1251,8 +1763,7 @@ Sent from WriteHaven Feedback Form
     def delete_scene_task(sid, tid):
         task = SceneTask.query.get(tid)
         if not task or task.scene_id != sid: return not_found()
-        s = Scene.query.get(sid)
-        if not s or not verify_chapter_ownership(s.chapter_id, get_current_user().id):
+        if not verify_scene_ownership(sid, get_current_user().id):
             return forbidden()
         db.session.delete(task); db.session.commit()
         return ok({"ok": True})
@@ -1263,10 +1774,9 @@ Sent from WriteHaven Feedback Form
     def list_chapter_notes(cid):
         if not verify_chapter_ownership(cid, get_current_user().id):
             return forbidden()
-        notes = ChapterNote.query.filter_by(chapter_id=cid).order_by(ChapterNote.created_at.desc()).all()
-        return ok([{"id": n.id, "chapter_id": n.chapter_id, "title": n.title,
-                    "content": n.content, "created_at": n.created_at.isoformat() if n.created_at else None,
-                    "updated_at": n.updated_at.isoformat() if n.updated_at else None} for n in notes])
+        return ok(fetch_fields(_note_fields(ChapterNote, "chapter_id"),
+                               ("id", "chapter_id", "title", "content", "created_at", "updated_at"),
+                               ChapterNote.chapter_id == cid, order_by=(ChapterNote.created_at.desc(),)))
 
     @app.post("/api/chapters/<int:cid>/notes")
     @token_auth_required
@@ -1308,9 +1818,9 @@ Sent from WriteHaven Feedback Form
     def list_chapter_tasks(cid):
         if not verify_chapter_ownership(cid, get_current_user().id):
             return forbidden()
-        tasks = ChapterTask.query.filter_by(chapter_id=cid).order_by(ChapterTask.created_at.asc()).all()
-        return ok([{"id": t.id, "chapter_id": t.chapter_id, "title": t.title, "completed": t.completed,
-                    "created_at": t.created_at.isoformat() if t.created_at else None} for t in tasks])
+        return ok(fetch_fields(_task_fields(ChapterTask, "chapter_id"),
+                               ("id", "chapter_id", "title", "completed", "created_at"),
+                               ChapterTask.chapter_id == cid, order_by=(ChapterTask.created_at.asc(),)))
 
     @app.post("/api/chapters/<int:cid>/tasks")
     @token_auth_required
@@ -1351,10 +1861,9 @@ Sent from WriteHaven Feedback Form
     def list_character_notes(cid):
         if not verify_character_ownership(cid, get_current_user().id):
             return forbidden()
-        notes = CharacterNote.query.filter_by(character_id=cid).order_by(CharacterNote.created_at.desc()).all()
-        return ok([{"id": n.id, "character_id": n.character_id, "title": n.title,
-                    "content": n.content, "created_at": n.created_at.isoformat() if n.created_at else None,
-                    "updated_at": n.updated_at.isoformat() if n.updated_at else None} for n in notes])
+        return ok(fetch_fields(_note_fields(CharacterNote, "character_id"),
+                               ("id", "character_id", "title", "content", "created_at", "updated_at"),
+                               CharacterNote.character_id == cid, order_by=(CharacterNote.created_at.desc(),)))
 
     @app.post("/api/characters/<int:cid>/notes")
     @token_auth_required
@@ -1396,9 +1905,9 @@ Sent from WriteHaven Feedback Form
     def list_character_tasks(cid):
         if not verify_character_ownership(cid, get_current_user().id):
             return forbidden()
-        tasks = CharacterTask.query.filter_by(character_id=cid).order_by(CharacterTask.created_at.asc()).all()
-        return ok([{"id": t.id, "character_id": t.character_id, "title": t.title, "completed": t.completed,
-                    "created_at": t.created_at.isoformat() if t.created_at else None} for t in tasks])
+        return ok(fetch_fields(_task_fields(CharacterTask, "character_id"),
+                               ("id", "character_id", "title", "completed", "created_at"),
+                               CharacterTask.character_id == cid, order_by=(CharacterTask.created_at.asc(),)))
 
     @app.post("/api/characters/<int:cid>/tasks")
     @token_auth_required
@@ -1434,6 +1943,44 @@ Sent from WriteHaven Feedback Form
         return ok({"ok": True})
 
     # ---------- Characters ----------
+    # Erwähnungs-Index nach Charakteränderungen im Hintergrund neu aufbauen (mentions.py)
+    with app.app_context():
+        mention_jobs = mention_runner_from_env(db.engine)
+        mention_engine = db.engine
+    app.extensions["mention_jobs"] = mention_jobs
+    mention_reindex_queued = set()
+    mention_reindex_lock = threading.Lock()
+
+    def schedule_mention_reindex(user_id, project_id):
+        """
+        Reiht den Neuaufbau der Erwähnungen eines Projekts ein – für alle
+        Charaktere, weil ein neuer oder geänderter Alias auch die Treffer der
+        anderen verschiebt. Wartet schon ein Job für das Projekt, reicht der:
+        er liest die Namen erst beim Start. Gepufferte Szenen-Saves indexieren
+        sich beim Flush selbst (index_scene).
+        """
+        with mention_reindex_lock:
+            if project_id in mention_reindex_queued:
+                return None
+            mention_reindex_queued.add(project_id)
+
+        def unqueue():
+            with mention_reindex_lock:
+                mention_reindex_queued.discard(project_id)
+
+        def job():
+            unqueue()
+            with write_transaction(mention_engine) as conn:
+                count = mentions.index_project(conn, project_id)
+            return {"project_id": project_id, "mentions": count}, 200
+
+        try:
+            return mention_jobs.submit(user_id, "mention_index", job, on_done=unqueue)
+        except (JobLimitExceeded, JobQueueFull):
+            unqueue()
+            print(f"[Mentions] Neuaufbau für Projekt {project_id} nicht eingereiht (Limit erreicht)", flush=True)
+            return None
+
     def _char_to_dict(c: Character):
         return {
             "id": c.id,
@@ -1445,13 +1992,15 @@ Sent from WriteHaven Feedback Form
             "profile": _loads(c.profile_json or "{}"),
         }
 
+    CHARACTER_DEFAULT = ("id", "project_id", "name", "summary", "avatar_url", "gallery", "profile")
+
     @app.get("/api/projects/<int:pid>/characters")
     @token_auth_required
     def list_characters(pid):
         if not verify_project_ownership(pid, get_current_user().id):
             return forbidden()
-        rows = Character.query.filter_by(project_id=pid).order_by(Character.id.asc()).all()
-        return ok([_char_to_dict(c) for c in rows])
+        return ok(fetch_fields(CHARACTER_FIELDS, CHARACTER_DEFAULT,
+                               Character.project_id == pid, order_by=(Character.id.asc(),)))
 
     @app.post("/api/projects/<int:pid>/characters")
     @token_auth_required
@@ -1468,22 +2017,25 @@ Sent from WriteHaven Feedback Form
             profile_json=_dumps(profile),
         )
         db.session.add(c); db.session.commit()
+        schedule_mention_reindex(get_current_user().id, pid)
         return ok(_char_to_dict(c), 201)
 
     @app.get("/api/characters/<int:cid>")
     @token_auth_required
     def get_character(cid):
-        c = verify_character_ownership(cid, get_current_user().id)
+        if not verify_character_ownership(cid, get_current_user().id): return not_found()
+        c = fetch_one_fields(CHARACTER_FIELDS, CHARACTER_DEFAULT, Character.id == cid)
         if not c: return not_found()
-        return ok(_char_to_dict(c))
+        return ok(c)
 
     @app.put("/api/characters/<int:cid>")
     @app.patch("/api/characters/<int:cid>")
     @token_auth_required
     def update_character(cid):
-        c = verify_character_ownership(cid, get_current_user().id)
-        if not c: return not_found()
+        if not verify_character_ownership(cid, get_current_user().id): return not_found()
+        c = load_owned(Character, cid)
         data = request.get_json() or {}
+        aliases_before = mentions.character_aliases(c.name, c.profile_json)
 
         # flache Felder
         if "name" in data:        c.name = (data.get("name") or "").strip()
@@ -1499,21 +2051,54 @@ Sent from WriteHaven Feedback Form
             c.profile_json = _dumps(prof)
 
         db.session.commit()
+        if mentions.character_aliases(c.name, c.profile_json) != aliases_before:
+            schedule_mention_reindex(get_current_user().id, c.project_id)
         return ok(_char_to_dict(c))
 
+    @app.get("/api/characters/<int:cid>/mentions")
+    @token_auth_required
+    def list_character_mentions(cid):
+        """Erwähnungen aus dem Index, in Buchreihenfolge – liest keinen Szenentext"""
+        access = authz.character_access(db.session, cid)
+        if not access: return not_found()
+        if not authz.owned(access, get_current_user().id): return forbidden()
+        scene_write_buffer.flush(project_id=access.project_id)
+        rows = db.session.execute(text("""
+            SELECT m.id, m.start_offset, m.end_offset, m.surface, m.fuzzy, m.snippet,
+                   s.id AS scene_id, s.title AS scene_title, s.order_index AS scene_order,
+                   c.id AS chapter_id, c.title AS chapter_title, c.order_index AS chapter_order
+            FROM character_mention m
+            JOIN scene s ON s.id = m.scene_id
+            JOIN chapter c ON c.id = s.chapter_id
+            WHERE m.character_id = :cid
+            ORDER BY c.order_index ASC, c.id ASC, s.order_index ASC, s.id ASC, m.start_offset ASC
+        """), {"cid": cid}).mappings().all()
+        return ok([{
+            "id": r["id"],
+            "chapter": {"id": r["chapter_id"], "title": r["chapter_title"], "order_index": r["chapter_order"]},
+            "scene": {"id": r["scene_id"], "title": r["scene_title"], "order_index": r["scene_order"]},
+            "start": r["start_offset"],
+            "end": r["end_offset"],
+            "text": r["surface"],
+            "fuzzy": bool(r["fuzzy"]),
+            "snippet": r["snippet"]
+        } for r in rows])
+
     @app.delete("/api/characters/<int:cid>")
     @token_auth_required
     def delete_character(cid):
-        c = verify_character_ownership(cid, get_current_user().id)
-        if not c: return not_found()
+        if not verify_character_ownership(cid, get_current_user().id): return not_found()
+        c = load_owned(Character, cid)
+        pid = c.project_id
         db.session.delete(c); db.session.commit()
+        schedule_mention_reindex(get_current_user().id, pid)
         return ok({"ok": True})
 
     @app.post("/api/characters/<int:cid>/upload-avatar")
     @token_auth_required
     def upload_character_avatar(cid):
-        c = verify_character_ownership(cid, get_current_user().id)
-        if not c: return not_found()
+        if not verify_character_ownership(cid, get_current_user().id): return not_found()
+        c = load_owned(Character, cid)
 
         if 'avatar' not in request.files:
             return bad_request("Keine Datei hochgeladen")
@@ -1543,8 +2128,8 @@ Sent from WriteHaven Feedback Form
     @app.post("/api/characters/<int:cid>/gallery")
     @token_auth_required
     def upload_character_gallery(cid):
-        c = verify_character_ownership(cid, get_current_user().id)
-        if not c: return not_found()
+        if not verify_character_ownership(cid, get_current_user().id): return not_found()
+        c = load_owned(Character, cid)
 
         if 'image' not in request.files:
             return bad_request("Keine Datei hochgeladen")
@@ -1578,8 +2163,8 @@ Sent from WriteHaven Feedback Form
     @app.delete("/api/characters/<int:cid>/gallery")
     @token_auth_required
     def remove_character_gallery_image(cid):
-        c = verify_character_ownership(cid, get_current_user().id)
-        if not c: return not_found()
+        if not verify_character_ownership(cid, get_current_user().id): return not_found()
+        c = load_owned(Character, cid)
 
         data = request.get_json() or {}
         index = data.get("index")
@@ -1603,11 +2188,8 @@ Sent from WriteHaven Feedback Form
     def list_world(pid):
         if not verify_project_ownership(pid, get_current_user().id):
             return forbidden()
-        rows = WorldNode.query.filter_by(project_id=pid).order_by(WorldNode.id.asc()).all()
-        return ok([{
-            "id": w.id, "project_id": w.project_id, "title": w.title, "kind": w.kind,
-            "summary": w.summary, "icon": w.icon, "regionId": w.region_id
-        } for w in rows])
+        return ok(fetch_fields(WORLD_FIELDS, ("id", "project_id", "title", "kind", "summary", "icon", "regionId"),
+                               WorldNode.project_id == pid, order_by=(WorldNode.id.asc(),)))
 
     @app.post("/api/projects/<int:pid>/world")
     @token_auth_required
@@ -1627,24 +2209,18 @@ Sent from WriteHaven Feedback Form
     @app.get("/api/world/<int:w_id>")
     @token_auth_required
     def get_world(w_id):
-        w = verify_world_ownership(w_id, get_current_user().id)
+        if not verify_world_ownership(w_id, get_current_user().id): return not_found()
+        w = fetch_one_fields(WORLD_FIELDS, ("id", "project_id", "title", "kind", "summary", "icon",
+                                            "relations", "regionId"),
+                             WorldNode.id == w_id)
         if not w: return not_found()
-        return ok({
-            "id": w.id,
-            "project_id": w.project_id,
-            "title": w.title,
-            "kind": w.kind,
-            "summary": w.summary,
-            "icon": w.icon,
-            "relations": _loads(w.relations_json or "{}"),
-            "regionId": w.region_id
-        })
+        return ok(w)
 
     @app.put("/api/world/<int:w_id>")
     @token_auth_required
     def update_world(w_id):
-        w = verify_world_ownership(w_id, get_current_user().id)
-        if not w: return not_found()
+        if not verify_world_ownership(w_id, get_current_user().id): return not_found()
+        w = load_owned(WorldNode, w_id)
         data = request.get_json() or {}
         w.title   = data.get("title", w.title)
         w.kind    = data.get("kind", w.kind)
@@ -1674,8 +2250,8 @@ Sent from WriteHaven Feedback Form
     @app.delete("/api/world/<int:w_id>")
     @token_auth_required
     def delete_world(w_id):
-        w = verify_world_ownership(w_id, get_current_user().id)
-        if not w: return not_found()
+        if not verify_world_ownership(w_id, get_current_user().id): return not_found()
+        w = load_owned(WorldNode, w_id)
         db.session.delete(w); db.session.commit()
         return ok({"ok": True})
 
@@ -1683,23 +2259,15 @@ Sent from WriteHaven Feedback Form
     @app.get("/api/world/<int:wid>/notes")
     @token_auth_required
     def list_worldnode_notes(wid):
-        w = verify_world_ownership(wid, get_current_user().id)
-        if not w: return not_found()
-        notes = WorldNodeNote.query.filter_by(worldnode_id=wid).order_by(WorldNodeNote.created_at.desc()).all()
-        return ok([{
-            "id": n.id,
-            "worldnode_id": n.worldnode_id,
-            "title": n.title,
-            "content": n.content,
-            "created_at": n.created_at.isoformat() if n.created_at else None,
-            "updated_at": n.updated_at.isoformat() if n.updated_at else None
-        } for n in notes])
+        if not verify_world_ownership(wid, get_current_user().id): return not_found()
+        return ok(fetch_fields(_note_fields(WorldNodeNote, "worldnode_id"),
+                               ("id", "worldnode_id", "title", "content", "created_at", "updated_at"),
+                               WorldNodeNote.worldnode_id == wid, order_by=(WorldNodeNote.created_at.desc(),)))
 
     @app.post("/api/world/<int:wid>/notes")
     @token_auth_required
     def create_worldnode_note(wid):
-        w = verify_world_ownership(wid, get_current_user().id)
-        if not w: return not_found()
+        if not verify_world_ownership(wid, get_current_user().id): return not_found()
         data = request.get_json() or {}
         note = WorldNodeNote(
             worldnode_id=wid,
@@ -1720,8 +2288,7 @@ Sent from WriteHaven Feedback Form
     @app.put("/api/world/<int:wid>/notes/<int:nid>")
     @token_auth_required
     def update_worldnode_note(wid, nid):
-        w = verify_world_ownership(wid, get_current_user().id)
-        if not w: return not_found()
+        if not verify_world_ownership(wid, get_current_user().id): return not_found()
         note = WorldNodeNote.query.filter_by(id=nid, worldnode_id=wid).first()
         if not note: return not_found()
         data = request.get_json() or {}
@@ -1740,8 +2307,7 @@ Sent from WriteHaven Feedback Form
     @app.delete("/api/world/<int:wid>/notes/<int:nid>")
     @token_auth_required
     def delete_worldnode_note(wid, nid):
-        w = verify_world_ownership(wid, get_current_user().id)
-        if not w: return not_found()
+        if not verify_world_ownership(wid, get_current_user().id): return not_found()
         note = WorldNodeNote.query.filter_by(id=nid, worldnode_id=wid).first()
         if not note: return not_found()
         db.session.delete(note)
@@ -1752,23 +2318,15 @@ Sent from WriteHaven Feedback Form
     @app.get("/api/world/<int:wid>/tasks")
     @token_auth_required
     def list_worldnode_tasks(wid):
-        w = verify_world_ownership(wid, get_current_user().id)
-        if not w: return not_found()
-        tasks = WorldNodeTask.query.filter_by(worldnode_id=wid).order_by(WorldNodeTask.created_at.asc()).all()
-        return ok([{
-            "id": t.id,
-            "worldnode_id": t.worldnode_id,
-            "title": t.title,
-            "completed": t.completed,
-            "created_at": t.created_at.isoformat() if t.created_at else None,
-            "updated_at": t.updated_at.isoformat() if t.updated_at else None
-        } for t in tasks])
+        if not verify_world_ownership(wid, get_current_user().id): return not_found()
+        return ok(fetch_fields(_task_fields(WorldNodeTask, "worldnode_id"),
+                               ("id", "worldnode_id", "title", "completed", "created_at", "updated_at"),
+                               WorldNodeTask.worldnode_id == wid, order_by=(WorldNodeTask.created_at.asc(),)))
 
     @app.post("/api/world/<int:wid>/tasks")
     @token_auth_required
     def create_worldnode_task(wid):
-        w = verify_world_ownership(wid, get_current_user().id)
-        if not w: return not_found()
+        if not verify_world_ownership(wid, get_current_user().id): return not_found()
         data = request.get_json() or {}
         title = data.get("title", "").strip()
         if not title:
@@ -1792,8 +2350,7 @@ Sent from WriteHaven Feedback Form
     @app.put("/api/world/<int:wid>/tasks/<int:tid>")
     @token_auth_required
     def update_worldnode_task(wid, tid):
-        w = verify_world_ownership(wid, get_current_user().id)
-        if not w: return not_found()
+        if not verify_world_ownership(wid, get_current_user().id): return not_found()
         task = WorldNodeTask.query.filter_by(id=tid, worldnode_id=wid).first()
         if not task: return not_found()
         data = request.get_json() or {}
@@ -1814,8 +2371,7 @@ Sent from WriteHaven Feedback Form
     @app.delete("/api/world/<int:wid>/tasks/<int:tid>")
     @token_auth_required
     def delete_worldnode_task(wid, tid):
-        w = verify_world_ownership(wid, get_current_user().id)
-        if not w: return not_found()
+        if not verify_world_ownership(wid, get_current_user().id): return not_found()
         task = WorldNodeTask.query.filter_by(id=tid, worldnode_id=wid).first()
         if not task: return not_found()
         db.session.delete(task)
@@ -1826,7 +2382,7 @@ Sent from WriteHaven Feedback Form
     @app.get("/api/projects/<int:pid>/settings")
     @token_auth_required
     def get_project_settings(pid):
-        p = verify_project_ownership(pid, get_current_user().id)
+        p = load_owned_project(pid, get_current_user().id)
         if not p: return not_found()
         return ok({
             "title": p.title,
@@ -1843,7 +2399,7 @@ Sent from WriteHaven Feedback Form
     @app.put("/api/projects/<int:pid>/settings")
     @token_auth_required
     def update_project_settings(pid):
-        p = verify_project_ownership(pid, get_current_user().id)
+        p = load_owned_project(pid, get_current_user().id)
         if not p: return not_found()
         data = request.get_json() or {}
 
@@ -1874,7 +2430,7 @@ Sent from WriteHaven Feedback Form
     @app.post("/api/projects/<int:pid>/upload-cover")
     @token_auth_required
     def upload_project_cover(pid):
-        p = verify_project_ownership(pid, get_current_user().id)
+        p = load_owned_project(pid, get_current_user().id)
         if not p: return not_found()
 
         if 'cover' not in request.files:
@@ -1911,218 +2467,244 @@ Sent from WriteHaven Feedback Form
 
         return ok({"cover_url": cover_url})
 
+    # ---------- PDF-Export (optional im Hintergrund, siehe jobs.py / pdf_cache.py) ----------
+    with app.app_context():
+        pdf_jobs = pdf_runner_from_env(db.engine)
+        pdf_fragments = fragment_cache_from_env(db.engine)
+    app.extensions["pdf_jobs"] = pdf_jobs
+    app.extensions["pdf_fragments"] = pdf_fragments
+    import tempfile
+    import time
+    pdf_artifact_dir = os.getenv("PDF_EXPORT_DIR") or os.path.join(tempfile.gettempdir(), "writehaven-pdf")
+
+    def sweep_pdf_artifacts():
+        """Fertige PDFs löschen, deren Job nicht mehr abrufbar ist"""
+        cutoff = time.time() - pdf_jobs.retention - pdf_jobs.timeout
+        try:
+            with os.scandir(pdf_artifact_dir) as entries:
+                for entry in entries:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+        except FileNotFoundError:
+            pass
+
     @app.post("/api/projects/<int:pid>/export-pdf")
     @token_auth_required
     def export_project_pdf(pid):
-        """Export project as PDF with ReportLab - matching BookExport.jsx formatting"""
-        from reportlab.lib.pagesizes import landscape
-        from reportlab.lib.styles import ParagraphStyle
-        from reportlab.lib.units import mm
-        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
-        from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
-        from reportlab.pdfgen import canvas
-        from io import BytesIO
-        from flask import make_response
-        from bs4 import BeautifulSoup
-
-        p = verify_project_ownership(pid, get_current_user().id)
+        """
+        Export project as PDF with ReportLab - matching BookExport.jsx formatting.
+
+        Ohne "html" im Body wird das Buch direkt aus der DB gelesen (serverseitiger
+        Cursor, siehe manuscript.py); Optionen: locale, chapter_label, subtitle.
+        Mit "html" wird wie bisher das im Browser gerenderte HTML geparst.
+        Unveränderte Kapitel kommen aus dem Fragment-Cache.
+
+        Mit ?async=1 läuft der Export als Job (202 + job_id): Fortschritt unter
+        GET /api/jobs/<id> ("progress"), das fertige PDF unter GET /api/jobs/<id>/file.
+        Sonst wird das PDF in eine temporäre Datei geschrieben und von dort gestreamt.
+        """
+        p = load_owned_project(pid, get_current_user().id)
         if not p: return not_found()
 
-        data = request.get_json() or {}
+        data = request.get_json(silent=True) or {}
         html_content = data.get("html", "")
-
+        title = p.title
+        download_name = f'{p.title or "book"}.pdf'
+        locale = data.get("locale") or p.language or "en"
+        chapter_label = data.get("chapter_label") or "Chapter"
+        subtitle = data.get("subtitle") or "Novel"
+        engine = db.engine
         if not html_content:
-            return bad_request("HTML content is required")
-
+            scene_write_buffer.flush(project_id=pid)
+
+        def render(out, progress=None):
+            """Schreibt das PDF nach ``out``; läuft ohne Request-Kontext"""
+            def report(total):
+                if progress is None:
+                    return None
+                progress({"stage": "layout", "chapters_done": 0, "chapters_total": total, "reused": 0},
+                         force=True)
+                return lambda done, reused: progress({"stage": "layout", "chapters_done": done,
+                                                      "chapters_total": total, "reused": reused})
+
+            if html_content:
+                chapters = pdf_export.chapters_from_html(html_content)
+                return pdf_export.build_pdf(out, title, "Novel", chapters, pdf_fragments,
+                                            report(len(chapters)))
+            # Kapitel werden während des Layouts gelesen – die Story liegt nie ganz im Speicher
+            with snapshot_connection(engine) as conn:
+                total = conn.execute(text("SELECT COUNT(*) FROM chapter WHERE project_id = :pid"),
+                                     {"pid": pid}).scalar()
+                chapters = pdf_export.iter_db_chapters(iter_manuscript_events(conn, pid), locale, chapter_label)
+                return pdf_export.build_pdf(out, title, subtitle, chapters, pdf_fragments, report(total))
+
+        if request_flag("async"):
+            def job(progress):
+                import uuid
+                os.makedirs(pdf_artifact_dir, exist_ok=True)
+                name = f"{uuid.uuid4().hex}.pdf"
+                path = os.path.join(pdf_artifact_dir, name)
+                try:
+                    with open(path + ".part", "wb") as out:
+                        stats = render(out, progress)
+                    os.replace(path + ".part", path)
+                finally:
+                    if os.path.exists(path + ".part"):
+                        os.unlink(path + ".part")
+                progress({"stage": "done", "chapters_done": stats["chapters"],
+                          "chapters_total": stats["chapters"], "reused": stats["reused"]}, force=True)
+                return dict(stats, file=name, filename=download_name, bytes=os.path.getsize(path)), 200
+
+            sweep_pdf_artifacts()
+            try:
+                job_id = pdf_jobs.submit(get_current_user().id, "pdf_export", job, with_progress=True)
+            except JobLimitExceeded:
+                return ok({"error": "too_many_jobs"}, 429)
+            except JobQueueFull:
+                return ok({"error": "job_queue_full"}, 503)
+            return ok({"job_id": job_id, "status": "queued"}, 202)
+
+        pdf_file = tempfile.TemporaryFile(suffix=".pdf", dir=os.getenv("PDF_SPOOL_DIR") or None)
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-
-            # Extract title and chapters
-            chapters = []
-            chapter_sections = soup.find_all('section', class_='chapter-section')
-
-            for section in chapter_sections:
-                chapter_title_elem = section.find('h1', class_='chapter-title')
-                chapter_title = chapter_title_elem.get_text().strip() if chapter_title_elem else ""
-
-                paragraphs = []
-                scene_break_next = False
-                for p_tag in section.find_all('p'):
-                    classes = p_tag.get('class', [])
-                    if 'scene-sep' in classes:
-                        scene_break_next = True
-                        continue
-                    text = p_tag.get_text().strip()
-                    if not text:
-                        continue
-                    is_first = 'dropcap' in classes or scene_break_next
-                    paragraphs.append({'text': text, 'first': is_first, 'scene_break': scene_break_next})
-                    scene_break_next = False
-
-                if chapter_title or paragraphs:
-                    chapters.append({'title': chapter_title, 'paragraphs': paragraphs})
-
-            # Page size: 152.4mm x 228.6mm (from BookExport.jsx)
-            page_width = 152.4 * mm
-            page_height = 228.6 * mm
-
-            # Margins: @page{margin:20mm 18mm 24mm 18mm} = top, right, bottom, left
-            margin_top = 20 * mm
-            margin_right = 18 * mm
-            margin_bottom = 24 * mm
-            margin_left = 18 * mm
-
-            # Custom canvas for page numbers
-            class NumberedCanvas(canvas.Canvas):
-                def __init__(self, *args, **kwargs):
-                    canvas.Canvas.__init__(self, *args, **kwargs)
-                    self._saved_page_states = []
-
-                def showPage(self):
-                    self._saved_page_states.append(dict(self.__dict__))
-                    self._startPage()
-
-                def save(self):
-                    num_pages = len(self._saved_page_states)
-                    for state in self._saved_page_states:
-                        self.__dict__.update(state)
-                        self.draw_page_number(num_pages)
-                        canvas.Canvas.showPage(self)
-                    canvas.Canvas.save(self)
-
-                def draw_page_number(self, page_count):
-                    page = self._pageNumber
-                    # Skip page number on title page (page 1)
-                    if page == 1:
-                        return
-
-                    self.saveState()
-                    # @bottom-center{content: counter(page); font-size:10pt; color:#444}
-                    self.setFont('Times-Roman', 10)
-                    self.setFillColorRGB(0.267, 0.267, 0.267)  # #444
-                    self.drawCentredString(page_width / 2, margin_bottom / 2, str(page))
-                    self.restoreState()
-
-            pdf_buffer = BytesIO()
-            doc = SimpleDocTemplate(
-                pdf_buffer,
-                pagesize=(page_width, page_height),
-                leftMargin=margin_left,
-                rightMargin=margin_right,
-                topMargin=margin_top,
-                bottomMargin=margin_bottom
-            )
-
-            # Styles matching BookExport.jsx EXACTLY
-            # Title: font-size:28pt
-            title_style = ParagraphStyle(
-                'Title',
-                fontName='Times-Roman',  # Georgia fallback
-                fontSize=28,
-                leading=36,
-                alignment=TA_CENTER,
-                spaceAfter=3*mm
-            )
-
-            # Subtitle: font-size:12pt; color:#555
-            subtitle_style = ParagraphStyle(
-                'Subtitle',
-                fontName='Times-Roman',
-                fontSize=12,
-                leading=16,
-                alignment=TA_CENTER,
-                textColor='#555555',
-                spaceAfter=0
-            )
-
-            # Chapter: font-size:18pt; text-align:center; margin:0 0 10mm
-            chapter_style = ParagraphStyle(
-                'Chapter',
-                fontName='Times-Bold',
-                fontSize=18,
-                leading=22,
-                alignment=TA_CENTER,
-                spaceAfter=10*mm,
-                spaceBefore=0,
-                keepWithNext=True
-            )
-
-            # Body: font-size:11pt; line-height:1.42; text-indent:1.2em; no space between paragraphs
-            body_style = ParagraphStyle(
-                'Body',
-                fontName='Times-Roman',
-                fontSize=11,
-                leading=11 * 1.42,
-                alignment=TA_JUSTIFY,
-                firstLineIndent=1.2 * 11,  # 1.2em
-                spaceAfter=0
-            )
-
-            # First paragraph after chapter: text-indent:0
-            body_first_style = ParagraphStyle(
-                'BodyFirst',
-                parent=body_style,
-                firstLineIndent=0
-            )
-
-            story = []
-
-            # Title page: margin-top:35mm
-            story.append(Spacer(1, 35*mm))
-            story.append(Paragraph(p.title or "Untitled", title_style))
-            story.append(Paragraph("Novel", subtitle_style))
-            story.append(PageBreak())
-
-            # Chapters
-            for idx, chapter in enumerate(chapters):
-                if idx > 0:
-                    story.append(PageBreak())
-
-                if chapter['title']:
-                    story.append(Paragraph(chapter['title'], chapter_style))
-
-                for p_idx, para in enumerate(chapter['paragraphs']):
-                    if para.get('scene_break'):
-                        story.append(Spacer(1, 11 * 1.42))
-                    text = para['text'].replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                    style = body_first_style if para['first'] else body_style
-                    story.append(Paragraph(text, style))
-
-            doc.build(story, canvasmaker=NumberedCanvas)
-            pdf_buffer.seek(0)
-
-            response = make_response(pdf_buffer.getvalue())
-            response.headers['Content-Type'] = 'application/pdf'
-            response.headers['Content-Disposition'] = f'attachment; filename="{p.title or "book"}.pdf"'
-            return response
-
+            render(pdf_file)
+            pdf_file.seek(0)
         except Exception as e:
+            pdf_file.close()
             print(f"PDF generation error: {e}")
             import traceback
             traceback.print_exc()
             return bad_request(f"Error generating PDF: {str(e)}")
 
+        # send_file schließt (und löscht damit) die temporäre Datei nach dem Senden
+        return send_file(pdf_file, mimetype='application/pdf', as_attachment=True,
+                         download_name=download_name)
+
+    @app.get("/api/jobs/<job_id>/file")
+    @token_auth_required
+    def download_job_file(job_id):
+        """Fertiges PDF eines Export-Jobs"""
+        job = pdf_jobs.get(job_id, get_current_user().id)
+        if not job or job["kind"] != "pdf_export" or job["status"] != "succeeded":
+            return not_found()
+        path = os.path.join(pdf_artifact_dir, os.path.basename(job["result"]["file"]))
+        if not os.path.exists(path):
+            return not_found()
+        return send_file(path, mimetype='application/pdf', as_attachment=True,
+                         download_name=job["result"]["filename"])
+
     # Optional: globaler Integrity-Handler
     @app.errorhandler(IntegrityError)
     def handle_integrity(e):
         db.session.rollback()
         return bad_request("Database integrity error.")
 
+    # ---------- LLM-Jobs (optional im Hintergrund, siehe jobs.py) ----------
+    with app.app_context():
+        llm_jobs = runner_from_env(db.engine, kinds=("schreibgeist", "extract_character", "suggest_title"))
+    app.extensions["llm_jobs"] = llm_jobs
+    # Geteilter Anthropic-Client (Keep-Alive, Limits, Circuit Breaker)
+    llm = client_from_env()
+    app.extensions["llm_client"] = llm
+    # Antwort-Cache für Titel-Vorschläge / Charakter-Extraktion (Content-Hash)
+    with app.app_context():
+        llm_responses = response_cache_from_env(db.engine)
+    app.extensions["llm_responses"] = llm_responses
+
+    def request_flag(name):
+        flag = request.args.get(name) or (request.get_json(silent=True) or {}).get(name)
+        return str(flag).lower() in ("1", "true", "yes")
+
+    def run_llm(kind, call):
+        """call() -> (body, status): mit ?async=1 als Job (202 + job_id), sonst direkt"""
+        if not request_flag("async"):
+            body, status = call()
+            return ok(body, status)
+        try:
+            job_id = llm_jobs.submit(get_current_user().id, kind, call)
+        except JobLimitExceeded:
+            return ok({"error": "too_many_jobs"}, 429)
+        except JobQueueFull:
+            return ok({"error": "job_queue_full"}, 503)
+        return ok({"job_id": job_id, "status": "queued"}, 202)
+
+    def run_cached_llm(kind, key, call):
+        """
+        Wie run_llm, erfolgreiche Antworten aber über den Content-Hash-Cache.
+        Mit ?nocache=1 wird der Cache umgangen (die neue Antwort aber gespeichert).
+        """
+        bypass = request_flag("nocache")
+
+        def cached_call():
+            if bypass:
+                llm_responses.note_bypass()
+            else:
+                hit = llm_responses.get(key)
+                if hit is not None:
+                    return dict(hit, cached=True), 200
+            body, status = call()
+            if status == 200 and "error" not in body:
+                llm_responses.put(key, kind, body)
+            return body, status
+
+        return run_llm(kind, cached_call)
+
+    @app.get("/api/jobs/<job_id>")
+    @token_auth_required
+    def get_job(job_id):
+        job = llm_jobs.get(job_id, get_current_user().id)
+        if not job: return not_found()
+        return ok(job)
+
+    @app.delete("/api/jobs/<job_id>")
+    @token_auth_required
+    def cancel_job(job_id):
+        user_id = get_current_user().id
+        job = llm_jobs.get(job_id, user_id)
+        if not job: return not_found()
+        # Abbrechen beim Runner, der den Job ausführt (alle teilen sich llm_job)
+        runner = next((r for r in (llm_jobs, pdf_jobs, import_jobs) if job["kind"] in (r.kinds or ())),
+                      llm_jobs)
+        job = runner.cancel(job_id, user_id)
+        if not job: return not_found()
+        return ok(job)
+
+    @app.get("/api/llm/metrics")
+    @token_auth_required
+    def llm_metrics():
+        # Betriebsdaten aller User (Queue, Cache, Latenzen): nur für Admins
+        user = load_current_user()
+        if not user or not user.has_role("admin"): return forbidden()
+        return ok({
+            "client": llm.metrics(),
+            "jobs": llm_jobs.stats(),
+            "response_cache": llm_responses.stats(),
+            "prompt_cache": {"prefix": prompt_prefixes.stats(), "usage": prompt_cache_stats.snapshot()},
+        })
+
     # ---------- Schreibgeist (Claude AI) ----------
-    @app.post("/api/projects/<int:pid>/schreibgeist")
-    @token_auth_required
-    def schreibgeist_chat(pid):
-        p = verify_project_ownership(pid, get_current_user().id)
-        if not p: return not_found()
+    # Token-Budget für den ausgewählten Kontext (Szenen, Profile) pro Anfrage
+    SCHREIBGEIST_CONTEXT_TOKENS = int(os.getenv("SCHREIBGEIST_CONTEXT_TOKENS", "12000"))
+    PROFILE_MAX_TOKENS = 600
+    prompt_prefixes = prompt_prefix.PrefixCache()
+    prompt_cache_stats = prompt_prefix.PromptCacheStats()
+
+    def prepare_schreibgeist(pid):
+        """
+        Baut den Anthropic-Request für Schreibgeist (blockierend und Streaming):
+        (request_kwargs, None) oder (None, Fehlerantwort)
+        """
+        p = load_owned_project(pid, get_current_user().id)
+        if not p: return None, not_found()
+        scene_write_buffer.flush(project_id=pid)
 
         api_key = os.getenv("ANTHROPIC_API_KEY", "")
         if not api_key:
-            return ok({"error": "api_key_missing"}, 503)
+            return None, ok({"error": "api_key_missing"}, 503)
 
         data = request.get_json() or {}
         raw_messages = data.get("messages", [])
         if not raw_messages:
-            return bad_request("no_messages")
+            return None, bad_request("no_messages")
 
         MODEL_MAP = {
             "haiku":  "claude-haiku-4-5-20251001",
@@ -2130,56 +2712,53 @@ Sent from WriteHaven Feedback Form
         }
         selected_model = MODEL_MAP.get(data.get("model", "sonnet"), "claude-sonnet-4-6")
 
-        # Build base book context (always included)
-        all_chapters = Chapter.query.filter_by(project_id=pid).order_by(Chapter.order_index.asc()).all()
-        chapter_block = "\n".join(
-            [f"- Kapitel {i+1}: {ch.title or '(ohne Titel)'}" for i, ch in enumerate(all_chapters)]
-        ) or "Noch keine Kapitel angelegt."
-
-        all_characters = Character.query.filter_by(project_id=pid).all()
-        character_block = ", ".join([c.name for c in all_characters if c.name]) or "Noch keine Charaktere angelegt."
-
+        # Stabiler Präfix (Buchstruktur), im Speicher pro Projekt-Revision – siehe prompt_prefix.py
         user = get_current_user()
-        base_system = f"""Du bist Schreibgeist, ein kreativer Schreibassistent für {user.name or 'den Autor'}.
-
-Du arbeitest am Projekt: "{p.title}"
 
-Buchstruktur:
-{chapter_block}
-
-Charaktere:
-{character_block}
+        def build_base_system():
+            chapter_titles = db.session.execute(
+                select(Chapter.title).where(Chapter.project_id == pid)
+                .order_by(Chapter.order_index.asc(), Chapter.id.asc())
+            ).scalars().all()
+            character_names = sorted(
+                db.session.execute(select(Character.name).where(Character.project_id == pid)).scalars().all(),
+                key=lambda name: ((name or "").lower(), name or ""),
+            )
+            return prompt_prefix.render_base_system(user.name, p.title, chapter_titles, character_names)
 
-Deine Aufgabe: Beim kreativen Schreiben helfen – Ideen entwickeln, Feedback geben, Formulierungen vorschlagen.
-Antworte auf Deutsch. Passe die Länge deiner Antwort der Aufgabe an: kurze Fragen knapp beantworten, vollständige Texte vollständig ausschreiben.
-Wenn du Szenentext vorschlägst oder überarbeitest, umschließe den vollständigen Text mit <scene> und </scene>."""
+        base_system = prompt_prefixes.get_or_build((pid, p.prompt_revision or 0, user.name), build_base_system)
 
-        # Build entity context (multi-select characters + locations + current scene)
+        # Build entity context (multi-select characters + locations + current scene),
+        # per Token-Budget gepackt (siehe context_packer.py)
         entity_ctx    = data.get("entity_context", {})
         ec_char_ids   = set(entity_ctx.get("character_ids", []))
         ec_loc_ids    = set(entity_ctx.get("location_ids",  []))
         ec_scene_id   = entity_ctx.get("scene_id")
-        context_parts = []
+        candidates    = []
+        tagged_scenes = []
 
         # Current scene context
         if ec_scene_id:
             scene_row = db.session.execute(text("""
-                SELECT s.title, s.content
+                SELECT s.id, s.title, s.content
                 FROM scene s
                 JOIN chapter c ON s.chapter_id = c.id
                 WHERE s.id = :sid AND c.project_id = :pid
             """), {"sid": ec_scene_id, "pid": pid}).mappings().first()
             if scene_row:
-                scene_block = f"## Aktuelle Szene: {scene_row['title'] or '(ohne Titel)'}"
-                if scene_row["content"]:
-                    scene_block += f"\n\n{scene_row['content']}"
-                context_parts.append(scene_block)
+                candidates.append(context_packer.Block(
+                    "current_scene", scene_row["id"], scene_row["title"] or "(ohne Titel)",
+                    f"## Aktuelle Szene: {scene_row['title'] or '(ohne Titel)'}\n",
+                    scene_row["content"], recency=1.0, pinned=True,
+                ))
 
         if ec_char_ids or ec_loc_ids:
             # Character profiles
-            for char in [c for c in all_characters if c.id in ec_char_ids]:
+            for char in Character.query.filter(
+                Character.id.in_(_int_ids(ec_char_ids)), Character.project_id == pid
+            ).order_by(Character.id.asc()).all():
                 prof = _loads(char.profile_json or "{}")
-                parts = [f"## Charakter: {char.name}"]
+                parts = []
                 if char.summary:
                     parts.append(char.summary)
                 age = prof.get("basic", {}).get("age", "")
@@ -2187,54 +2766,77 @@ Wenn du Szenentext vorschlägst oder überarbeitest, umschließe den vollständi
                     parts.append(f"Alter: {age}")
                 backstory = prof.get("relations", {}).get("family_background", "")
                 if backstory:
-                    parts.append(f"Hintergrund: {backstory[:400]}")
-                context_parts.append("\n".join(parts))
+                    parts.append(f"Hintergrund: {backstory}")
+                candidates.append(context_packer.Block(
+                    "character", char.id, char.name, f"## Charakter: {char.name}",
+                    "\n\n".join(parts), pinned=True, max_tokens=PROFILE_MAX_TOKENS, stable=True,
+                ))
 
             # Location descriptions
             if ec_loc_ids:
                 for loc in WorldNode.query.filter(
-                    WorldNode.id.in_(ec_loc_ids), WorldNode.project_id == pid
-                ).all():
-                    parts = [f"## Ort: {loc.title} ({loc.kind})"]
-                    if loc.summary:
-                        parts.append(loc.summary[:600])
-                    context_parts.append("\n".join(parts))
-
-            # Deduplicated union of tagged scenes
-            all_project_scenes = db.session.execute(text("""
-                SELECT s.id, s.title, s.content, s.context_manifest
-                FROM scene s
-                JOIN chapter c ON s.chapter_id = c.id
-                WHERE c.project_id = :pid
-            """), {"pid": pid}).mappings().all()
-
-            seen_ids = set()
-            tagged_scenes = []
-            for sc in all_project_scenes:
-                m = _loads(sc["context_manifest"] or "{}")
-                if (ec_char_ids & set(m.get("character_ids", []))) or \
-                   (ec_loc_ids  & set(m.get("location_ids",  []))):
-                    if sc["id"] not in seen_ids:
-                        seen_ids.add(sc["id"])
-                        tagged_scenes.append(sc)
-
-            if tagged_scenes:
-                context_parts.append("### Verknüpfte Szenen:")
-                for sc in tagged_scenes:
-                    block = f"#### Szene: {sc['title'] or '(ohne Titel)'}"
-                    if sc["content"]:
-                        block += f"\n{sc['content']}"
-                    context_parts.append(block)
-            else:
-                context_parts.append("(Keine Szenen mit den ausgewählten Elementen getaggt)")
-
-        system_blocks = [{"type": "text", "text": base_system}]
-        if context_parts:
-            system_blocks.append({
-                "type": "text",
-                "text": "\n\n---\nAusgewählter Kontext:\n\n" + "\n\n".join(context_parts),
-            })
-        system_blocks[-1]["cache_control"] = {"type": "ephemeral"}
+                    WorldNode.id.in_(_int_ids(ec_loc_ids)), WorldNode.project_id == pid
+                ).order_by(WorldNode.id.asc()).all():
+                    candidates.append(context_packer.Block(
+                        "location", loc.id, loc.title, f"## Ort: {loc.title} ({loc.kind})",
+                        loc.summary, pinned=True, max_tokens=PROFILE_MAX_TOKENS, stable=True,
+                    ))
+
+            # Deduplicated union of tagged scenes (Index-Join über scene_entity)
+            tag_params = {"pid": pid}
+            tag_filters = []
+            for entity_type, ids in (("character", ec_char_ids), ("location", ec_loc_ids)):
+                keys = []
+                for i, entity_id in enumerate(sorted(_int_ids(ids))):
+                    tag_params[f"{entity_type}{i}"] = entity_id
+                    keys.append(f":{entity_type}{i}")
+                if keys:
+                    tag_filters.append(f"(se.entity_type = '{entity_type}' AND se.entity_id IN ({', '.join(keys)}))")
+            if tag_filters:
+                tagged_scenes = db.session.execute(text(f"""
+                    SELECT s.id, s.title, s.content, s.updated_at
+                    FROM scene s
+                    JOIN chapter c ON s.chapter_id = c.id
+                    WHERE c.project_id = :pid
+                      AND s.id IN (SELECT se.scene_id FROM scene_entity se
+                                   WHERE {' OR '.join(tag_filters)})
+                    ORDER BY c.order_index ASC, c.id ASC, s.order_index ASC, s.id ASC
+                """), tag_params).mappings().all()
+
+            # Aktualität: Rang nach letzter Bearbeitung (0 = älteste, 1 = neueste)
+            by_update = sorted(tagged_scenes, key=lambda sc: (str(sc["updated_at"] or ""), sc["id"]))
+            recency = {sc["id"]: i / max(1, len(by_update) - 1) for i, sc in enumerate(by_update)}
+            for sc in tagged_scenes:
+                if sc["id"] == ec_scene_id:
+                    continue
+                candidates.append(context_packer.Block(
+                    "scene", sc["id"], sc["title"] or "(ohne Titel)",
+                    f"#### Szene: {sc['title'] or '(ohne Titel)'}",
+                    sc["content"], recency=recency[sc["id"]],
+                ))
+
+        latest_user_message = next(
+            (str(m.get("content") or m.get("text") or "") for m in reversed(raw_messages) if m.get("role") != "ai"),
+            "",
+        )
+        packed, context_report = context_packer.pack(candidates, SCHREIBGEIST_CONTEXT_TOKENS, latest_user_message)
+
+        # Schichten für den Prompt-Cache: Profile (halb-stabil) vor Szenen (volatil),
+        # die aktuelle Szene ganz am Ende
+        semi_stable = [rendered for block, rendered in packed if block.kind in ("character", "location")]
+        volatile = []
+        packed_scenes = [rendered for block, rendered in packed if block.kind == "scene"]
+        if packed_scenes:
+            volatile.append("### Verknüpfte Szenen:")
+            volatile.extend(packed_scenes)
+            omitted = sum(1 for r in context_report["blocks"] if r["kind"] == "scene" and r["status"] == "omitted")
+            if omitted:
+                volatile.append(f"({omitted} weitere verknüpfte Szenen wegen Kontextbudget ausgelassen)")
+        elif (ec_char_ids or ec_loc_ids) and not tagged_scenes:
+            volatile.append("(Keine Szenen mit den ausgewählten Elementen getaggt)")
+        volatile.extend(rendered for block, rendered in packed if block.kind == "current_scene")
+
+        system_blocks = prompt_prefix.system_blocks(base_system, semi_stable, volatile)
 
         # Convert messages: 'ai' → 'assistant', keep last 20
         claude_messages = []
@@ -2245,44 +2847,111 @@ Wenn du Szenentext vorschlägst oder überarbeitest, umschließe den vollständi
                 claude_messages.append({"role": role, "content": content})
 
         if not claude_messages:
-            return bad_request("no_messages")
+            return None, bad_request("no_messages")
 
-        try:
-            import anthropic
-            client = anthropic.Anthropic(api_key=api_key)
-            response = client.messages.create(
-                model=selected_model,
-                max_tokens=4096,
-                system=system_blocks,
-                messages=claude_messages,
-            )
-            reply = response.content[0].text if response.content else ""
-            usage = response.usage
-            print(
-                f"[Schreibgeist] model={selected_model} "
-                f"in={usage.input_tokens} out={usage.output_tokens} "
-                f"cache_write={getattr(usage, 'cache_creation_input_tokens', 0)} "
-                f"cache_read={getattr(usage, 'cache_read_input_tokens', 0)}",
-                flush=True
-            )
-            scene_match = re.search(r'<scene>(.*?)</scene>', reply, re.DOTALL)
-            scene_content = scene_match.group(1).strip() if scene_match else None
-            if scene_content is not None:
-                display_reply = re.sub(r'<scene>.*?</scene>', scene_content, reply, flags=re.DOTALL)
-            else:
-                display_reply = reply
-            return ok({"message": display_reply, "scene_content": scene_content})
-        except Exception as e:
-            error_str = str(e)
-            return ok({"error": f"api_error: {error_str[:200]}"}, 503)
+        return {
+            "api_key": api_key,
+            "context": context_report,
+            "model": selected_model,
+            "max_tokens": 4096,
+            "system": system_blocks,
+            "messages": claude_messages,
+        }, None
+
+    def _usage_dict(usage):
+        return {
+            "input_tokens": usage.input_tokens,
+            "output_tokens": usage.output_tokens,
+            "cache_write": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            "cache_read": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        }
+
+    def _log_schreibgeist_usage(model, usage):
+        prompt_cache_stats.record(model, usage)
+        print(
+            f"[Schreibgeist] model={model} "
+            f"in={usage['input_tokens']} out={usage['output_tokens']} "
+            f"cache_write={usage['cache_write']} cache_read={usage['cache_read']}",
+            flush=True
+        )
+
+    @app.post("/api/projects/<int:pid>/schreibgeist")
+    @token_auth_required
+    def schreibgeist_chat(pid):
+        req, err = prepare_schreibgeist(pid)
+        if err: return err
+        api_key = req.pop("api_key")
+        context_report = req.pop("context")
+
+        def call():
+            try:
+                response = llm.create(api_key, **req)
+                reply = response.content[0].text if response.content else ""
+                _log_schreibgeist_usage(req["model"], _usage_dict(response.usage))
+                display_reply, scene_content = split_reply(reply)
+                return {"message": display_reply, "scene_content": scene_content,
+                        "context": context_report}, 200
+            except Exception as e:
+                error_str = str(e)
+                return {"error": f"api_error: {error_str[:200]}"}, 503
+
+        return run_llm("schreibgeist", call)
+
+    def _sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    @app.post("/api/projects/<int:pid>/schreibgeist/stream")
+    @token_auth_required
+    def schreibgeist_stream(pid):
+        """
+        Wie /schreibgeist, aber als Server-Sent Events:
+            text / scene_start / scene_delta / scene_end  – während der Antwort
+            done  {"message", "scene_content", "usage", "model", "context"}
+            error {"error": "api_error: ..."}
+        Schließt der Client die Verbindung, wird der Upstream-Stream abgebrochen.
+        """
+        req, err = prepare_schreibgeist(pid)
+        if err: return err
+        api_key = req.pop("api_key")
+        context_report = req.pop("context")
+
+        def generate():
+            parser = SceneStreamParser()
+            chunks = []
+            try:
+                # Verlässt der Generator den with-Block (auch per GeneratorExit beim
+                # Client-Abbruch), schließt das SDK die Upstream-Verbindung
+                with llm.stream(api_key, **req) as stream:
+                    for chunk in stream.text_stream:
+                        chunks.append(chunk)
+                        for event, payload in parser.feed(chunk):
+                            yield _sse(event, payload)
+                    usage = _usage_dict(stream.get_final_message().usage)
+                for event, payload in parser.close():
+                    yield _sse(event, payload)
+                _log_schreibgeist_usage(req["model"], usage)
+                display_reply, scene_content = split_reply("".join(chunks))
+                yield _sse("done", {"message": display_reply, "scene_content": scene_content,
+                                    "usage": usage, "model": req["model"], "context": context_report})
+            except GeneratorExit:
+                print(f"[Schreibgeist] Client getrennt, Stream abgebrochen (project={pid})", flush=True)
+                raise
+            except Exception as e:
+                yield _sse("error", {"error": f"api_error: {str(e)[:200]}"})
+
+        return Response(generate(), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # nginx/Proxies nicht puffern lassen
+        })
 
     # ---------- Charakter-Extraktion aus Text ----------
     @app.post("/api/projects/<int:pid>/characters/<int:cid>/extract-from-text")
     @token_auth_required
     def extract_character_from_text(pid, cid):
         user = get_current_user()
-        p = verify_project_ownership(pid, user.id)
+        p = load_owned_project(pid, user.id)
         if not p: return not_found()
+        scene_write_buffer.flush(project_id=pid)
 
         char = Character.query.filter_by(id=cid, project_id=pid).first()
         if not char: return not_found()
@@ -2340,37 +3009,43 @@ Verwende diese Struktur (nur Felder einschließen, die du mit Sicherheit aus dem
 {schema}
 Leere oder unsichere Felder weglassen. Antworte ausschließlich mit dem JSON-Objekt."""
 
-        try:
-            import anthropic
-            import json as json_lib
-            client = anthropic.Anthropic(api_key=api_key)
-            response = client.messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=2048,
-                system=system_prompt,
-                messages=[{"role": "user", "content": scenes_text}],
-            )
-            raw = response.content[0].text if response.content else "{}"
-            # JSON aus Antwort extrahieren (tolerant gegenüber Markdown-Code-Blöcken)
-            json_match = re.search(r'\{[\s\S]*\}', raw)
-            if not json_match:
-                return ok({"error": "parse_error"})
-            extracted = json_lib.loads(json_match.group(0))
-            return ok({"extracted": extracted})
-        except (ValueError, KeyError):
-            return ok({"error": "parse_error"})
-        except Exception as e:
-            return ok({"error": f"api_error: {str(e)[:200]}"}, 503)
+        model = "claude-haiku-4-5-20251001"
+
+        def call():
+            try:
+                import json as json_lib
+                response = llm.create(
+                    api_key,
+                    model=model,
+                    max_tokens=2048,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": scenes_text}],
+                )
+                raw = response.content[0].text if response.content else "{}"
+                # JSON aus Antwort extrahieren (tolerant gegenüber Markdown-Code-Blöcken)
+                json_match = re.search(r'\{[\s\S]*\}', raw)
+                if not json_match:
+                    return {"error": "parse_error"}, 200
+                extracted = json_lib.loads(json_match.group(0))
+                return {"extracted": extracted}, 200
+            except (ValueError, KeyError):
+                return {"error": "parse_error"}, 200
+            except Exception as e:
+                return {"error": f"api_error: {str(e)[:200]}"}, 503
+
+        key = cache_key(model, system_prompt, book_language, scenes_text)
+        return run_cached_llm("extract_character", key, call)
 
     # ---------- Kapitelname-Vorschläge ----------
     @app.post("/api/chapters/<int:cid>/suggest-title")
     @token_auth_required
     def suggest_chapter_title(cid):
         user = get_current_user()
-        chapter = Chapter.query.get(cid)
-        if not chapter: return not_found()
-        p = verify_project_ownership(chapter.project_id, user.id)
+        access = verify_chapter_ownership(cid, user.id)
+        if not access: return not_found()
+        p = load_owned_project(access.project_id, user.id)
         if not p: return not_found()
+        scene_write_buffer.flush(chapter_id=cid)
 
         api_key = os.getenv("ANTHROPIC_API_KEY", "")
         if not api_key:
@@ -2398,28 +3073,33 @@ Antworte NUR mit einem JSON-Array von Strings. Kein Freitext, kein Markdown, kei
 Beispiel: ["Titel 1", "Titel 2", "Titel 3"]
 Schreibe die Titel auf {book_language}."""
 
-        try:
-            import anthropic
-            import json as json_lib
-            client = anthropic.Anthropic(api_key=api_key)
-            response = client.messages.create(
-                model="claude-haiku-4-5-20251001",
-                max_tokens=256,
-                system=system_prompt,
-                messages=[{"role": "user", "content": scenes_text}],
-            )
-            raw = response.content[0].text if response.content else "[]"
-            arr_match = re.search(r'\[[\s\S]*\]', raw)
-            if not arr_match:
-                return ok({"error": "parse_error"})
-            suggestions = json_lib.loads(arr_match.group(0))
-            if not isinstance(suggestions, list):
-                return ok({"error": "parse_error"})
-            return ok({"suggestions": [str(s) for s in suggestions if s]})
-        except (ValueError, KeyError):
-            return ok({"error": "parse_error"})
-        except Exception as e:
-            return ok({"error": f"api_error: {str(e)[:200]}"}, 503)
+        model = "claude-haiku-4-5-20251001"
+
+        def call():
+            try:
+                import json as json_lib
+                response = llm.create(
+                    api_key,
+                    model=model,
+                    max_tokens=256,
+                    system=system_prompt,
+                    messages=[{"role": "user", "content": scenes_text}],
+                )
+                raw = response.content[0].text if response.content else "[]"
+                arr_match = re.search(r'\[[\s\S]*\]', raw)
+                if not arr_match:
+                    return {"error": "parse_error"}, 200
+                suggestions = json_lib.loads(arr_match.group(0))
+                if not isinstance(suggestions, list):
+                    return {"error": "parse_error"}, 200
+                return {"suggestions": [str(s) for s in suggestions if s]}, 200
+            except (ValueError, KeyError):
+                return {"error": "parse_error"}, 200
+            except Exception as e:
+                return {"error": f"api_error: {str(e)[:200]}"}, 503
+
+        key = cache_key(model, system_prompt, book_language, scenes_text)
+        return run_cached_llm("suggest_title", key, call)
 
     return app
 
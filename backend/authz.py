@@ -0,0 +1,89 @@
+# backend/authz.py
+"""
+Schlanke Ownership-Checks.
+
+Jeder Check ist genau eine indizierte JOIN-Abfrage über die Primär- und
+Fremdschlüssel (scene -> chapter -> project) und liefert nur IDs zurück.
+Dadurch werden die selectin-Relationships von Project/Chapter nicht
+ausgelöst – ein Autosave kostet eine kleine Abfrage statt das ganze
+Manuskript zu hydrieren.
+
+Alle Funktionen geben eine Row mit Attributzugriff zurück
+(z.B. ``row.project_id``, ``row.user_id``) oder ``None``, wenn das
+Objekt nicht existiert.
+"""
+from sqlalchemy import text
+
+
+_PROJECT_SQL = text("""
+    SELECT p.id AS project_id, p.user_id
+    FROM project p
+    WHERE p.id = :id
+""")
+
+_CHAPTER_SQL = text("""
+    SELECT c.id AS chapter_id, c.project_id, p.user_id
+    FROM chapter c
+    JOIN project p ON p.id = c.project_id
+    WHERE c.id = :id
+""")
+
+_SCENE_SQL = text("""
+    SELECT s.id AS scene_id, s.chapter_id, c.project_id, p.user_id
+    FROM scene s
+    JOIN chapter c ON c.id = s.chapter_id
+    JOIN project p ON p.id = c.project_id
+    WHERE s.id = :id
+""")
+
+_CHARACTER_SQL = text("""
+    SELECT ch.id AS character_id, ch.project_id, p.user_id
+    FROM "character" ch
+    JOIN project p ON p.id = ch.project_id
+    WHERE ch.id = :id
+""")
+
+_WORLDNODE_SQL = text("""
+    SELECT w.id AS worldnode_id, w.project_id, p.user_id
+    FROM worldnode w
+    JOIN project p ON p.id = w.project_id
+    WHERE w.id = :id
+""")
+
+
+def _lookup(session, sql, ident):
+    if ident is None:
+        return None
+    return session.execute(sql, {"id": ident}).first()
+
+
+def project_access(session, project_id):
+    """IDs + Owner eines Projekts"""
+    return _lookup(session, _PROJECT_SQL, project_id)
+
+
+def chapter_access(session, chapter_id):
+    """IDs + Owner eines Kapitels (chapter -> project)"""
+    return _lookup(session, _CHAPTER_SQL, chapter_id)
+
+
+def scene_access(session, scene_id):
+    """IDs + Owner einer Szene (scene -> chapter -> project)"""
+    return _lookup(session, _SCENE_SQL, scene_id)
+
+
+def character_access(session, character_id):
+    """IDs + Owner eines Charakters (character -> project)"""
+    return _lookup(session, _CHARACTER_SQL, character_id)
+
+
+def worldnode_access(session, worldnode_id):
+    """IDs + Owner eines World-Elements (worldnode -> project)"""
+    return _lookup(session, _WORLDNODE_SQL, worldnode_id)
+
+
+def owned(row, user_id):
+    """Gibt die Row nur zurück, wenn sie dem User gehört"""
+    if row is None or user_id is None:
+        return None
+    return row if row.user_id == user_id else None
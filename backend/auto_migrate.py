@@ -8,7 +8,7 @@ This script is safe to run multiple times (idempotent).
 
 import os
 from sqlalchemy import create_engine, text, inspect
-from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.exc import IntegrityError, OperationalError, ProgrammingError
 
 
 def get_database_uri():
@@ -34,6 +34,27 @@ def get_database_uri():
     return uri
 
 
+def migration_done(conn, name):
+    """
+    Einmalige Datenmigrationen (Backfills) werden in ``schema_migration``
+    vermerkt – ein leeres Ziel heißt nicht, dass sie noch aussteht.
+    """
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migration (
+            name VARCHAR(100) PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL
+        )
+    """))
+    return conn.execute(text("SELECT 1 FROM schema_migration WHERE name = :name"),
+                        {"name": name}).first() is not None
+
+
+def mark_migration_done(conn, name):
+    """Im selben Commit wie die Migration selbst aufrufen"""
+    conn.execute(text("INSERT INTO schema_migration (name, applied_at) VALUES (:name, CURRENT_TIMESTAMP)"),
+                 {"name": name})
+
+
 def auto_migrate():
     """Automatically migrate the database if needed"""
     try:
@@ -151,6 +172,211 @@ def auto_migrate():
                         except:
                             pass
 
+            # Migrate scene table - add revision (Delta-Autosave) if missing
+            if 'scene' in inspector.get_table_names():
+                scene_cols = [col['name'] for col in inspector.get_columns('scene')]
+                if 'revision' not in scene_cols:
+                    print("🔄 Auto-migration: Adding revision to scene table...")
+                    try:
+                        conn.execute(text("ALTER TABLE scene ADD COLUMN revision VARCHAR(16);"))
+                        conn.commit()
+                        print("✅ scene.revision column added successfully")
+                    except (ProgrammingError, OperationalError) as e:
+                        print(f"⚠️  Could not add revision column: {e}")
+                        try:
+                            conn.rollback()
+                        except:
+                            pass
+
+            # Migrate scene table - add stored preview / word_count / char_count if missing
+            if 'scene' in inspector.get_table_names():
+                scene_cols = [col['name'] for col in inspector.get_columns('scene')]
+                added = False
+                for col_name, col_type in (('preview', 'VARCHAR(400)'), ('word_count', 'INTEGER'),
+                                           ('char_count', 'INTEGER')):
+                    if col_name in scene_cols:
+                        continue
+                    print(f"🔄 Auto-migration: Adding {col_name} to scene table...")
+                    try:
+                        conn.execute(text(f"ALTER TABLE scene ADD COLUMN {col_name} {col_type};"))
+                        conn.commit()
+                        added = True
+                        print(f"✅ scene.{col_name} column added successfully")
+                    except (ProgrammingError, OperationalError) as e:
+                        print(f"⚠️  Could not add {col_name} column: {e}")
+                        try:
+                            conn.rollback()
+                        except:
+                            pass
+                if added:
+                    try:
+                        from text_stats import backfill_scene_fields
+                    except ImportError:
+                        from backend.text_stats import backfill_scene_fields
+                    try:
+                        count = backfill_scene_fields(conn)
+                        conn.commit()
+                        print(f"✅ Backfilled preview/word/char counts for {count} scenes")
+                    except (ProgrammingError, OperationalError) as e:
+                        print(f"⚠️  Could not backfill scene previews: {e}")
+                        try:
+                            conn.rollback()
+                        except:
+                            pass
+
+            # Migrate chapter/project tables - add materialized word/char counts if missing
+            counts_added = False
+            for table_name in ('chapter', 'project'):
+                if table_name not in inspector.get_table_names():
+                    continue
+                table_cols = [col['name'] for col in inspector.get_columns(table_name)]
+                for col_name in ('word_count', 'char_count'):
+                    if col_name in table_cols:
+                        continue
+                    print(f"🔄 Auto-migration: Adding {col_name} to {table_name} table...")
+                    try:
+                        conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {col_name} INTEGER DEFAULT 0;"))
+                        conn.commit()
+                        counts_added = True
+                        print(f"✅ {table_name}.{col_name} column added successfully")
+                    except (ProgrammingError, OperationalError) as e:
+                        print(f"⚠️  Could not add {col_name} column: {e}")
+                        try:
+                            conn.rollback()
+                        except:
+                            pass
+            if counts_added:
+                try:
+                    from word_counts import rebuild_counts
+                except ImportError:
+                    from backend.word_counts import rebuild_counts
+                try:
+                    count = rebuild_counts(conn)
+                    conn.commit()
+                    print(f"✅ Rebuilt word/char counts for {count} chapters")
+                except (ProgrammingError, OperationalError) as e:
+                    print(f"⚠️  Could not rebuild word counts: {e}")
+                    try:
+                        conn.rollback()
+                    except:
+                        pass
+
+            # Migrate project table - add prompt_revision (Schreibgeist-Prompt-Cache) if missing
+            if 'project' in inspector.get_table_names():
+                project_cols = [col['name'] for col in inspector.get_columns('project')]
+                if 'prompt_revision' not in project_cols:
+                    print("🔄 Auto-migration: Adding prompt_revision to project table...")
+                    try:
+                        conn.execute(text("ALTER TABLE project ADD COLUMN prompt_revision INTEGER NOT NULL DEFAULT 0;"))
+                        conn.commit()
+                        print("✅ project.prompt_revision column added successfully")
+                    except (ProgrammingError, OperationalError) as e:
+                        print(f"⚠️  Could not add prompt_revision column: {e}")
+                        try:
+                            conn.rollback()
+                        except:
+                            pass
+
+            # Migrate llm_job table - add progress_json (PDF-Export-Jobs) if missing
+            if 'llm_job' in inspector.get_table_names():
+                job_cols = [col['name'] for col in inspector.get_columns('llm_job')]
+                if 'progress_json' not in job_cols:
+                    print("🔄 Auto-migration: Adding progress_json to llm_job table...")
+                    try:
+                        conn.execute(text("ALTER TABLE llm_job ADD COLUMN progress_json TEXT;"))
+                        conn.commit()
+                        print("✅ llm_job.progress_json column added successfully")
+                    except (ProgrammingError, OperationalError) as e:
+                        print(f"⚠️  Could not add progress_json column: {e}")
+                        try:
+                            conn.rollback()
+                        except:
+                            pass
+
+            # Migrate project table - add import_status (Word-Import-Jobs) if missing
+            if 'project' in inspector.get_table_names():
+                project_cols = [col['name'] for col in inspector.get_columns('project')]
+                if 'import_status' not in project_cols:
+                    print("🔄 Auto-migration: Adding import_status to project table...")
+                    try:
+                        conn.execute(text("ALTER TABLE project ADD COLUMN import_status VARCHAR(20);"))
+                        conn.commit()
+                        print("✅ project.import_status column added successfully")
+                    except (ProgrammingError, OperationalError) as e:
+                        print(f"⚠️  Could not add import_status column: {e}")
+                        try:
+                            conn.rollback()
+                        except:
+                            pass
+
+            # Volltextsuche (FTS5 / tsvector) einrichten – idempotent
+            try:
+                from search_index import ensure_search_index, rebuild_search_index
+            except ImportError:
+                from backend.search_index import ensure_search_index, rebuild_search_index
+            try:
+                if ensure_search_index(conn):
+                    print("🔄 Auto-migration: Search index created, indexing existing content...")
+                    count = rebuild_search_index(conn)
+                    print(f"✅ Search index ready ({count} documents)")
+                conn.commit()
+            except (ProgrammingError, OperationalError) as e:
+                print(f"⚠️  Could not set up search index: {e}")
+                try:
+                    conn.rollback()
+                except:
+                    pass
+
+            # Erwähnungs-Index einmalig aufbauen (Tabelle legt create_all an)
+            if 'character_mention' in inspector.get_table_names():
+                try:
+                    from mentions import index_project
+                except ImportError:
+                    from backend.mentions import index_project
+                try:
+                    if not migration_done(conn, "character_mention_index"):
+                        project_ids = [r[0] for r in conn.execute(text(
+                            'SELECT DISTINCT project_id FROM "character"'
+                        )).all()]
+                        if project_ids:
+                            print("🔄 Auto-migration: Building character mention index...")
+                        count = sum(index_project(conn, pid) for pid in project_ids)
+                        mark_migration_done(conn, "character_mention_index")
+                        if project_ids:
+                            print(f"✅ Indexed {count} character mentions")
+                    conn.commit()
+                except IntegrityError:
+                    # Ein anderer Worker hat den Index gleichzeitig aufgebaut
+                    conn.rollback()
+                except (ProgrammingError, OperationalError) as e:
+                    print(f"⚠️  Could not build mention index: {e}")
+                    try:
+                        conn.rollback()
+                    except:
+                        pass
+
+            # scene_entity einmalig aus den Manifesten füllen (Tabelle legt create_all an)
+            if 'scene_entity' in inspector.get_table_names():
+                try:
+                    from scene_entities import backfill_scene_entities
+                except ImportError:
+                    from backend.scene_entities import backfill_scene_entities
+                try:
+                    if not migration_done(conn, "scene_entity_backfill"):
+                        count = backfill_scene_entities(conn)
+                        mark_migration_done(conn, "scene_entity_backfill")
+                        if count:
+                            print(f"✅ Mirrored context manifests of {count} scenes into scene_entity")
+                    conn.commit()
+                except IntegrityError:
+                    conn.rollback()
+                except (ProgrammingError, OperationalError) as e:
+                    print(f"⚠️  Could not backfill scene_entity: {e}")
+                    try:
+                        conn.rollback()
+                    except:
+                        pass
+
             # Migrate character table - add gallery_json if missing
             if 'character' in inspector.get_table_names():
                 char_cols = [col['name'] for col in inspector.get_columns('character')]
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# backend/bench_pdf_export.py
+"""
+Benchmark für den PDF-Export mit synthetischen Romanen.
+
+    python bench_pdf_export.py                          # 20k–500k Wörter
+    python bench_pdf_export.py --words 20000 100000 --profiles short
+    python bench_pdf_export.py --out after.json --baseline before.json
+
+Erzeugt reproduzierbare Manuskripte (Seed) in verschiedenen Größen und
+Kapitel-Profilen (viele kurze / wenige lange Kapitel, unterschiedlich viele
+Szenen pro Kapitel), rendert sie als HTML wie BookExport.jsx und schickt sie
+durch den Export-Weg aus pdf_export.py. Gemessen wird pro Stufe:
+
+- html_parse  chapters_from_html (BeautifulSoup)
+- flowables   Paragraph-/Spacer-Objekte für Titelseite und Kapitel
+- layout      Umbruch in Seiten (layout_section, ohne Fragment-Cache)
+- save        Zusammenfügen mit Seitenzahlen und Schreiben der Datei
+
+jeweils Wandzeit, Spitzen-Speicher laut tracemalloc und Größe (html_parse:
+Eingabe-HTML, layout: Seiten-Streams, save: PDF), dazu ein Durchlauf von
+build_pdf mit warmem Fragment-Cache (rebuild_cached, erneuter Export ohne
+Änderungen). ``items`` zählt Kapitel, Flowables bzw. Seiten; max_rss_kb ist
+der bisherige Höchststand des Prozesses. Ergebnisse gehen als JSON nach
+--out; mit --baseline werden Zeiten und Speicherspitzen mit einem früheren
+Lauf verglichen.
+
+tracemalloc verlangsamt Python-lastigen Code deutlich; für reine Zeitmessungen
+--no-tracemalloc verwenden (Speicherwerte sind dann null).
+"""
+import argparse
+import html
+import io
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from reportlab import rl_config
+
+try:
+    from backend import pdf_export
+except ImportError:
+    import pdf_export
+
+
+DEFAULT_WORDS = (20000, 100000, 250000, 500000)
+# Wörter pro Kapitel (Mittelwert) und Szenen pro Kapitel (min, max)
+PROFILES = {
+    "short": {"chapter_words": 2500, "scenes": (1, 3)},
+    "long": {"chapter_words": 9000, "scenes": (3, 8)},
+}
+
+_VOCABULARY = """
+der die das und nicht sie er es ein eine war hatte sich mit auf für von dem
+den zu im Licht Haus Nacht Stimme Fenster Straße Hand Blick langsam plötzlich
+wieder leise immer dunkel kalt alt Tür Weg Stadt Wasser Himmel Herz Augen
+Morgen Abend Regen Stille Brief Schritt Tisch Wind Feuer Mantel Lampe Spiegel
+""".split()
+
+
+class Recorder:
+    """Misst Stufen: Wandzeit, tracemalloc-Spitze, Ausgabegröße"""
+
+    def __init__(self, trace=True):
+        self.trace = trace
+        self.stages = {}
+
+    def run(self, name, fn, size=None, items=None):
+        if self.trace:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            result = fn()
+        finally:
+            seconds = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1] if self.trace else None
+            if self.trace:
+                tracemalloc.stop()
+        self.stages[name] = {
+            "seconds": round(seconds, 4),
+            "peak_bytes": peak,
+            "output_bytes": size(result) if size else None,
+        }
+        if items:
+            self.stages[name]["items"] = items(result)
+        return result
+
+
+def synthetic_book(words, profile, seed=1):
+    """
+    Kapitel als Liste von Szenen-Texten (Absätze durch Leerzeilen getrennt),
+    mit Dialog in Anführungszeichen und gelegentlichen Epigrammen.
+    """
+    rng = random.Random(f"{seed}-{words}-{profile}")
+    spec = PROFILES[profile]
+    n_chapters = max(1, round(words / spec["chapter_words"]))
+    chapters = []
+    remaining = words
+    for c in range(n_chapters):
+        chapter_words = remaining // (n_chapters - c)
+        remaining -= chapter_words
+        n_scenes = rng.randint(*spec["scenes"])
+        scenes = []
+        for s in range(n_scenes):
+            scene_words = chapter_words // n_scenes
+            paragraphs = []
+            if rng.random() < 0.05:
+                paragraphs.append(":::epigram\nDer Weg ist weit.\n— Unbekannt\n:::")
+            while scene_words > 0:
+                n = min(scene_words, rng.randint(12, 140))
+                text = " ".join(rng.choice(_VOCABULARY) for _ in range(n))
+                if rng.random() < 0.3:
+                    text = f'"{text.capitalize()}," sagte sie.'
+                else:
+                    text = text.capitalize() + "."
+                paragraphs.append(text)
+                scene_words -= n
+            scenes.append("\n\n".join(paragraphs))
+        title = "" if rng.random() < 0.1 else f"Kapitel {c + 1}: {rng.choice(_VOCABULARY).capitalize()}"
+        chapters.append({"title": title, "scenes": scenes})
+    return chapters
+
+
+def render_html(chapters, locale="de"):
+    """HTML wie BookExport.jsx (Kapitel-Sections, Initiale, Szenentrenner)"""
+    out = ['<!doctype html><html><body><div class="book">']
+    for no, chapter in enumerate(chapters, 1):
+        heading = html.escape(pdf_export.smart_quotes(chapter["title"], locale)) if chapter["title"] \
+            else f"Kapitel {no}"
+        out.append(f'<section class="chapter-section" data-chapter-index="{no - 1}">')
+        out.append(f'<h1 class="chapter-title">{heading}</h1>')
+        for idx, content in enumerate(chapter["scenes"]):
+            if idx > 0:
+                out.append('<p class="scene-sep"></p>')
+            for i, (part_idx, text) in enumerate(pdf_export._text_parts(content)):
+                if part_idx > 0 or i > 0:
+                    out.append('<div class="epigram-preview"><div class="epigram-text">…</div></div>')
+                lines = [line.strip() for line in text.split("\n") if line.strip()]
+                for k, line in enumerate(lines):
+                    cls = ' class="dropcap"' if idx == 0 and part_idx == 0 and k == 0 else ""
+                    out.append(f"<p{cls}>{html.escape(pdf_export.smart_quotes(line, locale))}</p>")
+        out.append("</section>")
+    out.append("</div></body></html>")
+    return "\n".join(out)
+
+
+def bench_book(words, profile, trace=True, seed=1):
+    chapters = synthetic_book(words, profile, seed)
+    source = render_html(chapters)
+    rec = Recorder(trace)
+    styles = pdf_export.make_styles()
+    title, subtitle = "Benchmark", "Roman"
+
+    parsed = rec.run("html_parse", lambda: pdf_export.chapters_from_html(source),
+                     size=lambda r: len(source.encode("utf-8")), items=len)
+
+    def build_flowables():
+        sections = [list(pdf_export.title_flowables(title, subtitle, styles))]
+        sections += [list(pdf_export.chapter_flowables(ch, styles)) for ch in parsed]
+        return sections
+
+    sections = rec.run("flowables", build_flowables, items=lambda r: sum(len(s) for s in r))
+
+    fragments = rec.run("layout", lambda: [pdf_export.layout_section(s) for s in sections],
+                        size=lambda r: sum(len(p) for f in r for p in f["pages"]),
+                        items=lambda r: sum(len(f["pages"]) for f in r))
+    del sections
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.pdf")
+
+        def save():
+            with open(path, "wb") as out:
+                writer = pdf_export.PdfPageWriter(out, title=title)
+                for fragment in fragments:
+                    writer.add_fragment(fragment)
+                writer.close()
+            return path
+
+        rec.run("save", save, size=os.path.getsize)
+        pdf_bytes = os.path.getsize(path)
+
+        # Erneuter Export ohne Änderungen: alle Abschnitte aus dem Cache
+        cache = _DictCache()
+        pdf_export.build_pdf(io.BytesIO(), title, subtitle, parsed, cache)
+        warm = rec.run("rebuild_cached", lambda: pdf_export.build_pdf(path, title, subtitle, parsed, cache),
+                       size=lambda r: os.path.getsize(path))
+
+    return {
+        "words": words,
+        "profile": profile,
+        "chapters": len(parsed),
+        "scenes": sum(len(ch["scenes"]) for ch in chapters),
+        "scene_breaks": sum(1 for ch in parsed for p in ch["paragraphs"] if p["scene_break"]),
+        "paragraphs": sum(len(ch["paragraphs"]) for ch in parsed),
+        "pages": warm["pages"],
+        "pdf_bytes": pdf_bytes,
+        "stages": rec.stages,
+        "total_seconds": round(sum(v["seconds"] for k, v in rec.stages.items() if k != "rebuild_cached"), 4),
+        "max_rss_kb": _max_rss_kb(),
+    }
+
+
+class _DictCache:
+    """Fragment-Cache im Speicher ohne Größenlimit (nur für den Benchmark)"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, fragment):
+        self.entries[key] = fragment
+
+
+def _max_rss_kb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def compare(results, baseline):
+    """Verhältnis neu/alt für Zeiten und Speicherspitzen pro Stufe"""
+    old = {(r["words"], r["profile"]): r for r in baseline.get("runs", [])}
+    for run in results["runs"]:
+        before = old.get((run["words"], run["profile"]))
+        if not before:
+            continue
+        print(f"\n{run['words']:>7} Wörter / {run['profile']}:")
+        for stage, now in run["stages"].items():
+            prev = before["stages"].get(stage)
+            if not prev:
+                continue
+            line = f"  {stage:<15} {prev['seconds']:>8.3f}s -> {now['seconds']:>8.3f}s"
+            if prev["seconds"]:
+                line += f"  ({now['seconds'] / prev['seconds']:.2f}x)"
+            if prev.get("peak_bytes") and now.get("peak_bytes"):
+                line += f"  peak {prev['peak_bytes'] // 1024} -> {now['peak_bytes'] // 1024} KiB"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF-Export-Benchmark mit synthetischen Romanen")
+    parser.add_argument("--words", type=int, nargs="+", default=list(DEFAULT_WORDS))
+    parser.add_argument("--profiles", nargs="+", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="pdf_bench.json")
+    parser.add_argument("--baseline", help="früheres Ergebnis zum Vergleich")
+    parser.add_argument("--no-tracemalloc", action="store_true")
+    args = parser.parse_args()
+
+    # Reproduzierbare Ausgabe (keine Zeitstempel/IDs im PDF)
+    rl_config.invariant = 1
+    # Imports (BeautifulSoup) und Font-Metriken vorab laden, damit sie nicht in die erste Messung fallen
+    pdf_export.chapters_from_html("<section class='chapter-section'><p>x</p></section>")
+    pdf_export.layout_section(pdf_export.title_flowables("x", "y", pdf_export.make_styles()))
+
+    import reportlab
+    results = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "reportlab": reportlab.Version,
+            "platform": platform.platform(),
+            "tracemalloc": not args.no_tracemalloc,
+            "seed": args.seed,
+        },
+        "runs": [],
+    }
+    for words in args.words:
+        for profile in args.profiles:
+            run = bench_book(words, profile, trace=not args.no_tracemalloc, seed=args.seed)
+            results["runs"].append(run)
+            stages = "  ".join(f"{k} {v['seconds']:.2f}s" for k, v in run["stages"].items())
+            print(f"{words:>7} Wörter / {profile:<5} {run['chapters']:>4} Kapitel {run['pages']:>5} Seiten "
+                  f"{run['pdf_bytes'] // 1024:>6} KiB  {stages}", flush=True)
+    results["meta"]["max_rss_kb"] = _max_rss_kb()
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nErgebnisse: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
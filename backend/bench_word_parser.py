@@ -0,0 +1,588 @@
+#!/usr/bin/env python3
+# backend/bench_word_parser.py
+"""
+Benchmark und Regressions-Gate für den Word-Import (word_parser.py).
+
+    python bench_word_parser.py                              # Korpus + 10k/25k Absätze
+    python bench_word_parser.py --paragraphs 10000 50000 --repeat 5
+    python bench_word_parser.py --out after.json --baseline before.json --max-regression 0.2
+    python bench_word_parser.py --corpus-dir /tmp/corpus      # .docx-Dateien zusätzlich ablegen
+
+Erzeugt reproduzierbare .docx-Dateien (Seed), jede mit einem bekannten
+Soll-Aufbau:
+
+- heading_styles      Kapitel als "Heading 1"/"Heading 2", Titelei davor
+- chapter_patterns    "Kapitel 3: …", "Chapter IV", "Teil 2", "PART 7" als normale Absätze
+- numbered_titles     "1. Der Anfang", "12 Rückkehr"
+- separators          ***, ---, ___, ***** als Szenentrenner, "* * *" als Text
+- mixed_formatting    mehrere Runs, Hyperlinks, Zeilenumbrüche, Tabs, Tabellen, leere Absätze
+- no_chapters         keine Überschriften: alles eine Szene
+- headings_only       nur Überschriften: alles eine Szene
+- novel_<N>           Roman mit N Absätzen (--paragraphs, Standard 10k und 25k)
+
+Für jede Datei wird iter_word_events (Streaming-Parser, wie beim Import)
+--repeat mal gemessen (beste Zeit zählt) und einmal unter tracemalloc
+(Spitze des Python-Heaps). lxml/libxml2 allokiert daran vorbei; deshalb
+misst pro Datei ein frisch gestarteter Prozess zusätzlich, um wie viel die
+RSS-Spitze beim Parsen über den Stand davor steigt (rss_growth_kb, nur
+Linux). Zwei Kontrollfälle mit bekannter Allokation prüfen vorab, dass die
+Messung Unterschiede auch sieht.
+
+Geprüft wird die Struktur: Kapiteltitel und Absätze pro Szene gegen den
+Soll-Aufbau des Generators, bis --reference-limit Absätze außerdem exakte
+Gleichheit mit parse_word_document (python-docx).
+
+Mit --baseline wird der Durchsatz (Absätze/s) pro Datei mit einem früheren
+Lauf verglichen; fällt er um mehr als --max-regression (Anteil, Standard
+0.25), fehlt ein Fall der Baseline im Lauf oder stimmt eine Struktur nicht,
+endet das Skript mit Exit-Code 1. Gegated wird der Durchsatz nur für Fälle
+ab --gate-min-paragraphs Absätzen oder --gate-min-seconds Laufzeit.
+Baseline und Lauf sollten von derselben Maschine stammen.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+try:
+    from backend import word_parser
+except ImportError:
+    import word_parser
+
+
+DEFAULT_PARAGRAPHS = (10000, 25000)
+# Kleinere Fälle laufen im Millisekundenbereich – ihr Durchsatz wird nicht gegated
+GATE_MIN_PARAGRAPHS = 5000
+GATE_MIN_SECONDS = 0.05
+
+_VOCABULARY = """
+der die das und nicht sie er es ein eine war hatte sich mit auf für von dem
+den zu im Licht Haus Nacht Stimme Fenster Straße Hand Blick langsam plötzlich
+wieder leise immer dunkel kalt alt Tür Weg Stadt Wasser Himmel Herz Augen
+Morgen Abend Regen Stille Brief Schritt Tisch Wind Feuer Mantel Lampe Spiegel
+""".split()
+
+
+# ---------- Korpus ----------
+
+class DocBuilder:
+    """
+    Baut document.xml aus Blöcken und führt dabei den Soll-Aufbau mit:
+    [(Kapiteltitel, [Absätze pro Szene, …]), …] – unabhängig vom Parser.
+    """
+
+    def __init__(self):
+        self.xml = []
+        self.paragraphs = 0
+        self.chapters = []
+        self._scene = 0  # Absätze der offenen Szene
+
+    def _p(self, runs, style=None):
+        ppr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ""
+        self.xml.append(f"<w:p>{ppr}{runs}</w:p>")
+        self.paragraphs += 1
+
+    @staticmethod
+    def run(text):
+        return f'<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+    def _close_scene(self):
+        if self._scene and self.chapters:
+            self.chapters[-1][1].append(self._scene)
+        self._scene = 0
+
+    def chapter(self, text, title, style=None):
+        """Kapitel-Überschrift; ``title`` ist der erwartete Kapiteltitel"""
+        self._close_scene()
+        self._p(self.run(text), style)
+        self.chapters.append((title, []))
+
+    def separator(self, text="***"):
+        self._close_scene()
+        self._p(self.run(text))
+
+    def text(self, text, runs=None, style=None):
+        """Inhalts-Absatz (``runs`` ersetzt den einfachen Run, z.B. für Hyperlinks)"""
+        self._p(runs or self.run(text), style)
+        self._scene += 1
+
+    def front_matter(self, text, style=None):
+        """Absatz vor dem ersten Kapitel – wird verworfen"""
+        self._p(self.run(text), style)
+
+    def empty(self):
+        self._p("")
+
+    def table(self, cells):
+        rows = "".join(f"<w:tr><w:tc><w:p>{self.run(c)}</w:p></w:tc></w:tr>" for c in cells)
+        self.xml.append(f"<w:tbl>{rows}</w:tbl>")
+
+    def expected(self):
+        self._close_scene()
+        return [(title, scenes) for title, scenes in self.chapters if scenes]
+
+
+def _sentence(rng, lo=8, hi=40):
+    text = " ".join(rng.choice(_VOCABULARY) for _ in range(rng.randint(lo, hi)))
+    return text.capitalize() + "."
+
+
+def _scene(b, rng, lo=2, hi=6):
+    for _ in range(rng.randint(lo, hi)):
+        b.text(_sentence(rng))
+
+
+def case_heading_styles(rng):
+    b = DocBuilder()
+    b.front_matter("Das Buch der Stille", style="Title")
+    b.front_matter("Ein Roman", style="Subtitle")
+    for c in range(12):
+        title = f"{rng.choice(_VOCABULARY).capitalize()} im {rng.choice(_VOCABULARY).capitalize()}"
+        b.chapter(title, title, style="Heading1" if c % 3 else "Heading2")
+        for s in range(rng.randint(1, 4)):
+            if s:
+                b.separator()
+            _scene(b, rng)
+    return b
+
+
+def case_chapter_patterns(rng):
+    b = DocBuilder()
+    roman = ["I", "II", "III", "IV", "V", "VI", "VII", "VIII", "IX", "X"]
+    variants = [
+        lambda n: (f"Kapitel {n}: Die {rng.choice(_VOCABULARY).capitalize()}", None),
+        lambda n: (f"Chapter {roman[n % 10]}", f"Chapter {roman[n % 10]}"),
+        lambda n: (f"Teil {n}", f"Teil {n}"),
+        lambda n: (f"PART {n} Der Weg", "Der Weg"),
+        lambda n: (f"kapitel {n}:", f"kapitel {n}"),
+    ]
+    for n in range(1, 16):
+        text, title = variants[n % len(variants)](n)
+        b.chapter(text, title or text.split(": ", 1)[1])
+        for s in range(rng.randint(1, 3)):
+            if s:
+                b.separator()
+            _scene(b, rng)
+    return b
+
+
+def case_numbered_titles(rng):
+    b = DocBuilder()
+    for n in range(1, 14):
+        name = f"{rng.choice(_VOCABULARY).capitalize()} und {rng.choice(_VOCABULARY)}"
+        text = f"{n}. {name}" if n % 2 else f"{n} {name}"
+        b.chapter(text, name)
+        _scene(b, rng, 3, 8)
+    return b
+
+
+def case_separators(rng):
+    b = DocBuilder()
+    seps = ["***", "---", "___", "*****", "  ***  ", "-----"]
+    for c in range(6):
+        b.chapter(f"Kapitel {c + 1}", f"Kapitel {c + 1}", style="Heading1")
+        for s in range(5):
+            if s:
+                b.separator(rng.choice(seps))
+            _scene(b, rng, 1, 4)
+            if rng.random() < 0.3:
+                b.text("* * *")  # kein Trenner (Leerzeichen zwischen den Sternen)
+        b.separator()  # Trenner direkt vor dem nächsten Kapitel: keine leere Szene
+    return b
+
+
+def case_mixed_formatting(rng):
+    b = DocBuilder()
+    for c in range(8):
+        b.chapter(f"Kapitel {c + 1}", f"Kapitel {c + 1}", style="Heading1")
+        for _ in range(rng.randint(3, 7)):
+            kind = rng.randrange(5)
+            if kind == 0:
+                words = _sentence(rng).split(" ")
+                b.text("", runs="".join(b.run(w + " ") for w in words))
+            elif kind == 1:
+                b.text("", runs=b.run("Siehe ") + f'<w:hyperlink w:anchor="x">{b.run("den Brief")}</w:hyperlink>'
+                       + b.run(" auf dem Tisch."))
+            elif kind == 2:
+                b.text("", runs=f'{b.run("Erste Zeile")}<w:r><w:br/></w:r>{b.run("zweite Zeile")}'
+                       f'<w:r><w:tab/></w:r>{b.run("Ende.")}')
+            elif kind == 3:
+                b.table([_sentence(rng), _sentence(rng)])
+                b.text(_sentence(rng))
+            else:
+                b.empty()
+                b.text(_sentence(rng), style="Quote")
+    return b
+
+
+def case_no_chapters(rng):
+    b = DocBuilder()
+    n = 40
+    for _ in range(n):
+        b.front_matter(_sentence(rng))
+    b.chapters = [("Kapitel 1", [n])]
+    return b
+
+
+def case_headings_only(rng):
+    b = DocBuilder()
+    for c in range(10):
+        b.chapter(f"Kapitel {c + 1}", f"Kapitel {c + 1}", style="Heading1")
+    b.chapters = [("Kapitel 1", [10])]
+    return b
+
+
+def case_novel(paragraphs):
+    def build(rng):
+        b = DocBuilder()
+        b.front_matter("Roman", style="Title")
+        c = 0
+        while b.paragraphs < paragraphs:
+            c += 1
+            style = "Heading1" if c % 4 else None
+            text = f"Kapitel {c}" if style else f"Kapitel {c}: {rng.choice(_VOCABULARY).capitalize()}"
+            b.chapter(text, text if style else text.split(": ", 1)[1], style=style)
+            for s in range(rng.randint(2, 6)):
+                if s:
+                    b.separator()
+                for _ in range(rng.randint(5, 30)):
+                    if rng.random() < 0.05:
+                        b.empty()
+                    b.text(_sentence(rng, 10, 80))
+        return b
+    return build
+
+
+CASES = {
+    "heading_styles": case_heading_styles,
+    "chapter_patterns": case_chapter_patterns,
+    "numbered_titles": case_numbered_titles,
+    "separators": case_separators,
+    "mixed_formatting": case_mixed_formatting,
+    "no_chapters": case_no_chapters,
+    "headings_only": case_headings_only,
+}
+
+
+_TEMPLATE = None
+
+
+def _template():
+    """Leeres Dokument von python-docx (Styles, Content-Types, Beziehungen)"""
+    global _TEMPLATE
+    if _TEMPLATE is None:
+        from docx import Document
+        out = io.BytesIO()
+        Document().save(out)
+        _TEMPLATE = out.getvalue()
+    return _TEMPLATE
+
+
+def docx_bytes(builder):
+    """Setzt die Blöcke vor das sectPr der Vorlage und packt das ZIP neu"""
+    source = zipfile.ZipFile(io.BytesIO(_template()))
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename == "word/document.xml":
+                xml = data.decode("utf-8")
+                at = xml.index("<w:sectPr")
+                data = (xml[:at] + "".join(builder.xml) + xml[at:]).encode("utf-8")
+            target.writestr(item, data)
+    return out.getvalue()
+
+
+def build_corpus(paragraph_sizes=DEFAULT_PARAGRAPHS, seed=1):
+    """[(Name, docx-Bytes, Soll-Aufbau, Absätze)] in fester Reihenfolge"""
+    cases = dict(CASES)
+    for n in paragraph_sizes:
+        cases[f"novel_{n}"] = case_novel(n)
+    corpus = []
+    for name, build in cases.items():
+        builder = build(random.Random(f"{seed}-{name}"))
+        corpus.append((name, docx_bytes(builder), builder.expected(), builder.paragraphs))
+    return corpus
+
+
+# ---------- Messung ----------
+
+def shape(chapters):
+    """Struktur einer Parser-Ausgabe: [(Kapiteltitel, [Absätze pro Szene, …]), …]"""
+    return [(ch["title"], [s["content"].count("\n\n") + 1 for s in ch["scenes"]]) for ch in chapters]
+
+
+def parse_events(data):
+    """iter_word_events vollständig durchlaufen; (Struktur, gelesene Absätze)"""
+    stats = {}
+    chapters = []
+    for ev in word_parser.iter_word_events(io.BytesIO(data), stats):
+        if ev["type"] == "chapter":
+            chapters.append((ev["title"], []))
+        else:
+            chapters[-1][1].append(ev["content"].count("\n\n") + 1)
+    return chapters, stats["paragraphs"]
+
+
+def bench_case(name, data, expected, repeat=3, trace=True, reference_limit=2000):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        got, paragraphs = parse_events(data)
+        times.append(time.perf_counter() - started)
+    best = min(times)
+
+    peak = None
+    if trace:
+        tracemalloc.start()
+        parse_events(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    problems = []
+    rss_growth = _rss_growth_kb(data)
+    if got != expected:
+        problems.append(_first_difference("Soll-Aufbau", expected, got))
+    reference_seconds = None
+    if paragraphs <= reference_limit:
+        started = time.perf_counter()
+        reference = word_parser.parse_word_document(io.BytesIO(data))
+        reference_seconds = round(time.perf_counter() - started, 4)
+        streamed = word_parser.parse_word_document_streaming(io.BytesIO(data))
+        if streamed != reference:
+            problems.append(_first_difference("python-docx", shape(reference["chapters"]),
+                                              shape(streamed["chapters"]))
+                            or "python-docx: Inhalt oder Szenentitel weichen ab")
+
+    return {
+        "case": name,
+        "docx_bytes": len(data),
+        "paragraphs": paragraphs,
+        "chapters": len(got),
+        "scenes": sum(len(scenes) for _, scenes in got),
+        "seconds": round(best, 5),
+        "paragraphs_per_sec": round(paragraphs / best, 1) if best > 0 else None,
+        "peak_bytes": peak,
+        "rss_growth_kb": rss_growth,
+        "reference_seconds": reference_seconds,
+        "equivalent": not problems,
+        "problems": problems,
+    }
+
+
+def _status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return None
+
+
+def _allocate(kib):
+    """Kontrollfall: belegt ``kib`` KiB und fasst jede Seite an"""
+    block = bytearray(kib * 1024)
+    block[::4096] = b"x" * len(block[::4096])
+    return len(block)
+
+
+def _rss_child(work, arg, queue):
+    """
+    Läuft in einem frischen (spawn-)Prozess: parst zum Aufwärmen (Importe,
+    lxml-Initialisierung) ein kleines Dokument, setzt die RSS-Spitze (VmHWM)
+    auf den aktuellen Stand zurück, arbeitet und meldet den Anstieg der Spitze.
+    Ohne Rücksetzen (clear_refs) gäbe die Spitze nur den Prozessstart wieder.
+    """
+    parse_events(docx_bytes(case_headings_only(random.Random(0))))
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        queue.put(None)
+        return
+    start = _status_kb("VmRSS")
+    if work == "control":
+        _allocate(arg)
+    else:
+        parse_events(arg)
+    queue.put(_status_kb("VmHWM") - start)
+
+
+def _rss_growth_kb(data, work="parse"):
+    """
+    RSS-Anstieg beim Parsen (inklusive libxml2) in einem eigenen, frisch
+    gestarteten Prozess – ein geforkter Prozess erbt die Spitze des Elternprozesses.
+    None ohne procfs oder wenn sich die Spitze nicht zurücksetzen lässt.
+    """
+    if not os.path.exists("/proc/self/status"):
+        return None
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_rss_child, args=(work, data, queue))
+    proc.start()
+    try:
+        growth = queue.get(timeout=300)
+        return None if growth is None else max(0, growth)
+    finally:
+        proc.join()
+
+
+def check_rss_measurement(small_kib=8 * 1024, large_kib=64 * 1024, tolerance=0.25):
+    """
+    Kontrollfälle mit bekannter Allokation: die gemessenen Anstiege müssen
+    sich um etwa ``large_kib - small_kib`` unterscheiden. Gibt eine
+    Fehlermeldung zurück oder None (auch wenn nicht messbar).
+    """
+    small = _rss_growth_kb(small_kib, "control")
+    large = _rss_growth_kb(large_kib, "control")
+    if small is None or large is None:
+        return None
+    expected = large_kib - small_kib
+    if abs((large - small) - expected) > expected * tolerance:
+        return (f"RSS-Messung unplausibel: Kontrollfälle {small_kib} / {large_kib} KiB "
+                f"ergeben +{small} / +{large} KiB")
+    return None
+
+
+def _first_difference(label, expected, got):
+    if expected == got:
+        return None
+    if len(expected) != len(got):
+        return f"{label}: {len(got)} Kapitel statt {len(expected)}"
+    for i, (want, have) in enumerate(zip(expected, got)):
+        if want != have:
+            return f"{label}: Kapitel {i + 1} ist {have!r}, erwartet {want!r}"
+    return f"{label}: abweichend"
+
+
+def gate(results, baseline, max_regression, min_paragraphs=GATE_MIN_PARAGRAPHS, min_seconds=GATE_MIN_SECONDS):
+    """
+    Fehlermeldungen für Durchsatz-Einbrüche gegenüber der Baseline. Gegated
+    werden nur Fälle mit mindestens ``min_paragraphs`` Absätzen oder
+    ``min_seconds`` Laufzeit (in der Baseline) – bei den kleinen Korpus-
+    Dateien ist der Durchsatz Rauschen. Fehlt ein Fall der Baseline im Lauf,
+    schlägt das Gate fehl.
+    """
+    runs = {r["case"]: r for r in results["runs"]}
+    failures = []
+    print()
+    for before in baseline.get("runs", []):
+        case = before["case"]
+        run = runs.get(case)
+        if run is None:
+            print(f"  {case:<18} FEHLT")
+            failures.append(f"{case}: in der Baseline, aber nicht im Lauf")
+            continue
+        if not before.get("paragraphs_per_sec") or not run["paragraphs_per_sec"]:
+            print(f"  {case:<18} KEIN DURCHSATZ")
+            failures.append(f"{case}: kein Durchsatz gemessen (Baseline oder Lauf)")
+            continue
+        ratio = run["paragraphs_per_sec"] / before["paragraphs_per_sec"]
+        line = (f"  {case:<18} {before['paragraphs_per_sec']:>10.0f} -> "
+                f"{run['paragraphs_per_sec']:>10.0f} Absätze/s  ({ratio:.2f}x)")
+        if before.get("peak_bytes") and run.get("peak_bytes"):
+            line += f"  peak {before['peak_bytes'] // 1024} -> {run['peak_bytes'] // 1024} KiB"
+        if before.get("rss_growth_kb") is not None and run.get("rss_growth_kb") is not None:
+            line += f"  rss +{before['rss_growth_kb']} -> +{run['rss_growth_kb']} KiB"
+        if before.get("paragraphs", 0) < min_paragraphs and before.get("seconds", 0) < min_seconds:
+            line += "  (zu klein, nicht gegated)"
+        elif ratio < 1 - max_regression:
+            line += "  REGRESSION"
+            failures.append(f"{case}: Durchsatz {ratio:.2f}x der Baseline "
+                            f"(erlaubt ab {1 - max_regression:.2f}x)")
+        print(line)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Word-Parser-Benchmark mit generiertem .docx-Korpus")
+    parser.add_argument("--paragraphs", type=int, nargs="*", default=list(DEFAULT_PARAGRAPHS),
+                        help="Größen der novel_<N>-Dokumente")
+    parser.add_argument("--cases", nargs="+", help="nur diese Fälle (Namen wie in der Ausgabe)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--reference-limit", type=int, default=2000,
+                        help="bis zu dieser Absatzzahl zusätzlich gegen python-docx prüfen")
+    parser.add_argument("--out", default="word_parser_bench.json")
+    parser.add_argument("--baseline", help="früheres Ergebnis zum Vergleich")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="erlaubter Durchsatz-Verlust gegenüber der Baseline (Anteil)")
+    parser.add_argument("--gate-min-paragraphs", type=int, default=GATE_MIN_PARAGRAPHS,
+                        help="nur Fälle ab dieser Absatzzahl gaten (oder ab --gate-min-seconds)")
+    parser.add_argument("--gate-min-seconds", type=float, default=GATE_MIN_SECONDS,
+                        help="nur Fälle ab dieser Laufzeit gaten (oder ab --gate-min-paragraphs)")
+    parser.add_argument("--corpus-dir", help="erzeugte .docx-Dateien hier ablegen")
+    parser.add_argument("--no-tracemalloc", action="store_true")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.paragraphs, args.seed)
+    if args.cases:
+        corpus = [c for c in corpus if c[0] in args.cases]
+    if args.corpus_dir:
+        os.makedirs(args.corpus_dir, exist_ok=True)
+        for name, data, _, _ in corpus:
+            with open(os.path.join(args.corpus_dir, f"{name}.docx"), "wb") as f:
+                f.write(data)
+
+    # lxml/python-docx vorab laden, damit der Import nicht in die erste Messung fällt
+    parse_events(corpus[0][1])
+
+    import lxml.etree
+    results = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "lxml": ".".join(map(str, lxml.etree.LXML_VERSION)),
+            "platform": platform.platform(),
+            "tracemalloc": not args.no_tracemalloc,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "runs": [],
+    }
+    failures = []
+    problem = check_rss_measurement()
+    if problem:
+        failures.append(problem)
+    for name, data, expected, _ in corpus:
+        run = bench_case(name, data, expected, args.repeat, not args.no_tracemalloc, args.reference_limit)
+        results["runs"].append(run)
+        peak = f"{run['peak_bytes'] // 1024:>7} KiB" if run["peak_bytes"] is not None else "      –    "
+        if run["rss_growth_kb"] is not None:
+            peak += f"  rss +{run['rss_growth_kb']} KiB"
+        ref = f"  python-docx {run['reference_seconds']:.2f}s" if run["reference_seconds"] is not None else ""
+        print(f"{name:<18} {run['paragraphs']:>6} Absätze {run['chapters']:>4} Kapitel {run['scenes']:>5} Szenen "
+              f"{run['seconds']:>8.4f}s {run['paragraphs_per_sec']:>10.0f}/s  peak {peak}"
+              f"  {'ok' if run['equivalent'] else 'ABWEICHUNG'}{ref}", flush=True)
+        failures += [f"{name}: {p}" for p in run["problems"]]
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"\nErgebnisse: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if args.cases:
+            # Bewusst ausgelassene Fälle fehlen nicht
+            baseline["runs"] = [r for r in baseline.get("runs", []) if r["case"] in args.cases]
+        failures += gate(results, baseline, args.max_regression,
+                         args.gate_min_paragraphs, args.gate_min_seconds)
+
+    if failures:
+        print("\nFEHLGESCHLAGEN:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# backend/context_packer.py
+"""
+Token-Budget für den Schreibgeist-Kontext.
+
+Der Kontext (aktuelle Szene, Charakter-/Ortsprofile, getaggte Szenen) wächst
+mit dem Buch; ungebremst zusammengeklebt sprengt er bei großen Projekten das
+Kontextfenster und macht jeden Call teuer. Der Packer
+
+1. schätzt die Tokens jedes Kandidaten-Blocks (Zeichen / CHARS_PER_TOKEN),
+2. bewertet ihn nach Relevanz zur letzten User-Nachricht (Wortüberlappung)
+   und Aktualität (zuletzt bearbeitet),
+3. füllt das Budget in dieser Reihenfolge – feste Blöcke (Profile, aktuelle
+   Szene) zuerst – und kürzt Blöcke, die nicht mehr ganz passen, an
+   Absatzgrenzen auf die relevantesten Absätze (Auszug),
+4. gibt die Blöcke in ihrer ursprünglichen Reihenfolge zurück, zusammen mit
+   einem Bericht, was vollständig, gekürzt oder gar nicht enthalten ist.
+
+Die Tokenschätzung ist bewusst grob (kein Tokenizer-Aufruf); sie muss nur
+die Größenordnung treffen, damit das Budget hält.
+"""
+import math
+import re
+
+CHARS_PER_TOKEN = 3.5
+# Kleinere Reste lohnen keinen Auszug mehr
+MIN_EXCERPT_TOKENS = 120
+GAP = "[…]"
+
+_WORD_RE = re.compile(r"\w{3,}", re.UNICODE)
+_PARA_RE = re.compile(r"\n\s*\n")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s+")
+
+# Häufige Füllwörter, die nichts über Relevanz aussagen
+STOPWORDS = frozenset("""
+aber alle als auch auf aus bei bin bis das dass dem den der des die dies diese
+dir doch dort du ein eine einem einen einer eines er es für hat hatte ich ihm
+ihn ihr ist kann mein mich mir mit nach nicht noch nun nur oder schon sein sich
+sie sind so über und uns unter vom von vor war was weil wenn wie wir wird wo zu
+zum zur and are but for from has have her his its not that the this was were
+what when which who will with you your
+""".split())
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def terms(text):
+    return {w for w in _WORD_RE.findall((text or "").lower()) if w not in STOPWORDS}
+
+
+def relevance(query_terms, text):
+    """Anteil der Suchbegriffe, die im Text vorkommen (0..1)"""
+    if not query_terms:
+        return 0.0
+    return len(query_terms & terms(text)) / len(query_terms)
+
+
+class Block:
+    """
+    Ein Kandidat für den Kontext. ``header`` bleibt immer vollständig,
+    ``body`` darf gekürzt werden. ``pinned`` Blöcke werden vor allen
+    anderen eingeplant; ``recency`` liegt zwischen 0 (alt) und 1 (neu);
+    ``max_tokens`` begrenzt einen Block auch dann, wenn das Budget reicht;
+    ``stable`` Blöcke werden unabhängig von der Anfrage gekürzt (Prompt-Cache).
+    """
+
+    def __init__(self, kind, key, title, header, body="", recency=0.0, pinned=False, max_tokens=None,
+                 stable=False):
+        self.kind = kind
+        self.key = key
+        self.title = title
+        self.header = header
+        self.body = body or ""
+        self.recency = recency
+        self.pinned = pinned
+        self.max_tokens = max_tokens
+        self.stable = stable
+        self.score = 0.0
+
+    def render(self, body=None):
+        body = self.body if body is None else body
+        return f"{self.header}\n{body}" if body else self.header
+
+
+def _cut_words(text, max_tokens):
+    """Schneidet einen einzelnen Absatz an Satz-, notfalls an Wortgrenzen"""
+    limit = int(max_tokens * CHARS_PER_TOKEN)
+    if len(text) <= limit:
+        return text
+    out = ""
+    for sentence in _SENTENCE_END_RE.split(text):
+        if len(out) + len(sentence) + 1 > limit:
+            break
+        out = f"{out} {sentence}" if out else sentence
+    if not out:
+        out = text[:limit].rsplit(" ", 1)[0]
+    return f"{out} {GAP}"
+
+
+def excerpt(body, max_tokens, query_terms):
+    """
+    Auszug aus ``body`` mit höchstens ``max_tokens``: der erste Absatz plus
+    die relevantesten weiteren, in Originalreihenfolge; Lücken als „[…]“.
+    """
+    paragraphs = [p.strip() for p in _PARA_RE.split(body) if p.strip()]
+    if not paragraphs:
+        return ""
+    ranked = [0] + sorted(
+        range(1, len(paragraphs)),
+        key=lambda i: (-relevance(query_terms, paragraphs[i]), i),
+    )
+    chosen = {}
+    used = 0
+    gap_tokens = estimate_tokens(GAP) + 1
+    for i in ranked:
+        cost = estimate_tokens(paragraphs[i]) + gap_tokens
+        if used + cost <= max_tokens:
+            chosen[i] = paragraphs[i]
+            used += cost
+        elif max_tokens - used - 2 * gap_tokens >= MIN_EXCERPT_TOKENS // 2:
+            # Der wichtigste Absatz, der nicht mehr ganz passt, wird angeschnitten
+            chosen[i] = _cut_words(paragraphs[i], max_tokens - used - 2 * gap_tokens)
+            used = max_tokens
+    if not chosen:
+        return ""
+
+    parts = []
+    last = -1
+    for i in sorted(chosen):
+        if i != last + 1:
+            parts.append(GAP)
+        parts.append(chosen[i])
+        last = i
+    if last != len(paragraphs) - 1:
+        parts.append(GAP)
+    return "\n\n".join(parts)
+
+
+def pack(blocks, budget, query, relevance_weight=0.7):
+    """
+    Wählt Blöcke für ``budget`` Tokens aus.
+    Rückgabe: ([(Block, Text), ...] in Originalreihenfolge, Bericht)
+    """
+    query_terms = terms(query)
+    for b in blocks:
+        b.score = (relevance_weight * relevance(query_terms, b.title + " " + b.body)
+                   + (1 - relevance_weight) * b.recency)
+
+    # Feste Blöcke zuerst, davon die gedeckelten (Profile) vor den offenen (aktuelle Szene),
+    # damit eine riesige aktuelle Szene die Profile nicht verdrängt
+    order = sorted(range(len(blocks)), key=lambda i: (
+        not blocks[i].pinned, blocks[i].max_tokens is None, -blocks[i].score, i,
+    ))
+    remaining = budget
+    rendered = {}
+    report = []
+    for i in order:
+        b = blocks[i]
+        full = b.render()
+        cost = estimate_tokens(full)
+        status = "full"
+        allowed = remaining if b.max_tokens is None else min(remaining, b.max_tokens)
+        if cost > allowed:
+            body_budget = allowed - estimate_tokens(b.header) - 1
+            body_terms = set() if b.stable else query_terms
+            body = excerpt(b.body, body_budget, body_terms) if body_budget >= MIN_EXCERPT_TOKENS else ""
+            if body:
+                full = b.render(body)
+                cost = estimate_tokens(full)
+                status = "excerpt"
+            else:
+                full, cost, status = None, 0, "omitted"
+        if full is not None:
+            rendered[i] = full
+            remaining -= cost
+        report.append({
+            "kind": b.kind,
+            "id": b.key,
+            "title": b.title,
+            "status": status,
+            "tokens": cost,
+            "full_tokens": estimate_tokens(b.render()),
+            "score": round(b.score, 3),
+        })
+
+    report.sort(key=lambda r: (r["status"] == "omitted", -r["score"]))
+    return [(blocks[i], rendered[i]) for i in sorted(rendered)], {
+        "budget": budget,
+        "used": budget - remaining,
+        "blocks": report,
+    }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# backend/fake_anthropic.py
+"""
+Lokaler Fake der Anthropic Messages API für Entwicklung und Tests –
+ohne API-Key, ohne Kosten, mit reproduzierbaren Antworten.
+
+    python fake_anthropic.py --port 8765 --reply "Hallo <scene>Es war Nacht.</scene>"
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=fake python app.py
+
+Unterstützt POST /v1/messages mit und ohne ``"stream": true``. Beim
+Streaming wird die Antwort in Chunks mit Pause gesendet; bricht der Client
+ab (z.B. weil der Browser die SSE-Verbindung schließt und das Backend den
+Upstream-Stream abbricht), wird das geloggt.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeAnthropicHandler(BaseHTTPRequestHandler):
+    reply = "Hallo vom Fake-Schreibgeist."
+    chunk_size = 8
+    delay = 0.05
+    # Zähler für Tests: abgebrochene Streams
+    cancelled = 0
+    requests = 0
+    _lock = threading.Lock()
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _usage(self, body):
+        input_tokens = len(json.dumps(body.get("system", "")) + json.dumps(body.get("messages", []))) // 4
+        return {"input_tokens": input_tokens, "output_tokens": max(1, len(self.reply) // 4),
+                "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0}
+
+    def do_POST(self):
+        if not self.path.startswith("/v1/messages"):
+            self.send_error(404)
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with self._lock:
+            type(self).requests += 1
+        if body.get("stream"):
+            self._stream(body)
+        else:
+            self._complete(body)
+
+    def _message(self, body, text, usage):
+        return {
+            "id": "msg_fake", "type": "message", "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": [{"type": "text", "text": text}] if text is not None else [],
+            "stop_reason": "end_turn" if text is not None else None,
+            "stop_sequence": None, "usage": usage,
+        }
+
+    def _complete(self, body):
+        payload = json.dumps(self._message(body, self.reply, self._usage(body))).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _event(self, name, data):
+        self.wfile.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def _stream(self, body):
+        usage = self._usage(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            start_usage = dict(usage, output_tokens=0)
+            self._event("message_start", {"type": "message_start",
+                                          "message": self._message(body, None, start_usage)})
+            self._event("content_block_start", {"type": "content_block_start", "index": 0,
+                                                "content_block": {"type": "text", "text": ""}})
+            for i in range(0, len(self.reply), self.chunk_size):
+                time.sleep(self.delay)
+                self._event("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": self.reply[i:i + self.chunk_size]},
+                })
+            self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+            self._event("message_delta", {"type": "message_delta",
+                                          "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                          "usage": {"output_tokens": usage["output_tokens"]}})
+            self._event("message_stop", {"type": "message_stop"})
+        except (BrokenPipeError, ConnectionResetError):
+            with self._lock:
+                type(self).cancelled += 1
+            print("[FakeAnthropic] Client hat den Stream abgebrochen", flush=True)
+
+
+def serve(port=8765, reply=None, chunk_size=None, delay=None):
+    """Startet den Fake-Server im Hintergrund, gibt den Server zurück (für Tests)"""
+    handler = type("Handler", (FakeAnthropicHandler,), {})
+    if reply is not None:
+        handler.reply = reply
+    if chunk_size is not None:
+        handler.chunk_size = chunk_size
+    if delay is not None:
+        handler.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.handler = handler
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake Anthropic Messages API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--reply", default=None, help="Antworttext des Modells")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--delay", type=float, default=None, help="Pause pro Chunk in Sekunden")
+    args = parser.parse_args(argv)
+    server = serve(args.port, args.reply, args.chunk_size, args.delay)
+    print(f"Fake Anthropic API auf http://127.0.0.1:{server.server_address[1]}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
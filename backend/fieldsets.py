@@ -0,0 +1,66 @@
+# backend/fieldsets.py
+"""
+Sparse Fieldsets für List- und Get-Endpoints.
+
+    GET /api/chapters/12/scenes?fields=id,title,status
+    GET /api/projects/3/characters?exclude=profile,gallery
+
+Die Auswahl wird bis in die SELECT-Spaltenliste durchgereicht – nicht
+angeforderte Spalten (z.B. scene.content) werden gar nicht erst gelesen.
+Ohne Parameter liefert jeder Endpoint exakt die bisherigen Felder.
+``id`` ist immer enthalten.
+"""
+
+
+class FieldsetError(ValueError):
+    """Unbekanntes Feld in ?fields= / ?exclude="""
+
+
+class Field:
+    """Ein Ausgabefeld: Quellspalte + optionale Umwandlung des DB-Werts"""
+    __slots__ = ("column", "transform")
+
+    def __init__(self, column, transform=None):
+        self.column = column
+        self.transform = transform
+
+
+def _split(value):
+    return [f.strip() for f in (value or "").split(",") if f.strip()]
+
+
+def parse_fields(args, spec, default):
+    """
+    Liest ?fields= / ?exclude= und gibt die Feldnamen in Ausgabereihenfolge
+    zurück. ``default`` ist die bisherige Ausgabe des Endpoints, ``spec`` alle
+    erlaubten Felder (darf mehr enthalten als ``default``).
+    """
+    requested = _split(args.get("fields"))
+    excluded = _split(args.get("exclude"))
+    for name in requested + excluded:
+        if name not in spec:
+            raise FieldsetError(f"unknown_field: {name}")
+
+    if requested:
+        names = [name for name in spec if name in requested]
+    else:
+        names = list(default)
+    names = [name for name in names if name not in excluded or name == "id"]
+    if "id" in spec and "id" not in names:
+        names.insert(0, "id")
+    return names
+
+
+def select_columns(spec, names):
+    """Spalten für select(), je Feld benannt (label) nach dem Ausgabefeld"""
+    return [spec[name].column.label(name) for name in names]
+
+
+def render(row, spec, names):
+    """Row (mit den Labels aus select_columns) -> Ausgabe-Dict"""
+    out = {}
+    for name in names:
+        value = row[name]
+        transform = spec[name].transform
+        out[name] = transform(value) if transform else value
+    return out
@@ -0,0 +1,365 @@
+# backend/jobs.py
+"""
+Hintergrund-Ausführung für LLM-Endpoints (Schreibgeist, Charakter-Extraktion,
+Kapiteltitel), den PDF-Export und den Word-Import.
+
+Statt den Request-Thread für einen mehrsekündigen Anthropic-Call zu
+blockieren, können die Endpoints (mit ``?async=1``) die Arbeit an einen
+begrenzten Thread-Pool geben und sofort eine Job-ID liefern. Status und
+Ergebnis liegen in der Tabelle ``llm_job`` – so findet ``GET /api/jobs/<id>``
+den Job auch dann, wenn der Poll bei einem anderen Gunicorn-Worker landet.
+
+Grenzen (per ENV, siehe runner_from_env):
+- LLM_JOB_WORKERS       Threads pro Prozess
+- LLM_JOB_QUEUE         max. wartende Jobs pro Prozess (sonst 503 job_queue_full)
+- LLM_JOB_PER_USER      gleichzeitig offene Jobs pro User (sonst 429 too_many_jobs)
+- LLM_JOB_TIMEOUT       Sekunden ab Einreichen; danach ist der Job timed_out
+                        und ein spät eintreffendes Ergebnis wird verworfen
+- LLM_JOB_RETENTION     Sekunden, die fertige Jobs abrufbar bleiben
+- LLM_JOB_KEEP_PER_USER max. aufbewahrte fertige Jobs pro User
+
+Abbrechen setzt den Status sofort; ein noch wartender Job startet nicht
+mehr, ein laufender Anthropic-Call läuft zu Ende, sein Ergebnis wird aber
+verworfen.
+
+Lange Jobs (PDF-Export, Word-Import) melden Fortschritt über ``progress`` (Spalte
+progress_json, höchstens alle ``progress_interval`` Sekunden geschrieben);
+ist der Job inzwischen abgebrochen oder abgelaufen, bricht die Meldung den
+Job mit JobAborted ab.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.exc import OperationalError
+
+
+OPEN_STATES = ("queued", "running")
+FINAL_STATES = ("succeeded", "failed", "cancelled", "timed_out")
+
+
+class JobLimitExceeded(Exception):
+    """User hat bereits LLM_JOB_PER_USER offene Jobs"""
+
+
+class JobQueueFull(Exception):
+    """Die Warteschlange dieses Prozesses ist voll"""
+
+
+class JobAborted(Exception):
+    """Job wurde während der Ausführung abgebrochen oder ist abgelaufen"""
+
+
+def _iso(v):
+    if v is None:
+        return None
+    if isinstance(v, str):
+        return v
+    return v.isoformat()
+
+
+class ProgressReporter:
+    """
+    ``progress(data, force=False)``: schreibt den Fortschritt (gedrosselt);
+    wirft JobAborted, wenn der Job nicht mehr läuft. Braucht nur Engine und
+    Job-ID – ein Worker-Prozess kann sich mit eigener Engine einen bauen.
+    """
+
+    def __init__(self, engine, job_id, interval=0.5, deadline=None):
+        self.engine = engine
+        self.job_id = job_id
+        self.interval = float(interval)
+        self.deadline = deadline
+        self._last = 0.0
+
+    def remaining(self):
+        """Sekunden bis zur Deadline des Jobs (None, wenn unbekannt)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, (self.deadline - datetime.utcnow()).total_seconds())
+
+    def __call__(self, data, force=False):
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        try:
+            with self.engine.begin() as conn:
+                updated = conn.execute(text("""
+                    UPDATE llm_job SET progress_json = :progress
+                    WHERE id = :id AND status = 'running' AND deadline > :now
+                """), {"id": self.job_id, "progress": json.dumps(data, ensure_ascii=False),
+                       "now": datetime.utcnow()}).rowcount
+        except OperationalError as e:
+            # Fortschritt ist nur Anzeige – z.B. SQLite-Sperre durch eine laufende Schreib-Transaktion
+            print(f"[Jobs] Fortschritt für Job {self.job_id} nicht gespeichert: {e.orig}", flush=True)
+            return
+        if not updated:
+            raise JobAborted()
+
+    def check(self, conn):
+        """
+        Prüft auf ``conn`` (in der Transaktion des Aufrufers, direkt vor dem
+        Commit), ob der Job noch läuft und nicht abgelaufen ist; sonst
+        JobAborted. Auf Postgres bleibt die Job-Zeile bis zum Commit gesperrt.
+        """
+        lock = " FOR UPDATE" if conn.dialect.name == "postgresql" else ""
+        alive = conn.execute(text(f"""
+            SELECT 1 FROM llm_job
+            WHERE id = :id AND status = 'running' AND deadline > :now{lock}
+        """), {"id": self.job_id, "now": datetime.utcnow()}).first()
+        if alive is None:
+            raise JobAborted()
+
+
+class JobRunner:
+    def __init__(self, engine, max_workers=4, max_queue=32, per_user=2, timeout=180.0,
+                 retention=3600.0, keep_per_user=50, kinds=None, progress_interval=0.5,
+                 thread_name_prefix="llm-job"):
+        self.engine = engine
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.per_user = per_user
+        self.timeout = float(timeout)
+        self.retention = float(retention)
+        self.keep_per_user = keep_per_user
+        # Nur Jobs dieser Arten zählen gegen per_user (None = alle)
+        self.kinds = tuple(kinds) if kinds else None
+        self.progress_interval = float(progress_interval)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+
+    # ---------- Einreichen ----------
+
+    def submit(self, user_id, kind, fn, with_progress=False, on_done=None):
+        """
+        Reiht ``fn() -> (body, status_code)`` ein und gibt die Job-ID zurück.
+        Mit ``with_progress`` wird ``fn(progress)`` aufgerufen, siehe ProgressReporter.
+        ``on_done()`` läuft, sobald der Job vorbei ist – auch wenn er abgebrochen
+        wurde, bevor er startete (Aufräumen von Dateien o.ä.).
+        ``fn`` darf weder Request-Kontext noch DB-Session benutzen.
+        """
+        now = datetime.utcnow()
+        with self._lock:
+            if len(self._futures) >= self.max_queue + self.max_workers:
+                self.rejected += 1
+                raise JobQueueFull()
+        with self.engine.begin() as conn:
+            self._prune(conn, user_id, now)
+            count, params = self._own_kinds("""
+                SELECT COUNT(*) FROM llm_job
+                WHERE user_id = :uid AND status IN ('queued', 'running') AND deadline > :now
+            """, {"uid": user_id, "now": now})
+            open_jobs = conn.execute(count, params).scalar()
+            if open_jobs >= self.per_user:
+                self.rejected += 1
+                raise JobLimitExceeded()
+            job_id = uuid.uuid4().hex
+            deadline = now + timedelta(seconds=self.timeout)
+            conn.execute(text("""
+                INSERT INTO llm_job (id, user_id, kind, status, created_at, deadline)
+                VALUES (:id, :uid, :kind, 'queued', :now, :deadline)
+            """), {"id": job_id, "uid": user_id, "kind": kind, "now": now, "deadline": deadline})
+        with self._lock:
+            future = self._executor.submit(self._run, job_id, fn, with_progress, deadline)
+            self._futures[job_id] = future
+            self.submitted += 1
+        if on_done is not None:
+            future.add_done_callback(lambda _: self._call_done(job_id, on_done))
+        return job_id
+
+    @staticmethod
+    def _call_done(job_id, on_done):
+        try:
+            on_done()
+        except Exception as e:
+            print(f"[Jobs] Aufräumen nach Job {job_id} fehlgeschlagen: {e}", flush=True)
+
+    def _run(self, job_id, fn, with_progress=False, deadline=None):
+        try:
+            with self.engine.begin() as conn:
+                started = conn.execute(text("""
+                    UPDATE llm_job SET status = 'running', started_at = :now
+                    WHERE id = :id AND status = 'queued' AND deadline > :now
+                """), {"id": job_id, "now": datetime.utcnow()}).rowcount
+            if not started:
+                return  # abgebrochen oder schon abgelaufen
+            try:
+                body, status_code = fn(self._reporter(job_id, deadline)) if with_progress else fn()
+                state = "succeeded" if status_code < 400 else "failed"
+            except JobAborted:
+                return
+            except Exception as e:
+                body, status_code, state = {"error": f"job_error: {str(e)[:200]}"}, 500, "failed"
+            with self.engine.begin() as conn:
+                # Nur übernehmen, wenn der Job nicht inzwischen abgebrochen wurde/abgelaufen ist
+                conn.execute(text("""
+                    UPDATE llm_job
+                    SET status = :state, result_json = :result, status_code = :code, finished_at = :now
+                    WHERE id = :id AND status = 'running' AND deadline > :now
+                """), {"id": job_id, "state": state, "code": status_code,
+                       "result": json.dumps(body, ensure_ascii=False), "now": datetime.utcnow()})
+        except Exception as e:
+            print(f"[Jobs] Job {job_id} fehlgeschlagen: {e}", flush=True)
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+
+    def _reporter(self, job_id, deadline=None):
+        return ProgressReporter(self.engine, job_id, self.progress_interval, deadline)
+
+    # ---------- Abfragen / Abbrechen ----------
+
+    def get(self, job_id, user_id):
+        """Job des Users als Dict oder None"""
+        with self.engine.begin() as conn:
+            self._expire(conn, job_id)
+            row = conn.execute(text("""
+                SELECT id, kind, status, result_json, progress_json, status_code,
+                       created_at, started_at, finished_at
+                FROM llm_job WHERE id = :id AND user_id = :uid
+            """), {"id": job_id, "uid": user_id}).mappings().first()
+        if not row:
+            return None
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "status_code": row["status_code"],
+            "result": json.loads(row["result_json"]) if row["result_json"] else None,
+            "progress": json.loads(row["progress_json"]) if row["progress_json"] else None,
+            "created_at": _iso(row["created_at"]),
+            "started_at": _iso(row["started_at"]),
+            "finished_at": _iso(row["finished_at"]),
+        }
+
+    def cancel(self, job_id, user_id):
+        with self.engine.begin() as conn:
+            conn.execute(text("""
+                UPDATE llm_job SET status = 'cancelled', finished_at = :now
+                WHERE id = :id AND user_id = :uid AND status IN ('queued', 'running')
+            """), {"id": job_id, "uid": user_id, "now": datetime.utcnow()})
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.cancel()  # greift nur, solange der Job noch wartet
+        return self.get(job_id, user_id)
+
+    def _expire(self, conn, job_id):
+        conn.execute(text("""
+            UPDATE llm_job SET status = 'timed_out', finished_at = :now
+            WHERE id = :id AND status IN ('queued', 'running') AND deadline <= :now
+        """), {"id": job_id, "now": datetime.utcnow()})
+
+    def _prune(self, conn, user_id, now):
+        conn.execute(text("""
+            UPDATE llm_job SET status = 'timed_out', finished_at = :now
+            WHERE user_id = :uid AND status IN ('queued', 'running') AND deadline <= :now
+        """), {"uid": user_id, "now": now})
+        # Aufbewahrung und Limit gelten pro Runner: nur die eigenen Job-Arten löschen
+        conn.execute(*self._own_kinds("""
+            DELETE FROM llm_job
+            WHERE status NOT IN ('queued', 'running') AND finished_at < :cutoff
+        """, {"cutoff": now - timedelta(seconds=self.retention)}))
+        kinds = "AND kind IN :kinds" if self.kinds else ""
+        conn.execute(*self._own_kinds(f"""
+            DELETE FROM llm_job
+            WHERE user_id = :uid AND status NOT IN ('queued', 'running') {kinds}
+              AND id NOT IN (
+                  SELECT id FROM (
+                      SELECT id FROM llm_job
+                      WHERE user_id = :uid AND status NOT IN ('queued', 'running') {kinds}
+                      ORDER BY created_at DESC
+                      LIMIT :keep
+                  ) newest
+              )
+        """, {"uid": user_id, "keep": self.keep_per_user}, append=False))
+
+    def _own_kinds(self, sql, params, append=True):
+        """
+        (Statement, Parameter) eingeschränkt auf die Job-Arten dieses Runners.
+        Mit ``append`` wird ``AND kind IN :kinds`` angehängt, sonst steht
+        ``:kinds`` schon im SQL.
+        """
+        if not self.kinds:
+            return text(sql), params
+        if append:
+            sql += " AND kind IN :kinds"
+        return (text(sql).bindparams(bindparam("kinds", expanding=True)),
+                dict(params, kinds=list(self.kinds)))
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._futures)
+        return {"workers": self.max_workers, "pending": pending, "submitted": self.submitted,
+                "rejected": self.rejected}
+
+
+def runner_from_env(engine, kinds=None):
+    return JobRunner(
+        engine,
+        kinds=kinds,
+        max_workers=int(os.getenv("LLM_JOB_WORKERS", "4")),
+        max_queue=int(os.getenv("LLM_JOB_QUEUE", "32")),
+        per_user=int(os.getenv("LLM_JOB_PER_USER", "2")),
+        timeout=float(os.getenv("LLM_JOB_TIMEOUT", "180")),
+        retention=float(os.getenv("LLM_JOB_RETENTION", "3600")),
+        keep_per_user=int(os.getenv("LLM_JOB_KEEP_PER_USER", "50")),
+    )
+
+
+def pdf_runner_from_env(engine):
+    """PDF-Export-Jobs: eigene Threads und Grenzen (PDF_JOB_*), gleiche Tabelle"""
+    return JobRunner(
+        engine,
+        max_workers=int(os.getenv("PDF_JOB_WORKERS", "1")),
+        max_queue=int(os.getenv("PDF_JOB_QUEUE", "8")),
+        per_user=int(os.getenv("PDF_JOB_PER_USER", "1")),
+        timeout=float(os.getenv("PDF_JOB_TIMEOUT", "900")),
+        retention=float(os.getenv("PDF_JOB_RETENTION", "3600")),
+        keep_per_user=int(os.getenv("LLM_JOB_KEEP_PER_USER", "50")),
+        kinds=("pdf_export",),
+        thread_name_prefix="pdf-job",
+    )
+
+
+def import_runner_from_env(engine):
+    """
+    Word-Import-Jobs (IMPORT_JOB_*): jeder Thread wartet auf einen Import in
+    einem eigenen Prozess (siehe word_import.ImportPool), mehrere Dateien eines
+    Users laufen so echt parallel
+    """
+    return JobRunner(
+        engine,
+        max_workers=int(os.getenv("IMPORT_JOB_WORKERS", "2")),
+        max_queue=int(os.getenv("IMPORT_JOB_QUEUE", "16")),
+        per_user=int(os.getenv("IMPORT_JOB_PER_USER", "3")),
+        timeout=float(os.getenv("IMPORT_JOB_TIMEOUT", "1800")),
+        retention=float(os.getenv("IMPORT_JOB_RETENTION", "3600")),
+        keep_per_user=int(os.getenv("LLM_JOB_KEEP_PER_USER", "50")),
+        kinds=("word_import",),
+        thread_name_prefix="import-job",
+    )
+
+
+def mention_runner_from_env(engine):
+    """Neuaufbau des Erwähnungs-Index nach Charakteränderungen (MENTION_JOB_*)"""
+    return JobRunner(
+        engine,
+        max_workers=int(os.getenv("MENTION_JOB_WORKERS", "1")),
+        max_queue=int(os.getenv("MENTION_JOB_QUEUE", "64")),
+        per_user=int(os.getenv("MENTION_JOB_PER_USER", "4")),
+        timeout=float(os.getenv("MENTION_JOB_TIMEOUT", "600")),
+        retention=float(os.getenv("MENTION_JOB_RETENTION", "600")),
+        keep_per_user=int(os.getenv("LLM_JOB_KEEP_PER_USER", "50")),
+        kinds=("mention_index",),
+        thread_name_prefix="mention-job",
+    )
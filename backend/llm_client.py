@@ -0,0 +1,256 @@
+# backend/llm_client.py
+"""
+Prozessweiter Anthropic-Client für alle KI-Routen.
+
+Statt pro Request ``anthropic.Anthropic(api_key=...)`` neu zu bauen (neuer
+Connection-Pool, neuer TLS-Handshake), teilen sich alle Routen einen Client
+pro API-Key; das SDK hält die HTTP-Verbindungen per Keep-Alive offen.
+
+Zusätzlich:
+- globales Limit gleichzeitiger Calls und ein Semaphore pro Modell; wer
+  länger als LLM_ACQUIRE_TIMEOUT auf einen Platz wartet, bekommt LlmUnavailable
+- Circuit Breaker: häufen sich Upstream-Fehler oder langsame Antworten im
+  Zeitfenster, schlagen Calls für LLM_BREAKER_COOLDOWN Sekunden sofort fehl
+  (LlmUnavailable("circuit_open")), danach lässt ein Probe-Call den Breaker
+  wieder schließen
+- Metriken (in-flight, Wartezeit auf einen Platz, Fehler) über metrics()
+
+Base-URL: ANTHROPIC_BASE_URL (z.B. fake_anthropic.py für lokale Tests).
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class LlmUnavailable(Exception):
+    """Call wurde nicht ausgeführt (Breaker offen oder kein freier Platz)"""
+
+
+def _is_upstream_failure(exc):
+    """Zählt für den Breaker: Verbindungsfehler, Timeouts, 429 und 5xx – keine 4xx des Clients"""
+    try:
+        import anthropic
+    except ImportError:
+        return True
+    if isinstance(exc, anthropic.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return isinstance(exc, anthropic.APIError)
+
+
+class CircuitBreaker:
+    def __init__(self, failures=5, window=60.0, slow_seconds=30.0, cooldown=30.0):
+        self.failures = failures
+        self.window = float(window)
+        self.slow_seconds = float(slow_seconds)
+        self.cooldown = float(cooldown)
+        self.state = "closed"
+        self.opened_at = None
+        self.trips = 0
+        self._events = deque()  # Zeitstempel schlechter Calls (Fehler oder langsam)
+        self._probe = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe:
+                self._probe = True
+                return True
+            return False
+
+    def record(self, ok, latency):
+        now = time.monotonic()
+        bad = not ok or latency > self.slow_seconds
+        with self._lock:
+            if self.state == "half_open":
+                self._probe = False
+                if bad:
+                    self._open(now)
+                else:
+                    self.state = "closed"
+                    self._events.clear()
+                return
+            if not bad:
+                return
+            self._events.append(now)
+            while self._events and now - self._events[0] > self.window:
+                self._events.popleft()
+            if self.state == "closed" and len(self._events) >= self.failures:
+                self._open(now)
+
+    def release_probe(self):
+        """Probe-Call kam nicht zustande (kein freier Platz) – nächster Call darf proben"""
+        with self._lock:
+            self._probe = False
+
+    def _open(self, now):
+        self.state = "open"
+        self.opened_at = now
+        self.trips += 1
+        self._events.clear()
+        print(f"[LLM] Circuit Breaker offen für {self.cooldown:.0f}s", flush=True)
+
+
+class _Call:
+    """Misst die Latenz eines Calls; bei Streams bis zum Öffnen des Streams"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latency = None
+
+    def mark(self):
+        if self.latency is None:
+            self.latency = time.monotonic() - self.started
+
+
+class LlmClient:
+    def __init__(self, base_url=None, max_in_flight=8, per_model=4, acquire_timeout=30.0,
+                 request_timeout=120.0, max_retries=2, breaker=None):
+        self.base_url = base_url
+        self.per_model = per_model
+        self.acquire_timeout = float(acquire_timeout)
+        self.request_timeout = float(request_timeout)
+        self.max_retries = max_retries
+        self.breaker = breaker or CircuitBreaker()
+        self._global = threading.BoundedSemaphore(max_in_flight)
+        self.max_in_flight = max_in_flight
+        self._models = {}
+        self._clients = {}
+        self._lock = threading.Lock()
+        # Metriken
+        self.in_flight = 0
+        self.in_flight_by_model = {}
+        self.waiting = 0
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.latency_total = 0.0
+
+    def client(self, api_key):
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                import anthropic
+                client = anthropic.Anthropic(api_key=api_key, base_url=self.base_url,
+                                             timeout=self.request_timeout,
+                                             max_retries=self.max_retries)
+                self._clients[api_key] = client
+            return client
+
+    def _model_semaphore(self, model):
+        with self._lock:
+            sem = self._models.get(model)
+            if sem is None:
+                sem = self._models[model] = threading.BoundedSemaphore(self.per_model)
+            return sem
+
+    @contextmanager
+    def _slot(self, model):
+        if not self.breaker.allow():
+            with self._lock:
+                self.rejected += 1
+            raise LlmUnavailable("circuit_open")
+
+        model_sem = self._model_semaphore(model)
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._lock:
+            self.waiting += 1
+        acquired = []
+        try:
+            # Erst Modell-, dann globaler Platz: Wartende auf ein volles Modell
+            # blockieren keine globalen Plätze für andere Modelle
+            for sem in (model_sem, self._global):
+                if not sem.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                    raise LlmUnavailable("busy")
+                acquired.append(sem)
+        except BaseException:
+            for sem in reversed(acquired):
+                sem.release()
+            with self._lock:
+                self.waiting -= 1
+                self.rejected += 1
+            self.breaker.release_probe()
+            raise
+        waited = time.monotonic() - (deadline - self.acquire_timeout)
+        with self._lock:
+            self.waiting -= 1
+            self.in_flight += 1
+            self.in_flight_by_model[model] = self.in_flight_by_model.get(model, 0) + 1
+            self.calls += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+        call = _Call()
+        ok = True
+        try:
+            yield call
+        except Exception as e:
+            ok = not _is_upstream_failure(e)
+            raise
+        finally:
+            # GeneratorExit (Client getrennt) zählt nicht als Upstream-Fehler
+            call.mark()
+            self.breaker.record(ok, call.latency)
+            with self._lock:
+                self.in_flight -= 1
+                self.in_flight_by_model[model] -= 1
+                self.latency_total += call.latency
+                if not ok:
+                    self.failures += 1
+            self._global.release()
+            model_sem.release()
+
+    def create(self, api_key, **req):
+        """messages.create über den geteilten Client"""
+        with self._slot(req["model"]):
+            return self.client(api_key).messages.create(**req)
+
+    @contextmanager
+    def stream(self, api_key, **req):
+        """messages.stream über den geteilten Client; der Platz bleibt bis zum Stream-Ende belegt"""
+        with self._slot(req["model"]) as call:
+            with self.client(api_key).messages.stream(**req) as stream:
+                call.mark()
+                yield stream
+
+    def metrics(self):
+        with self._lock:
+            done = self.calls - self.in_flight
+            return {
+                "in_flight": self.in_flight,
+                "in_flight_by_model": {m: n for m, n in self.in_flight_by_model.items() if n},
+                "max_in_flight": self.max_in_flight,
+                "per_model": self.per_model,
+                "waiting": self.waiting,
+                "calls": self.calls,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "queue_wait_avg_ms": round(self.wait_total / self.calls * 1000, 1) if self.calls else 0.0,
+                "queue_wait_max_ms": round(self.wait_max * 1000, 1),
+                "latency_avg_ms": round(self.latency_total / done * 1000, 1) if done > 0 else 0.0,
+                "breaker": {"state": self.breaker.state, "trips": self.breaker.trips},
+            }
+
+
+def client_from_env():
+    breaker = CircuitBreaker(
+        failures=int(os.getenv("LLM_BREAKER_FAILURES", "5")),
+        window=float(os.getenv("LLM_BREAKER_WINDOW", "60")),
+        slow_seconds=float(os.getenv("LLM_BREAKER_SLOW_SECONDS", "30")),
+        cooldown=float(os.getenv("LLM_BREAKER_COOLDOWN", "30")),
+    )
+    return LlmClient(
+        base_url=os.getenv("ANTHROPIC_BASE_URL") or None,
+        max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+        per_model=int(os.getenv("LLM_MAX_PER_MODEL", "4")),
+        acquire_timeout=float(os.getenv("LLM_ACQUIRE_TIMEOUT", "30")),
+        request_timeout=float(os.getenv("LLM_REQUEST_TIMEOUT", "120")),
+        breaker=breaker,
+    )
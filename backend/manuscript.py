@@ -0,0 +1,76 @@
+# backend/manuscript.py
+"""
+Manuskript-Reader: liest Kapitel und Szenen eines Projekts in Buchreihenfolge
+mit einer einzigen Abfrage über einen serverseitigen Cursor.
+
+Der Speicherbedarf bleibt flach – egal wie groß das Buch ist – weil die
+Zeilen batchweise vom Server geholt und sofort weitergereicht werden.
+Genutzt vom Manuskript-Endpoint (NDJSON) und vom PDF-Export.
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+
+BATCH_SIZE = 200
+
+_MANUSCRIPT_SQL = text("""
+    SELECT c.id AS chapter_id, c.title AS chapter_title, c.order_index AS chapter_order,
+           s.id AS scene_id, s.title AS scene_title, s.order_index AS scene_order,
+           s.status AS scene_status, s.content AS scene_content
+    FROM chapter c
+    LEFT JOIN scene s ON s.chapter_id = c.id
+    WHERE c.project_id = :pid
+    ORDER BY c.order_index ASC, c.id ASC, s.order_index ASC, s.id ASC
+""")
+
+
+@contextmanager
+def snapshot_connection(engine):
+    """
+    Lesende Verbindung mit konsistentem Snapshot (das ganze Buch sieht einen
+    Stand) und serverseitigem Cursor. Die App läuft sonst im AUTOCOMMIT –
+    auf Postgres brauchen serverseitige Cursor eine offene Transaktion.
+    """
+    isolation = "REPEATABLE READ" if engine.dialect.name == "postgresql" else "SERIALIZABLE"
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level=isolation,
+                                      stream_results=True, yield_per=BATCH_SIZE)
+        with conn.begin():
+            yield conn
+
+
+def iter_manuscript_rows(conn, project_id):
+    """Flache Zeilen (Kapitel × Szene) in Buchreihenfolge"""
+    result = conn.execute(_MANUSCRIPT_SQL, {"pid": project_id})
+    for row in result.mappings():
+        yield row
+
+
+def iter_manuscript_events(conn, project_id):
+    """
+    Ereignisse in Buchreihenfolge:
+        {"type": "chapter", "id", "title", "order_index"}
+        {"type": "scene", "id", "chapter_id", "title", "order_index", "status", "content"}
+    Kapitel ohne Szenen werden ebenfalls gemeldet.
+    """
+    current_chapter = None
+    for row in iter_manuscript_rows(conn, project_id):
+        if row["chapter_id"] != current_chapter:
+            current_chapter = row["chapter_id"]
+            yield {
+                "type": "chapter",
+                "id": row["chapter_id"],
+                "title": row["chapter_title"],
+                "order_index": row["chapter_order"],
+            }
+        if row["scene_id"] is not None:
+            yield {
+                "type": "scene",
+                "id": row["scene_id"],
+                "chapter_id": row["chapter_id"],
+                "title": row["scene_title"],
+                "order_index": row["scene_order"],
+                "status": row["scene_status"],
+                "content": row["scene_content"],
+            }
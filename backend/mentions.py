@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# backend/mentions.py
+"""
+Erwähnungs-Index: welche Charaktere kommen in welcher Szene an welcher Stelle vor.
+
+Pro Projekt wird aus allen Charakternamen (Name, Vorname und Spitzname aus
+``profile_json.basic``) ein einziger Matcher gebaut – eine Regex-Alternation
+über alle Aliasse, dazu ein Fuzzy-Abgleich per rapidfuzz für Tippfehler
+und Flexionsformen längerer Namen. Der Matcher wird pro Prozess gecacht und
+nur neu gebaut, wenn sich die Namen ändern.
+
+Der Index (Tabelle ``character_mention``) wird beim Speichern einer Szene
+für genau diese Szene neu geschrieben. Nach dem Anlegen, Umbenennen oder
+Löschen eines Charakters baut ein Hintergrund-Job (app.py, jobs.py) das
+ganze Projekt neu auf. Der Mentions-Endpoint liest nur den Index, nie den
+Manuskripttext. Offsets sind UTF-16-Code-Units (wie String-Indizes im Browser).
+
+Neuaufbau für bestehende Daten:
+    python mentions.py                # alle Projekte
+    python mentions.py --project 42
+"""
+import json
+import re
+import threading
+
+from sqlalchemy import text
+
+try:
+    from rapidfuzz import fuzz, process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+
+SNIPPET_RADIUS = 60
+MIN_ALIAS_LENGTH = 2
+# Fuzzy nur für längere Einzelwort-Namen, sonst zu viele Fehltreffer
+FUZZY_MIN_LENGTH = 5
+FUZZY_SCORE_CUTOFF = 88
+
+# Erste Namensteile, die nie allein als Alias taugen (Artikel, Anreden, Titel)
+_NAME_PREFIXES = {
+    "der", "die", "das", "ein", "eine", "the", "a", "an",
+    "herr", "frau", "fräulein", "mr", "mrs", "ms", "miss", "sir", "lady", "lord",
+    "dr", "prof", "professor", "doktor", "doctor", "graf", "gräfin", "baron", "fürst",
+    "könig", "königin", "prinz", "prinzessin", "king", "queen", "prince", "princess",
+    "kapitän", "captain", "general", "pater", "bruder", "schwester", "onkel", "tante",
+    "von", "van", "de", "saint", "st",
+}
+_WORD = re.compile(r"[^\W\d_]+")
+_WS = re.compile(r"\s+")
+
+
+def character_aliases(name, profile_json):
+    """Name, Vorname, Spitzname (und Vorname aus dem Namen als Fallback)"""
+    try:
+        profile = json.loads(profile_json or "{}")
+    except (TypeError, ValueError):
+        profile = {}
+    basic = profile.get("basic") if isinstance(profile, dict) else None
+    basic = basic if isinstance(basic, dict) else {}
+    name = (name or "").strip()
+    candidates = [
+        name,
+        str(basic.get("first_name") or "").strip(),
+        str(basic.get("nickname") or "").strip(),
+        _first_name_fallback(name),
+    ]
+    aliases = []
+    for alias in candidates:
+        alias = _WS.sub(" ", alias)
+        if len(alias) >= MIN_ALIAS_LENGTH and alias not in aliases:
+            aliases.append(alias)
+    return aliases
+
+
+def _first_name_fallback(name):
+    """
+    Erster Namensteil als Alias ("Anna Berg" -> "Anna") – aber nicht für
+    Artikel, Anreden und Abkürzungen ("The Narrator", "Dr. Weber") und
+    nicht für kurze Teile, die sonst in jedem Text vorkommen.
+    """
+    parts = name.split()
+    if len(parts) < 2:
+        return ""
+    first = parts[0]
+    if (len(first) < MIN_ALIAS_LENGTH + 2 or first.endswith(".")
+            or first.lower() in _NAME_PREFIXES):
+        return ""
+    return first
+
+
+def _utf16_offsets(content):
+    """Funktion str-Index -> UTF-16-Offset (schnell, wenn keine Astral-Zeichen vorkommen)"""
+    if all(ord(ch) <= 0xFFFF for ch in content):
+        return lambda i: i
+    prefix = [0]
+    for ch in content:
+        prefix.append(prefix[-1] + (2 if ord(ch) > 0xFFFF else 1))
+    return lambda i: prefix[i]
+
+
+def _snippet(content, start, end):
+    lo = max(0, start - SNIPPET_RADIUS)
+    hi = min(len(content), end + SNIPPET_RADIUS)
+    snippet = _WS.sub(" ", content[lo:hi]).strip()
+    return ("…" if lo > 0 else "") + snippet + ("…" if hi < len(content) else "")
+
+
+class ProjectMatcher:
+    """Ein Matcher für alle Charaktere eines Projekts"""
+
+    def __init__(self, characters):
+        # characters: [(id, name, profile_json)]
+        self.by_alias = {}
+        for char_id, name, profile_json in characters:
+            for alias in character_aliases(name, profile_json):
+                self.by_alias.setdefault(alias, []).append(char_id)
+        aliases = sorted(self.by_alias, key=len, reverse=True)
+        self.pattern = None
+        if aliases:
+            # Längste Aliasse zuerst, optionales Genitiv-s ("Annas", "Anna's")
+            self.pattern = re.compile(
+                r"(?<!\w)(" + "|".join(re.escape(a) for a in aliases) + r")(?:['’]?s)?(?!\w)"
+            )
+        self.fuzzy_aliases = [a for a in aliases if " " not in a and len(a) >= FUZZY_MIN_LENGTH]
+
+    def find(self, content):
+        """[(character_id, start, end, surface, fuzzy)] mit str-Offsets"""
+        if not content or self.pattern is None:
+            return []
+        hits = []
+        covered = set()
+        for m in self.pattern.finditer(content):
+            for char_id in self.by_alias[m.group(1)]:
+                hits.append((char_id, m.start(), m.end(), m.group(0), False))
+            covered.update(range(m.start(), m.end()))
+        if RAPIDFUZZ_AVAILABLE and self.fuzzy_aliases:
+            hits.extend(self._find_fuzzy(content, covered))
+        hits.sort(key=lambda h: (h[1], h[0]))
+        return hits
+
+    def _find_fuzzy(self, content, covered):
+        words = {}
+        for m in _WORD.finditer(content):
+            word = m.group(0)
+            if len(word) >= FUZZY_MIN_LENGTH and word[0].isupper() and m.start() not in covered:
+                words.setdefault(word, []).append(m)
+        if not words:
+            return []
+        hits = []
+        # Jedes Wort nur einmal abgleichen, egal wie oft es vorkommt
+        for word, occurrences in words.items():
+            best = process.extractOne(word, self.fuzzy_aliases, scorer=fuzz.ratio,
+                                      score_cutoff=FUZZY_SCORE_CUTOFF)
+            if best is None:
+                continue
+            for char_id in self.by_alias[best[0]]:
+                for m in occurrences:
+                    hits.append((char_id, m.start(), m.end(), word, True))
+        return hits
+
+
+class MatcherCache:
+    """Pro Projekt ein Matcher, neu gebaut, wenn sich die Namen ändern"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, project_id, characters):
+        key = tuple(characters)
+        with self._lock:
+            entry = self._entries.get(project_id)
+            if entry and entry[0] == key:
+                return entry[1]
+        matcher = ProjectMatcher(characters)
+        with self._lock:
+            self._entries[project_id] = (key, matcher)
+        return matcher
+
+
+_matchers = MatcherCache()
+
+
+def _project_characters(conn, project_id):
+    return [tuple(r) for r in conn.execute(text("""
+        SELECT id, name, profile_json FROM "character"
+        WHERE project_id = :pid
+        ORDER BY id
+    """), {"pid": project_id}).all()]
+
+
+def _mention_rows(matcher, scene_id, project_id, content):
+    to_utf16 = _utf16_offsets(content)
+    return [{
+        "character_id": char_id, "scene_id": scene_id, "project_id": project_id,
+        "start": to_utf16(start), "end": to_utf16(end), "surface": surface,
+        "fuzzy": fuzzy, "snippet": _snippet(content, start, end),
+    } for char_id, start, end, surface, fuzzy in matcher.find(content)]
+
+
+_INSERT_SQL = text("""
+    INSERT INTO character_mention (character_id, scene_id, project_id, start_offset, end_offset,
+                                   surface, fuzzy, snippet)
+    VALUES (:character_id, :scene_id, :project_id, :start, :end, :surface, :fuzzy, :snippet)
+""")
+
+
+def index_scene(conn, scene_id, content, project_id=None):
+    """Schreibt die Erwähnungen einer Szene neu (nach jedem Speichern des Inhalts)"""
+    if project_id is None:
+        row = conn.execute(text("""
+            SELECT c.project_id FROM scene s JOIN chapter c ON c.id = s.chapter_id WHERE s.id = :id
+        """), {"id": scene_id}).first()
+        if not row:
+            return 0
+        project_id = row[0]
+    characters = _project_characters(conn, project_id)
+    conn.execute(text("DELETE FROM character_mention WHERE scene_id = :id"), {"id": scene_id})
+    if not characters:
+        return 0
+    rows = _mention_rows(_matchers.get(project_id, characters), scene_id, project_id, content or "")
+    if rows:
+        conn.execute(_INSERT_SQL, rows)
+    return len(rows)
+
+
+def index_project(conn, project_id):
+    """
+    Kompletter Neuaufbau eines Projekts – nach dem Anlegen, Umbenennen oder
+    Löschen eines Charakters, weil sich mit den Aliassen auch die Treffer der
+    anderen Charaktere ändern (längster Alias gewinnt). Liest die Szenen
+    batchweise.
+    """
+    conn.execute(text("DELETE FROM character_mention WHERE project_id = :pid"), {"pid": project_id})
+    characters = _project_characters(conn, project_id)
+    if not characters:
+        return 0
+    return _index_project_scenes(conn, project_id, _matchers.get(project_id, characters))
+
+
+def _index_project_scenes(conn, project_id, matcher, batch_size=200):
+    last_id = 0
+    total = 0
+    while True:
+        scenes = conn.execute(text("""
+            SELECT s.id, s.content FROM scene s
+            JOIN chapter c ON c.id = s.chapter_id
+            WHERE c.project_id = :pid AND s.id > :last_id
+            ORDER BY s.id
+            LIMIT :limit
+        """), {"pid": project_id, "last_id": last_id, "limit": batch_size}).all()
+        if not scenes:
+            break
+        rows = []
+        for scene_id, content in scenes:
+            rows.extend(_mention_rows(matcher, scene_id, project_id, content or ""))
+        if rows:
+            conn.execute(_INSERT_SQL, rows)
+        total += len(rows)
+        last_id = scenes[-1][0]
+    return total
+
+
+def main(argv=None):
+    import argparse
+    from sqlalchemy import create_engine
+
+    try:
+        from backend.auto_migrate import get_database_uri
+    except ImportError:
+        from auto_migrate import get_database_uri
+
+    parser = argparse.ArgumentParser(description="Erwähnungs-Index neu aufbauen")
+    parser.add_argument("--project", type=int, default=None, help="nur dieses Projekt")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(get_database_uri())
+    with engine.begin() as conn:
+        if args.project is not None:
+            project_ids = [args.project]
+        else:
+            project_ids = [r[0] for r in conn.execute(text("SELECT id FROM project ORDER BY id")).all()]
+        total = sum(index_project(conn, pid) for pid in project_ids)
+        print(f"✅ Indexed {total} mentions in {len(project_ids)} projects")
+
+
+if __name__ == "__main__":
+    main()
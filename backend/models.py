@@ -1,6 +1,6 @@
 # backend/models.py
 from sqlalchemy.sql import func
-from sqlalchemy import text as sqltext
+from sqlalchemy import text as sqltext, event
 
 # Optional Flask-Security imports
 try:
@@ -21,9 +21,15 @@ except ImportError:
 try:
     # Paket-Start (z.B. gunicorn) -> backend.extensions
     from backend.extensions import db
+    from backend.text_stats import derived_scene_fields, PREVIEW_LENGTH
+    from backend.word_counts import apply_delta, apply_scene_counts
+    from backend.prompt_prefix import bump_revision
 except Exception:
     # Direktstart (python app.py) -> lokale extensions
     from extensions import db
+    from text_stats import derived_scene_fields, PREVIEW_LENGTH
+    from word_counts import apply_delta, apply_scene_counts
+    from prompt_prefix import bump_revision
 
 
 # Flask-Security-Too: Roles-Users Many-to-Many
@@ -52,7 +58,14 @@ class Project(db.Model):
     language = db.Column(db.String(10), default="en")  # English as default for international users
     target_audience = db.Column(db.String(100), default="")
     estimated_word_count = db.Column(db.Integer, default=0)
+    # Summen über alle Kapitel, inkrementell gepflegt (siehe word_counts)
+    word_count = db.Column(db.Integer, default=0)
+    char_count = db.Column(db.Integer, default=0)
+    # Version des stabilen Schreibgeist-Prompt-Präfixes (siehe prompt_prefix)
+    prompt_revision = db.Column(db.Integer, nullable=False, default=0, server_default=sqltext('0'))
     cover_image_url = db.Column(db.String(500), default="")
+    # "importing", solange ein Word-Import-Job läuft (siehe word_import), sonst NULL
+    import_status = db.Column(db.String(20), nullable=True)
     share_with_community = db.Column(
         db.Boolean,
         nullable=False,
@@ -83,6 +96,9 @@ class Chapter(db.Model):
     title = db.Column(db.String(200), nullable=False, default="Neues Kapitel")
     order_index = db.Column(db.Integer, nullable=False, default=0)
     content = db.Column(db.Text, default="")
+    # Summen über alle Szenen, inkrementell gepflegt (siehe word_counts)
+    word_count = db.Column(db.Integer, default=0)
+    char_count = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(
         db.DateTime, server_default=func.now(), onupdate=func.now()
@@ -106,6 +122,12 @@ class Scene(db.Model):
     status = db.Column(db.String(50), nullable=False, default="Idea")
     order_index = db.Column(db.Integer, nullable=False, default=0)
     context_manifest = db.Column(db.Text, default="{}")
+    # Hash über content (siehe scene_delta) – Basis für Delta-Autosave
+    revision = db.Column(db.String(16), nullable=True)
+    # Beim Schreiben berechnet (siehe text_stats) – Übersichten lesen nie content
+    preview = db.Column(db.String(PREVIEW_LENGTH), nullable=True)
+    word_count = db.Column(db.Integer, nullable=True)
+    char_count = db.Column(db.Integer, nullable=True)
     created_at = db.Column(db.DateTime, server_default=func.now())
     updated_at = db.Column(
         db.DateTime, server_default=func.now(), onupdate=func.now()
@@ -114,6 +136,56 @@ class Scene(db.Model):
     # Relationship to mentions
 
 
+@event.listens_for(Scene, "before_insert")
+@event.listens_for(Scene, "before_update")
+def _sync_scene_derived_fields(mapper, connection, target):
+    """ORM-Schreibzugriffe (Word-Import, Admin) halten revision/preview/Zähler aktuell"""
+    for name, value in derived_scene_fields(target.content).items():
+        setattr(target, name, value)
+
+
+@event.listens_for(Scene, "before_update")
+def _unbook_scene_counts(mapper, connection, target):
+    # Gespeicherte Zähler vom (bisherigen) Kapitel abbuchen, after_update bucht neu –
+    # so stimmen die Summen auch, wenn die Szene das Kapitel wechselt
+    apply_scene_counts(connection, target.id, 0, 0)
+
+
+@event.listens_for(Scene, "after_insert")
+@event.listens_for(Scene, "after_update")
+def _book_scene_counts(mapper, connection, target):
+    apply_delta(connection, target.chapter_id, target.word_count or 0, target.char_count or 0)
+
+
+@event.listens_for(Scene, "after_delete")
+def _unbook_deleted_scene(mapper, connection, target):
+    apply_delta(connection, target.chapter_id, -(target.word_count or 0), -(target.char_count or 0))
+
+
+def _attr_changed(target, *names):
+    state = db.inspect(target)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+@event.listens_for(Project, "before_update")
+def _bump_prompt_revision_on_title(mapper, connection, target):
+    if _attr_changed(target, "title"):
+        # SQL-Ausdruck statt Python-Wert: Listener-Updates per SQL nicht überschreiben
+        target.prompt_revision = Project.prompt_revision + 1
+
+
+@event.listens_for(Chapter, "after_insert")
+@event.listens_for(Chapter, "after_delete")
+def _bump_prompt_revision_on_chapters(mapper, connection, target):
+    bump_revision(connection, target.project_id)
+
+
+@event.listens_for(Chapter, "after_update")
+def _bump_prompt_revision_on_chapter_change(mapper, connection, target):
+    if _attr_changed(target, "title", "order_index"):
+        bump_revision(connection, target.project_id)
+
+
 class Character(db.Model):
     __tablename__ = "character"
     __table_args__ = {'extend_existing': True}
@@ -134,6 +206,56 @@ class Character(db.Model):
     profile_json = db.Column(db.Text, default="{}")
 
 
+@event.listens_for(Character, "after_insert")
+@event.listens_for(Character, "after_delete")
+def _bump_prompt_revision_on_characters(mapper, connection, target):
+    bump_revision(connection, target.project_id)
+
+
+@event.listens_for(Character, "after_update")
+def _bump_prompt_revision_on_character_change(mapper, connection, target):
+    if _attr_changed(target, "name"):
+        bump_revision(connection, target.project_id)
+
+
+class CharacterMention(db.Model):
+    """Erwähnungs-Index: Charakter kommt in Szene an Offset vor (siehe mentions)"""
+    __tablename__ = "character_mention"
+    __table_args__ = {'extend_existing': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    character_id = db.Column(
+        db.Integer, db.ForeignKey("character.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    scene_id = db.Column(
+        db.Integer, db.ForeignKey("scene.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    project_id = db.Column(
+        db.Integer, db.ForeignKey("project.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    # UTF-16-Offsets im Szenentext
+    start_offset = db.Column(db.Integer, nullable=False)
+    end_offset = db.Column(db.Integer, nullable=False)
+    surface = db.Column(db.String(200), nullable=False, default="")
+    fuzzy = db.Column(db.Boolean, nullable=False, default=False)
+    snippet = db.Column(db.Text, default="")
+
+
+class SceneEntity(db.Model):
+    """Szenen-Tags aus context_manifest, normalisiert (siehe scene_entities)"""
+    __tablename__ = "scene_entity"
+    __table_args__ = (
+        db.Index("ix_scene_entity_entity", "entity_type", "entity_id"),
+        {'extend_existing': True},
+    )
+
+    scene_id = db.Column(
+        db.Integer, db.ForeignKey("scene.id", ondelete="CASCADE"), primary_key=True
+    )
+    entity_type = db.Column(db.String(20), primary_key=True)  # "character" | "location"
+    entity_id = db.Column(db.Integer, primary_key=True)
+
+
 class WorldNode(db.Model):
     __tablename__ = "worldnode"
     __table_args__ = {'extend_existing': True}
@@ -310,6 +432,51 @@ class WorldNodeTask(db.Model):
     worldnode = db.relationship("WorldNode", backref=db.backref("tasks", cascade="all, delete-orphan"))
 
 
+class LlmJob(db.Model):
+    """Hintergrund-Job eines LLM-Endpoints oder PDF-Exports (siehe jobs)"""
+    __tablename__ = "llm_job"
+    __table_args__ = (
+        db.Index("ix_llm_job_user_status", "user_id", "status"),
+        {'extend_existing': True},
+    )
+
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id", ondelete="CASCADE"), nullable=False)
+    kind = db.Column(db.String(40), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    result_json = db.Column(db.Text, nullable=True)
+    progress_json = db.Column(db.Text, nullable=True)
+    status_code = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    deadline = db.Column(db.DateTime, nullable=False)
+
+
+class LlmResponseCache(db.Model):
+    """Persistente Ebene des LLM-Antwort-Caches (siehe response_cache)"""
+    __tablename__ = "llm_response_cache"
+    __table_args__ = {'extend_existing': True}
+
+    cache_key = db.Column(db.String(64), primary_key=True)
+    kind = db.Column(db.String(40), nullable=False)
+    response_json = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
+class PdfFragment(db.Model):
+    """Persistente Ebene des PDF-Fragment-Caches (siehe pdf_cache)"""
+    __tablename__ = "pdf_fragment"
+    __table_args__ = {'extend_existing': True}
+
+    cache_key = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    page_count = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    used_at = db.Column(db.DateTime, nullable=False, index=True)
+
+
 class Role(db.Model, RoleMixin):
     """Flask-Security-Too Role Model"""
     __tablename__ = "role"
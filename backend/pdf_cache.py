@@ -0,0 +1,132 @@
+# backend/pdf_cache.py
+"""
+Cache gesetzter PDF-Abschnitte (Titelseite, Kapitel) für den PDF-Export.
+
+Ein Fragment sind die Inhalts-Streams der Seiten eines Abschnitts ohne
+Seitenzahl (siehe pdf_export.layout_section). Der Schlüssel ist ein SHA-256
+über Layout (Seitenformat, Styles, ReportLab-Version) und den exakten Inhalt
+des Abschnitts – ein geändertes Kapitel ergibt einen neuen Schlüssel, eine
+Invalidierung ist deshalb nicht nötig. Bei einem erneuten Export werden nur
+geänderte Kapitel neu gesetzt.
+
+Zwei Ebenen, Fragmente liegen zlib-komprimiert vor:
+- im Speicher: LRU, begrenzt auf PDF_FRAGMENT_CACHE_MB
+- optional in der DB (Tabelle ``pdf_fragment``, PDF_FRAGMENT_CACHE_DB=1):
+  überlebt Neustarts und wird von allen Gunicorn-Workern geteilt; Einträge,
+  die PDF_FRAGMENT_CACHE_DAYS nicht benutzt wurden, werden gelöscht
+"""
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+
+def _pack(fragment):
+    return zlib.compress(json.dumps(fragment, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+class FragmentCache:
+    def __init__(self, engine=None, max_bytes=64 * 1024 * 1024, db_tier=False, max_age_days=30):
+        self.engine = engine
+        self.max_bytes = max_bytes
+        self.db_tier = bool(db_tier and engine is not None)
+        self.max_age = timedelta(days=max_age_days)
+        self._entries = OrderedDict()  # key -> komprimiertes Fragment
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if data is None and self.db_tier:
+            data = self._db_get(key)
+            with self._lock:
+                if data is not None:
+                    self.db_hits += 1
+            if data is not None:
+                self._remember(key, data)
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        return _unpack(data)
+
+    def put(self, key, fragment):
+        data = _pack(fragment)
+        self._remember(key, data)
+        if self.db_tier:
+            self._db_put(key, data, len(fragment["pages"]))
+
+    def _remember(self, key, data):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped)
+
+    def _db_get(self, key):
+        try:
+            with self.engine.begin() as conn:
+                data = conn.execute(text("SELECT data FROM pdf_fragment WHERE cache_key = :key"),
+                                    {"key": key}).scalar()
+                if data is not None:
+                    conn.execute(text("UPDATE pdf_fragment SET used_at = :now WHERE cache_key = :key"),
+                                 {"key": key, "now": datetime.utcnow()})
+            return bytes(data) if data is not None else None
+        except Exception as e:
+            print(f"[FragmentCache] DB-Lesen fehlgeschlagen: {e}", flush=True)
+            return None
+
+    def _db_put(self, key, data, page_count):
+        now = datetime.utcnow()
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text("DELETE FROM pdf_fragment WHERE cache_key = :key OR used_at < :cutoff"),
+                             {"key": key, "cutoff": now - self.max_age})
+                conn.execute(text("""
+                    INSERT INTO pdf_fragment (cache_key, data, page_count, created_at, used_at)
+                    VALUES (:key, :data, :pages, :now, :now)
+                """), {"key": key, "data": data, "pages": page_count, "now": now})
+        except Exception as e:
+            # z.B. paralleler Insert desselben Schlüssels in einem anderen Worker
+            print(f"[FragmentCache] DB-Schreiben fehlgeschlagen: {e}", flush=True)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.db_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+                "db_tier": self.db_tier,
+            }
+
+
+def fragment_cache_from_env(engine):
+    return FragmentCache(
+        engine,
+        max_bytes=int(float(os.getenv("PDF_FRAGMENT_CACHE_MB", "64")) * 1024 * 1024),
+        db_tier=os.getenv("PDF_FRAGMENT_CACHE_DB", "0").lower() in ("1", "true", "yes"),
+        max_age_days=float(os.getenv("PDF_FRAGMENT_CACHE_DAYS", "30")),
+    )
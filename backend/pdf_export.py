@@ -0,0 +1,473 @@
+# backend/pdf_export.py
+"""
+PDF-Export (ReportLab) im Layout von BookExport.jsx.
+
+Zwei Quellen liefern dieselbe Kapitel-Struktur
+    {"title": str, "paragraphs": [{"text", "first", "scene_break"}, ...]}
+- chapters_from_html: vom Browser gerendertes HTML (bisheriger Weg)
+- iter_db_chapters:   direkt aus den Manuskript-Ereignissen (manuscript.py),
+                      Kapitel für Kapitel, ohne HTML-Umweg
+
+Die DB-Variante bildet die Regeln des Frontends nach (paragraphsHTML,
+smartQuotes, Szenentrenner, Initiale, Epigramme), damit beide Wege das
+gleiche PDF ergeben.
+
+Jeder Abschnitt (Titelseite, Kapitel) beginnt auf einer neuen Seite und wird
+deshalb für sich gesetzt: das Ergebnis sind die Inhalts-Streams seiner Seiten
+ohne Seitenzahl („Fragment“). build_pdf schreibt die Seiten der Fragmente
+mit Seitenzahl sofort in die Ausgabe (PdfPageWriter) – fertige Seiten werden
+nicht bis zum Ende im Speicher gehalten. Mit einem Fragment-Cache
+(pdf_cache.py, Schlüssel: Inhalt + Layout) werden unveränderte Kapitel bei
+einem erneuten Export nicht neu gesetzt.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import zlib
+
+import reportlab
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen import canvas
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+
+# Page size: 152.4mm x 228.6mm (from BookExport.jsx)
+PAGE_WIDTH = 152.4 * mm
+PAGE_HEIGHT = 228.6 * mm
+
+# Margins: @page{margin:20mm 18mm 24mm 18mm} = top, right, bottom, left
+MARGIN_TOP = 20 * mm
+MARGIN_RIGHT = 18 * mm
+MARGIN_BOTTOM = 24 * mm
+MARGIN_LEFT = 18 * mm
+
+# Feste Reihenfolge der internen Font-Namen (/F1, /F2, …) – Fragmente verweisen darauf
+FONTS = ("Helvetica", "Times-Roman", "Times-Bold")
+
+_EPIGRAM_RE = re.compile(r":::epigram\n[\s\S]*?:::")
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n+")
+
+
+class PdfPageWriter:
+    """
+    Schreibt ein PDF Seite für Seite direkt nach ``out``: Inhalts-Stream und
+    Seitenobjekt gehen sofort (Flate-komprimiert) in die Ausgabe, im Speicher
+    bleiben nur die Byte-Offsets der Objekte und die Nummern der Seiten – der
+    Speicherbedarf wächst nicht mit dem Seiteninhalt. Seitenbaum, Ressourcen,
+    Fonts und Katalog folgen in close(); ihre Objektnummern sind vorab
+    reserviert, Seiten verweisen vorwärts darauf.
+
+    Nutzt nur die PDF-Syntax, keine ReportLab-Interna. Voraussetzung: die
+    Fragmente verweisen ausschließlich auf die Standard-Fonts aus FONTS
+    (/F1, /F2, … in dieser Reihenfolge, siehe _FragmentCanvas).
+    """
+
+    CATALOG, PAGES, INFO, RESOURCES = 1, 2, 3, 4
+
+    def __init__(self, out, title=None):
+        self._out = out
+        self._pos = 0
+        self._offsets = {}
+        self._page_ids = []
+        self._title = title
+        self._next_id = self.RESOURCES + len(FONTS) + 1
+        # Binärkommentar: Übertragungswege behandeln die Datei als binär
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    @property
+    def page_count(self):
+        return len(self._page_ids)
+
+    def _write(self, data):
+        self._out.write(data)
+        self._pos += len(data)
+
+    def _object(self, obj_id, body):
+        self._offsets[obj_id] = self._pos
+        self._write(b"%d 0 obj\n" % obj_id + body + b"\nendobj\n")
+
+    def _new_id(self):
+        self._next_id += 1
+        return self._next_id - 1
+
+    def add_fragment(self, fragment):
+        """Seiten eines Fragments (siehe layout_section) schreiben"""
+        for content in fragment["pages"]:
+            self.add_page(content)
+
+    def add_page(self, content):
+        number = len(self._page_ids) + 1
+        data = (content + self.page_number_ops(number)).encode("latin-1")
+        data = zlib.compress(data)
+        contents_id, page_id = self._new_id(), self._new_id()
+        self._object(contents_id, b"<< /Filter /FlateDecode /Length %d >>\nstream\n" % len(data)
+                     + data + b"\nendstream")
+        self._object(page_id, ("<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %s %s] /Resources %d 0 R "
+                               "/Contents %d 0 R >>" % (self.PAGES, _num(PAGE_WIDTH), _num(PAGE_HEIGHT),
+                                                       self.RESOURCES, contents_id)).encode("ascii"))
+        self._page_ids.append(page_id)
+
+    @staticmethod
+    def page_number_ops(number):
+        """Seitenzahl unten mittig (außer auf der Titelseite)"""
+        if number == 1:
+            return ""
+        # @bottom-center{content: counter(page); font-size:10pt; color:#444}
+        label = str(number)
+        x = PAGE_WIDTH / 2 - pdfmetrics.stringWidth(label, "Times-Roman", 10) / 2
+        return ("\nq 0.267 0.267 0.267 rg BT /F%d 10 Tf 1 0 0 1 %s %s Tm (%s) Tj ET Q"
+                % (FONTS.index("Times-Roman") + 1, _num(x), _num(MARGIN_BOTTOM / 2), label))
+
+    def close(self):
+        """Seitenbaum, Ressourcen, Fonts, Katalog, xref und Trailer schreiben"""
+        kids = " ".join("%d 0 R" % page_id for page_id in self._page_ids)
+        self._object(self.PAGES, ("<< /Type /Pages /Count %d /Kids [%s] >>"
+                                  % (len(self._page_ids), kids)).encode("ascii"))
+        fonts = " ".join("/F%d %d 0 R" % (i + 1, self.RESOURCES + 1 + i) for i in range(len(FONTS)))
+        self._object(self.RESOURCES, ("<< /Font << %s >> /ProcSet [/PDF /Text] >>" % fonts).encode("ascii"))
+        for i, name in enumerate(FONTS):
+            self._object(self.RESOURCES + 1 + i, ("<< /Type /Font /Subtype /Type1 /Name /F%d /BaseFont /%s "
+                                                  "/Encoding /WinAnsiEncoding >>" % (i + 1, name)).encode("ascii"))
+        info = b"<< /Producer (ReportLab PDF Library - www.reportlab.com)"
+        if self._title:
+            info += b" /Title <" + ("\ufeff" + self._title).encode("utf-16-be").hex().upper().encode("ascii") + b">"
+        self._object(self.INFO, info + b" >>")
+        self._object(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+
+        xref = self._pos
+        size = self._next_id
+        lines = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        lines += [b"%010d 00000 n \n" % self._offsets[i] for i in range(1, size)]
+        self._write(b"".join(lines))
+        self._write(b"trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                    % (size, self.CATALOG, self.INFO, xref))
+
+
+def _num(value):
+    return ("%.4f" % value).rstrip("0").rstrip(".")
+
+
+class _FragmentCanvas(canvas.Canvas):
+    """
+    Setzt einen Abschnitt und sammelt die Inhalts-Streams seiner Seiten, statt
+    ein PDF zu schreiben. Liest dafür ``_code`` der Seite (ReportLab-Interna,
+    Version in requirements.txt gepinnt).
+    """
+
+    def __init__(self, *args, **kwargs):
+        canvas.Canvas.__init__(self, *args, **kwargs)
+        # Fonts in fester Reihenfolge anmelden: /F1, /F2, … wie in PdfPageWriter
+        for name in FONTS:
+            self.setFont(name, 12)
+        self.setFont("Helvetica", 12)
+        self.fragment_pages = []
+
+    def showPage(self):
+        self.fragment_pages.append("\n".join(self._code))
+        self._startPage()
+
+    def save(self):
+        pass
+
+
+def make_styles():
+    """Styles matching BookExport.jsx EXACTLY"""
+    # Body: font-size:11pt; line-height:1.42; text-indent:1.2em; no space between paragraphs
+    body = ParagraphStyle(
+        'Body',
+        fontName='Times-Roman',
+        fontSize=11,
+        leading=11 * 1.42,
+        alignment=TA_JUSTIFY,
+        firstLineIndent=1.2 * 11,  # 1.2em
+        spaceAfter=0
+    )
+    return {
+        # Title: font-size:28pt
+        "title": ParagraphStyle(
+            'Title',
+            fontName='Times-Roman',  # Georgia fallback
+            fontSize=28,
+            leading=36,
+            alignment=TA_CENTER,
+            spaceAfter=3*mm
+        ),
+        # Subtitle: font-size:12pt; color:#555
+        "subtitle": ParagraphStyle(
+            'Subtitle',
+            fontName='Times-Roman',
+            fontSize=12,
+            leading=16,
+            alignment=TA_CENTER,
+            textColor='#555555',
+            spaceAfter=0
+        ),
+        # Chapter: font-size:18pt; text-align:center; margin:0 0 10mm
+        "chapter": ParagraphStyle(
+            'Chapter',
+            fontName='Times-Bold',
+            fontSize=18,
+            leading=22,
+            alignment=TA_CENTER,
+            spaceAfter=10*mm,
+            spaceBefore=0,
+            keepWithNext=True
+        ),
+        "body": body,
+        # First paragraph after chapter: text-indent:0
+        "body_first": ParagraphStyle('BodyFirst', parent=body, firstLineIndent=0),
+    }
+
+
+def escape_markup(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def title_flowables(title, subtitle, styles):
+    # Title page: margin-top:35mm
+    yield Spacer(1, 35*mm)
+    yield Paragraph(escape_markup(title or "Untitled"), styles["title"])
+    yield Paragraph(escape_markup(subtitle), styles["subtitle"])
+
+
+def chapter_flowables(chapter, styles):
+    if chapter['title']:
+        yield Paragraph(escape_markup(chapter['title']), styles["chapter"])
+
+    for para in chapter['paragraphs']:
+        if para.get('scene_break'):
+            yield Spacer(1, 11 * 1.42)
+        style = styles["body_first"] if para['first'] else styles["body"]
+        yield Paragraph(escape_markup(para['text']), style)
+
+
+class LazyStory(list):
+    """
+    Flowable-Liste für doc.build, die sich aus einem Generator nachfüllt.
+    platypus arbeitet nur am Listenanfang (flowables[0], del, insert(0, …),
+    kurzer Blick voraus für keepWithNext) und fragt vor jedem Schritt len()
+    ab – dort wird auf ``low_water`` Einträge nachgefüllt. So liegt nie die
+    ganze Story im Speicher.
+    """
+
+    def __init__(self, source, low_water=64):
+        super().__init__()
+        self._source = iter(source)
+        self._low_water = low_water
+        self._exhausted = False
+
+    def _fill(self):
+        while not self._exhausted and list.__len__(self) < self._low_water:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._exhausted = True
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+
+def make_doc(out):
+    return SimpleDocTemplate(
+        out,
+        pagesize=(PAGE_WIDTH, PAGE_HEIGHT),
+        leftMargin=MARGIN_LEFT,
+        rightMargin=MARGIN_RIGHT,
+        topMargin=MARGIN_TOP,
+        bottomMargin=MARGIN_BOTTOM
+    )
+
+
+_layout_fingerprint = None
+
+
+def layout_fingerprint():
+    """Hash über Seitenformat, Styles und ReportLab-Version – Teil jedes Fragment-Schlüssels"""
+    global _layout_fingerprint
+    if _layout_fingerprint is None:
+        styles = make_styles()
+        data = {
+            "page": [PAGE_WIDTH, PAGE_HEIGHT, MARGIN_TOP, MARGIN_RIGHT, MARGIN_BOTTOM, MARGIN_LEFT],
+            "fonts": FONTS,
+            "styles": {name: {k: repr(getattr(style, k)) for k in sorted(style.defaults)}
+                       for name, style in sorted(styles.items())},
+            "reportlab": reportlab.Version,
+        }
+        _layout_fingerprint = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+    return _layout_fingerprint
+
+
+def section_key(kind, data):
+    """Cache-Schlüssel eines Abschnitts aus Inhalt und Layout"""
+    h = hashlib.sha256()
+    h.update(layout_fingerprint().encode("ascii"))
+    h.update(json.dumps([kind, data], sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return h.hexdigest()
+
+
+def layout_section(flowables):
+    """
+    Setzt einen Abschnitt für sich.
+    Rückgabe (JSON-fähig): {"pages": Inhalts-Streams der Seiten}
+    """
+    made = []
+
+    def canvasmaker(*args, **kwargs):
+        made.append(_FragmentCanvas(*args, **kwargs))
+        return made[-1]
+
+    make_doc(io.BytesIO()).build(LazyStory(flowables), canvasmaker=canvasmaker)
+    return {"pages": made[0].fragment_pages}
+
+
+def build_pdf(out, title, subtitle, chapters, cache=None, on_chapter=None):
+    """
+    Schreibt das PDF nach ``out`` (Pfad oder Datei-Objekt), Seite für Seite
+    während des Setzens (siehe PdfPageWriter).
+    ``chapters`` darf ein Generator sein; ``cache`` (get/put) liefert bereits
+    gesetzte Abschnitte, ``on_chapter(fertige Kapitel, aus dem Cache)`` meldet
+    den Fortschritt. Rückgabe: {"pages", "chapters", "reused"}.
+    """
+    if isinstance(out, (str, os.PathLike)):
+        with open(out, "wb") as f:
+            return build_pdf(f, title, subtitle, chapters, cache, on_chapter)
+
+    styles = make_styles()
+    writer = PdfPageWriter(out, title=title)
+    stats = {"pages": 0, "chapters": 0, "reused": 0}
+
+    def add_section(kind, data, flowables):
+        key = section_key(kind, data)
+        fragment = cache.get(key) if cache is not None else None
+        reused = fragment is not None
+        if not reused:
+            fragment = layout_section(flowables)
+            if cache is not None:
+                cache.put(key, fragment)
+        writer.add_fragment(fragment)
+        return reused
+
+    add_section("title", [title, subtitle], title_flowables(title, subtitle, styles))
+    for chapter in chapters:
+        if add_section("chapter", chapter, chapter_flowables(chapter, styles)):
+            stats["reused"] += 1
+        stats["chapters"] += 1
+        if on_chapter:
+            on_chapter(stats["chapters"], stats["reused"])
+    writer.close()
+    stats["pages"] = writer.page_count
+    return stats
+
+
+# ---------- Quelle: Browser-HTML ----------
+
+def chapters_from_html(html_content):
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    chapters = []
+    for section in soup.find_all('section', class_='chapter-section'):
+        chapter_title_elem = section.find('h1', class_='chapter-title')
+        chapter_title = chapter_title_elem.get_text().strip() if chapter_title_elem else ""
+
+        paragraphs = []
+        scene_break_next = False
+        for p_tag in section.find_all('p'):
+            classes = p_tag.get('class', [])
+            if 'scene-sep' in classes:
+                scene_break_next = True
+                continue
+            text = p_tag.get_text().strip()
+            if not text:
+                continue
+            is_first = 'dropcap' in classes or scene_break_next
+            paragraphs.append({'text': text, 'first': is_first, 'scene_break': scene_break_next})
+            scene_break_next = False
+
+        if chapter_title or paragraphs:
+            chapters.append({'title': chapter_title, 'paragraphs': paragraphs})
+    return chapters
+
+
+# ---------- Quelle: Datenbank ----------
+
+def smart_quotes(text, locale="en"):
+    """Wie smartQuotes() in exportUtils.js"""
+    is_de = (locale or "").lower().startswith("de")
+    open_quote = "„" if is_de else "“"
+    close_quote = "”"
+
+    def repl(m):
+        prev = text[m.start() - 1] if m.start() > 0 else ""
+        return close_quote if prev and not prev.isspace() and prev not in "([{" else open_quote
+
+    return re.sub('"', repl, text)
+
+
+def _text_parts(content):
+    """
+    Textstücke einer Szene ohne Epigramme (:::epigram … :::) als
+    (Index im Teile-Array wie in BookExport.jsx, Text). Epigramme haben
+    keine <p>-Absätze und kommen deshalb auch im HTML-Weg nicht ins PDF.
+    """
+    if not _EPIGRAM_RE.search(content):
+        return [(0, content)]
+    parts = []
+    last = 0
+    for m in _EPIGRAM_RE.finditer(content):
+        if m.start() > last:
+            parts.append(("text", content[last:m.start()]))
+        parts.append(("epigram", None))
+        last = m.end()
+    if last < len(content):
+        parts.append(("text", content[last:]))
+    return [(i, text) for i, (kind, text) in enumerate(parts) if kind == "text"]
+
+
+def iter_db_chapters(events, locale="en", chapter_label="Chapter"):
+    """
+    Kapitel-Struktur aus iter_manuscript_events, Kapitel für Kapitel.
+    Entspricht dem HTML, das BookExport.jsx für dieselben Daten erzeugt.
+    """
+    chapter = None
+    chapter_no = 0
+    scene_idx = 0
+    scene_break_next = False
+
+    for event in events:
+        if event["type"] == "chapter":
+            if chapter is not None:
+                yield chapter
+            chapter_no += 1
+            title = (event["title"] or "").strip()
+            chapter = {
+                "title": smart_quotes(title, locale).strip() if title else f"{chapter_label} {chapter_no}",
+                "paragraphs": [],
+            }
+            scene_idx = 0
+            scene_break_next = False
+            continue
+
+        if scene_idx > 0:
+            scene_break_next = True
+        for part_idx, text in _text_parts(event["content"] or ""):
+            lines = [s.strip() for s in _PARAGRAPH_SPLIT_RE.split(text)]
+            for i, line in enumerate(s for s in lines if s):
+                dropcap = scene_idx == 0 and part_idx == 0 and i == 0
+                chapter["paragraphs"].append({
+                    "text": smart_quotes(line, locale),
+                    "first": dropcap or scene_break_next,
+                    "scene_break": scene_break_next,
+                })
+                scene_break_next = False
+        scene_idx += 1
+
+    if chapter is not None:
+        yield chapter
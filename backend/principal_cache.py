@@ -0,0 +1,199 @@
+# backend/principal_cache.py
+"""
+In-Process-Cache für authentifizierte User ("Principals").
+
+token_auth_required hat nach dem JWT-Decode bei jedem API-Call den User
+aus der DB geladen. Der Cache hält pro user_id einen schlanken Snapshot
+der Felder, die die Routen lesen (active, fs_uniquifier, email, name,
+language, ...) – mit TTL und begrenzter Größe (LRU).
+
+Invalidierung:
+- lokal über SQLAlchemy-Events, sobald ein User geändert oder gelöscht
+  wird (Deaktivierung, Passwort-Reset, Sprachwechsel, Flask-Admin, ...)
+- zwischen Gunicorn-Workern über einen Broadcast-Hook. Auf Postgres wird
+  dafür LISTEN/NOTIFY genutzt (siehe ``start_pg_listener``); andere
+  Backends verlassen sich auf die TTL.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, text
+
+
+NOTIFY_CHANNEL = "wh_principal_invalidate"
+
+
+class Principal:
+    """Read-only Snapshot eines Users für den Request-Kontext"""
+    __slots__ = ("id", "email", "name", "language", "active", "fs_uniquifier",
+                 "confirmed_at", "created_at")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Principal ist read-only – User über die DB-Session ändern")
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            language=user.language,
+            active=bool(user.active),
+            fs_uniquifier=user.fs_uniquifier,
+            confirmed_at=user.confirmed_at,
+            created_at=user.created_at,
+        )
+
+    def __repr__(self):
+        return f"<Principal {self.id} {self.email}>"
+
+
+class PrincipalCache:
+    """Thread-sicherer LRU-Cache mit TTL, Schlüssel ist die user_id"""
+
+    def __init__(self, ttl=60.0, max_size=1024):
+        self.ttl = float(ttl)
+        self.max_size = int(max_size)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._broadcasters = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        if self.ttl <= 0:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, principal = entry
+            if expires_at < now:
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return principal
+
+    def put(self, principal):
+        if self.ttl <= 0:
+            return principal
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return principal
+
+    def invalidate_local(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def invalidate(self, user_id):
+        """Lokal entfernen und an alle anderen Worker weitergeben"""
+        self.invalidate_local(user_id)
+        for broadcast in list(self._broadcasters):
+            try:
+                broadcast(user_id)
+            except Exception as e:
+                print(f"[PrincipalCache] Broadcast fehlgeschlagen: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def add_broadcaster(self, fn):
+        """Registriert einen Hook ``fn(user_id)`` für Cross-Worker-Invalidierung"""
+        self._broadcasters.append(fn)
+
+    def stats(self):
+        with self._lock:
+            size = len(self._entries)
+        return {"size": size, "max_size": self.max_size, "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses}
+
+
+def cache_from_env():
+    return PrincipalCache(
+        ttl=float(os.getenv("PRINCIPAL_CACHE_TTL", "60")),
+        max_size=int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024")),
+    )
+
+
+def install_invalidation(cache, session_cls, user_model):
+    """
+    Hängt die Invalidierung an SQLAlchemy:
+    - lokal sofort beim Flush (konservativ, auch wenn später ein Rollback folgt)
+    - Broadcast erst nach dem Commit, damit andere Worker den neuen Stand lesen
+    """
+    pending_key = "principal_cache_pending"
+
+    def _mark(session, user_id):
+        if user_id is None:
+            return
+        cache.invalidate_local(user_id)
+        session.info.setdefault(pending_key, set()).add(user_id)
+
+    @event.listens_for(session_cls, "after_flush")
+    def _collect(session, flush_context):
+        for obj in list(session.dirty) + list(session.deleted):
+            if isinstance(obj, user_model):
+                _mark(session, obj.id)
+
+    @event.listens_for(session_cls, "after_commit")
+    def _publish(session):
+        for user_id in session.info.pop(pending_key, ()):
+            cache.invalidate(user_id)
+
+    @event.listens_for(session_cls, "after_soft_rollback")
+    def _discard(session, previous_transaction):
+        session.info.pop(pending_key, None)
+
+
+def start_pg_listener(engine, cache):
+    """
+    Postgres LISTEN/NOTIFY: jeder Worker lauscht auf NOTIFY_CHANNEL und
+    invalidiert lokal; ``cache.invalidate`` sendet das NOTIFY.
+    Auf anderen Datenbanken passiert nichts (TTL greift).
+    """
+    if engine.dialect.name != "postgresql":
+        return None
+
+    def _broadcast(user_id):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                         {"channel": NOTIFY_CHANNEL, "payload": str(user_id)})
+            conn.commit()
+
+    def _listen():
+        import psycopg
+        dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                with psycopg.connect(dsn, autocommit=True) as conn:
+                    conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    # Nach (Re-)Connect könnten Notifies verpasst worden sein
+                    cache.clear()
+                    for notify in conn.notifies():
+                        try:
+                            cache.invalidate_local(int(notify.payload))
+                        except ValueError:
+                            cache.clear()
+            except Exception as e:
+                print(f"[PrincipalCache] LISTEN-Verbindung verloren: {e}")
+                cache.clear()
+                time.sleep(5)
+
+    cache.add_broadcaster(_broadcast)
+    thread = threading.Thread(target=_listen, name="principal-cache-listener", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,134 @@
+# backend/prompt_prefix.py
+"""
+Deterministischer Prompt-Präfix für Schreibgeist (Anthropic Prompt-Caching).
+
+Der Prompt-Cache greift nur, wenn der Anfang des Prompts Byte für Byte
+gleich bleibt. Deshalb ist der System-Prompt in drei Schichten geteilt, jede
+mit eigenem Cache-Breakpoint (``cache_control``):
+
+1. stabil       – Rolle, Projekt, Buchstruktur (Kapitel in Buchreihenfolge,
+                  Charakternamen alphabetisch); ändert sich nur mit
+                  ``Project.prompt_revision``
+2. halb-stabil  – Profile der ausgewählten Charaktere/Orte (nach ID sortiert)
+3. volatil      – verknüpfte Szenen und aktuelle Szene
+
+``prompt_revision`` wird von ORM-Listenern (models.py) hochgezählt, sobald
+sich Projekttitel, Kapitel (Titel/Reihenfolge/Anzahl) oder Charakternamen
+ändern. Der gerenderte stabile Teil liegt pro (Projekt, Revision, Autor) im
+Speicher, ohne Kapitel/Charaktere neu zu laden.
+
+PromptCacheStats sammelt die von der API gemeldeten cache_read/cache_write-
+Tokens als Metriken.
+"""
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+
+def bump_revision(conn, project_id):
+    """Stabilen Präfix des Projekts invalidieren (aus ORM-Listenern)"""
+    conn.execute(text("""
+        UPDATE project SET prompt_revision = COALESCE(prompt_revision, 0) + 1 WHERE id = :pid
+    """), {"pid": project_id})
+
+
+def render_base_system(author_name, project_title, chapter_titles, character_names):
+    """Stabiler Teil; Eingaben müssen bereits deterministisch sortiert sein"""
+    chapter_block = "\n".join(
+        f"- Kapitel {i+1}: {title or '(ohne Titel)'}" for i, title in enumerate(chapter_titles)
+    ) or "Noch keine Kapitel angelegt."
+    character_block = ", ".join(name for name in character_names if name) or "Noch keine Charaktere angelegt."
+
+    return f"""Du bist Schreibgeist, ein kreativer Schreibassistent für {author_name or 'den Autor'}.
+
+Du arbeitest am Projekt: "{project_title}"
+
+Buchstruktur:
+{chapter_block}
+
+Charaktere:
+{character_block}
+
+Deine Aufgabe: Beim kreativen Schreiben helfen – Ideen entwickeln, Feedback geben, Formulierungen vorschlagen.
+Antworte auf Deutsch. Passe die Länge deiner Antwort der Aufgabe an: kurze Fragen knapp beantworten, vollständige Texte vollständig ausschreiben.
+Wenn du Szenentext vorschlägst oder überarbeitest, umschließe den vollständigen Text mit <scene> und </scene>."""
+
+
+def system_blocks(base_system, semi_stable, volatile):
+    """
+    System-Blöcke mit Cache-Breakpoint am Ende jeder nicht-leeren Schicht.
+    ``semi_stable``/``volatile`` sind Listen gerenderter Kontext-Teile.
+    """
+    blocks = [{"type": "text", "text": base_system, "cache_control": {"type": "ephemeral"}}]
+    if semi_stable or volatile:
+        intro = "\n\n---\nAusgewählter Kontext:\n\n"
+        for parts in (semi_stable, volatile):
+            if not parts:
+                continue
+            blocks.append({
+                "type": "text",
+                "text": intro + "\n\n".join(parts),
+                "cache_control": {"type": "ephemeral"},
+            })
+            intro = ""
+    return blocks
+
+
+class PrefixCache:
+    """LRU der gerenderten stabilen Präfixe, Schlüssel (project_id, revision, autor)"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            # Ältere Revisionen desselben Projekts sind nie wieder gültig
+            for stale in [k for k in self._entries if k[0] == key[0] and k[1] < key[1]]:
+                del self._entries[stale]
+            self._entries[key] = value
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class PromptCacheStats:
+    """Summiert die Usage-Angaben der API pro Modell"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+
+    def record(self, model, usage):
+        with self._lock:
+            m = self._models.setdefault(model, {
+                "requests": 0, "input_tokens": 0, "output_tokens": 0,
+                "cache_read": 0, "cache_write": 0,
+            })
+            m["requests"] += 1
+            for key in ("input_tokens", "output_tokens", "cache_read", "cache_write"):
+                m[key] += usage.get(key, 0) or 0
+
+    def snapshot(self):
+        with self._lock:
+            out = {}
+            for model, m in self._models.items():
+                prompt_tokens = m["input_tokens"] + m["cache_read"] + m["cache_write"]
+                out[model] = dict(m, cache_hit_ratio=round(m["cache_read"] / prompt_tokens, 3)
+                                  if prompt_tokens else 0.0)
+            return out
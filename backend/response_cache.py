@@ -0,0 +1,134 @@
+# backend/response_cache.py
+"""
+Antwort-Cache für deterministische LLM-Aufrufe (Kapiteltitel-Vorschläge,
+Charakter-Extraktion).
+
+Schlüssel ist ein SHA-256 über Modell, System-Prompt, Buchsprache und den
+exakten Eingabetext – gleicher Text ergibt dieselbe Antwort ohne neuen
+(bezahlten) Haiku-Call; jede Änderung am Text ergibt einen neuen Schlüssel,
+eine Invalidierung ist deshalb nicht nötig.
+
+Zwei Ebenen:
+- im Speicher: LRU mit TTL, pro Prozess
+- optional in der DB (Tabelle ``llm_response_cache``, LLM_CACHE_DB=1):
+  überlebt Neustarts und wird von allen Gunicorn-Workern geteilt
+
+Nur erfolgreiche Antworten werden gespeichert.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+
+def cache_key(model, system, language, content):
+    h = hashlib.sha256()
+    for part in (model, system, language, content):
+        data = (part or "").encode("utf-8")
+        # Längenpräfix: ("ab", "c") und ("a", "bc") ergeben verschiedene Schlüssel
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, engine=None, max_entries=512, ttl=86400.0, db_tier=False):
+        self.engine = engine
+        self.max_entries = max_entries
+        self.ttl = float(ttl)
+        self.db_tier = bool(db_tier and engine is not None)
+        self._entries = OrderedDict()  # key -> (expires_monotonic, body)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+        body = self._db_get(key) if self.db_tier else None
+        with self._lock:
+            if body is None:
+                self.misses += 1
+                return None
+            self.db_hits += 1
+        self._remember(key, body)
+        return body
+
+    def put(self, key, kind, body):
+        self._remember(key, body)
+        if self.db_tier:
+            self._db_put(key, kind, body)
+
+    def note_bypass(self):
+        with self._lock:
+            self.bypassed += 1
+
+    def _remember(self, key, body):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _db_get(self, key):
+        try:
+            with self.engine.begin() as conn:
+                raw = conn.execute(text("""
+                    SELECT response_json FROM llm_response_cache
+                    WHERE cache_key = :key AND expires_at > :now
+                """), {"key": key, "now": datetime.utcnow()}).scalar()
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            print(f"[ResponseCache] DB-Lesen fehlgeschlagen: {e}", flush=True)
+            return None
+
+    def _db_put(self, key, kind, body):
+        now = datetime.utcnow()
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text("DELETE FROM llm_response_cache WHERE cache_key = :key OR expires_at <= :now"),
+                             {"key": key, "now": now})
+                conn.execute(text("""
+                    INSERT INTO llm_response_cache (cache_key, kind, response_json, created_at, expires_at)
+                    VALUES (:key, :kind, :body, :now, :expires)
+                """), {"key": key, "kind": kind, "body": json.dumps(body, ensure_ascii=False),
+                       "now": now, "expires": now + timedelta(seconds=self.ttl)})
+        except Exception as e:
+            # z.B. paralleler Insert desselben Schlüssels in einem anderen Worker
+            print(f"[ResponseCache] DB-Schreiben fehlgeschlagen: {e}", flush=True)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.db_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "bypassed": self.bypassed,
+                "hit_ratio": round((self.hits + self.db_hits) / lookups, 3) if lookups else 0.0,
+                "db_tier": self.db_tier,
+            }
+
+
+def response_cache_from_env(engine):
+    return ResponseCache(
+        engine,
+        max_entries=int(os.getenv("LLM_CACHE_SIZE", "512")),
+        ttl=float(os.getenv("LLM_CACHE_TTL", "86400")),
+        db_tier=os.getenv("LLM_CACHE_DB", "0").lower() in ("1", "true", "yes"),
+    )
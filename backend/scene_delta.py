@@ -0,0 +1,63 @@
+# backend/scene_delta.py
+"""
+Delta-Autosave für Szenen.
+
+Der Editor schickt statt des kompletten Szenentexts nur Textoperationen
+gegen eine Basis-Revision. Eine Revision ist ein kurzer Hash über den
+Inhalt; sie wird in ``scene.revision`` mitgeschrieben, damit der
+Server Konflikte per Compare-and-Swap erkennen kann.
+
+Operationen (nacheinander auf den jeweils aktuellen Text angewendet):
+
+    {"at": 120, "del": 5, "ins": "neuer Text"}
+
+Offsets und Längen zählen in UTF-16-Code-Units – so wie JavaScript
+Strings indexiert – damit Emojis & Co. im Browser und auf dem Server
+dieselbe Position haben.
+"""
+import hashlib
+
+MAX_OPS = 500
+
+
+class DeltaError(ValueError):
+    """Ungültige Operationsliste"""
+
+
+def content_revision(content) -> str:
+    """Kurzer, stabiler Hash über den Szenentext"""
+    return hashlib.sha256((content or "").encode("utf-8")).hexdigest()[:16]
+
+
+def apply_ops(content, ops) -> str:
+    """Wendet die Operationen auf ``content`` an und gibt den neuen Text zurück"""
+    if not isinstance(ops, list):
+        raise DeltaError("ops must be a list")
+    if len(ops) > MAX_OPS:
+        raise DeltaError("too many ops")
+
+    buf = bytearray((content or "").encode("utf-16-le"))
+    for op in ops:
+        if not isinstance(op, dict):
+            raise DeltaError("op must be an object")
+        at = op.get("at", 0)
+        delete = op.get("del", 0)
+        insert = op.get("ins", "")
+        if (not isinstance(at, int) or not isinstance(delete, int)
+                or isinstance(at, bool) or isinstance(delete, bool)
+                or not isinstance(insert, str)):
+            raise DeltaError("invalid op fields")
+        units = len(buf) // 2
+        if at < 0 or delete < 0 or at + delete > units:
+            raise DeltaError("op out of range")
+        try:
+            buf[at * 2:(at + delete) * 2] = insert.encode("utf-16-le")
+        except UnicodeEncodeError:
+            # einzelnes Surrogat im eingefügten Text
+            raise DeltaError("op splits a character")
+
+    try:
+        return buf.decode("utf-16-le")
+    except UnicodeDecodeError:
+        # Offsets haben ein Surrogat-Paar zerschnitten
+        raise DeltaError("op splits a character")
@@ -0,0 +1,81 @@
+# backend/scene_entities.py
+"""
+Normalisierte Szenen-Tags: spiegelt ``scene.context_manifest`` in die
+indizierte Tabelle ``scene_entity(scene_id, entity_type, entity_id)``.
+
+    {"character_ids": [1, 2], "location_ids": [7]}
+    -> (scene, "character", 1), (scene, "character", 2), (scene, "location", 7)
+
+Damit sind "Szenen, die mit diesen Charakteren/Orten getaggt sind" ein
+Index-Join statt JSON-Parsen aller Szenen in Python. Das Manifest bleibt
+die Quelle; die Tabelle wird bei jedem Schreiben des Manifests per Diff
+nachgezogen.
+"""
+import json
+
+from sqlalchemy import text
+
+
+MANIFEST_KEYS = {
+    "character_ids": "character",
+    "location_ids": "location",
+}
+
+
+def manifest_entities(manifest):
+    """Manifest (dict oder JSON-String) -> Menge von (entity_type, entity_id)"""
+    if isinstance(manifest, str):
+        try:
+            manifest = json.loads(manifest or "{}")
+        except ValueError:
+            return set()
+    if not isinstance(manifest, dict):
+        return set()
+    entities = set()
+    for key, entity_type in MANIFEST_KEYS.items():
+        for raw_id in manifest.get(key) or []:
+            try:
+                entities.add((entity_type, int(raw_id)))
+            except (TypeError, ValueError):
+                continue
+    return entities
+
+
+def sync_scene_entities(conn, scene_id, manifest):
+    """Gleicht die Tags einer Szene mit ihrem Manifest ab (nur Änderungen werden geschrieben)"""
+    wanted = manifest_entities(manifest)
+    current = {(r[0], r[1]) for r in conn.execute(text(
+        "SELECT entity_type, entity_id FROM scene_entity WHERE scene_id = :id"
+    ), {"id": scene_id}).all()}
+    removed = current - wanted
+    added = wanted - current
+    if removed:
+        conn.execute(text("""
+            DELETE FROM scene_entity
+            WHERE scene_id = :scene_id AND entity_type = :entity_type AND entity_id = :entity_id
+        """), [{"scene_id": scene_id, "entity_type": t, "entity_id": i} for t, i in removed])
+    if added:
+        conn.execute(text("""
+            INSERT INTO scene_entity (scene_id, entity_type, entity_id)
+            VALUES (:scene_id, :entity_type, :entity_id)
+        """), [{"scene_id": scene_id, "entity_type": t, "entity_id": i} for t, i in added])
+
+
+def backfill_scene_entities(conn, batch_size=200):
+    """Überträgt alle bestehenden Manifeste (Keyset über scene.id). Gibt die Anzahl Szenen zurück."""
+    last_id = 0
+    synced = 0
+    while True:
+        rows = conn.execute(text("""
+            SELECT id, context_manifest FROM scene
+            WHERE id > :last_id AND context_manifest IS NOT NULL AND context_manifest != '{}'
+            ORDER BY id ASC
+            LIMIT :limit
+        """), {"last_id": last_id, "limit": batch_size}).all()
+        if not rows:
+            break
+        for scene_id, manifest in rows:
+            sync_scene_entities(conn, scene_id, manifest)
+        synced += len(rows)
+        last_id = rows[-1][0]
+    return synced
@@ -0,0 +1,83 @@
+# backend/scene_stream.py
+"""
+Inkrementeller Parser für gestreamte Schreibgeist-Antworten.
+
+Das Modell umschließt vorgeschlagenen Szenentext mit <scene> … </scene>.
+Beim Streaming können die Tags mitten in einem Chunk oder über mehrere
+Chunks verteilt ankommen; der Parser hält dafür nur das kleinstmögliche
+Stück zurück (einen möglichen Tag-Anfang am Chunk-Ende).
+
+Ereignisse (name, payload):
+    ("text",        {"text": ...})  Anzeigetext ohne Tags (auch innerhalb der Szene)
+    ("scene_start", {})
+    ("scene_delta", {"text": ...})  Szenentext
+    ("scene_end",   {})
+"""
+import re
+
+OPEN_TAG = "<scene>"
+CLOSE_TAG = "</scene>"
+
+_SCENE_RE = re.compile(r"<scene>(.*?)</scene>", re.DOTALL)
+
+
+def _partial_tag_length(text, tag):
+    """Länge des längsten Endes von ``text``, das ein Anfang von ``tag`` ist"""
+    for n in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:n]):
+            return n
+    return 0
+
+
+class SceneStreamParser:
+    def __init__(self):
+        self.in_scene = False
+        self._pending = ""
+
+    def _emit_text(self, text):
+        if not text:
+            return []
+        events = [("text", {"text": text})]
+        if self.in_scene:
+            events.append(("scene_delta", {"text": text}))
+        return events
+
+    def feed(self, chunk):
+        """Verarbeitet einen Chunk, gibt die Ereignisse zurück"""
+        events = []
+        self._pending += chunk or ""
+        while True:
+            tag = CLOSE_TAG if self.in_scene else OPEN_TAG
+            idx = self._pending.find(tag)
+            if idx < 0:
+                break
+            events.extend(self._emit_text(self._pending[:idx]))
+            self._pending = self._pending[idx + len(tag):]
+            self.in_scene = not self.in_scene
+            events.append(("scene_start", {}) if self.in_scene else ("scene_end", {}))
+        keep = _partial_tag_length(self._pending, CLOSE_TAG if self.in_scene else OPEN_TAG)
+        ready = self._pending[:len(self._pending) - keep]
+        self._pending = self._pending[len(self._pending) - keep:]
+        events.extend(self._emit_text(ready))
+        return events
+
+    def close(self):
+        """Stream-Ende: Rest ausgeben, offene Szene schließen"""
+        events = self._emit_text(self._pending)
+        self._pending = ""
+        if self.in_scene:
+            self.in_scene = False
+            events.append(("scene_end", {}))
+        return events
+
+
+def split_reply(reply):
+    """
+    Komplette Antwort -> (Anzeigetext, Szenentext oder None).
+    Gleiches Ergebnis wie beim nicht-gestreamten Endpoint.
+    """
+    scene_match = _SCENE_RE.search(reply)
+    scene_content = scene_match.group(1).strip() if scene_match else None
+    if scene_content is None:
+        return reply, None
+    return _SCENE_RE.sub(lambda _m: scene_content, reply), scene_content
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+# backend/search_index.py
+"""
+Volltextsuche über Szenen, Notizen, Charaktere und Weltelemente.
+
+- SQLite: eine FTS5-Tabelle ``search_index``, gepflegt per Trigger auf den
+  Quelltabellen. Die rowid ist aus Typ und id abgeleitet, damit Updates
+  und Deletes den Eintrag direkt treffen statt die Tabelle zu scannen.
+- Postgres: je Quelltabelle eine generierte Spalte ``search_tsv``
+  (tsvector, Titel Gewicht A, Text Gewicht B) mit GIN-Index.
+
+Beides wird von der DB bei jedem INSERT/UPDATE/DELETE mitgeführt – egal ob
+über Raw SQL, ORM oder den Write-Behind-Puffer geschrieben wird.
+
+Treffer kommen nach Relevanz sortiert; die Pagination ist keyset-basiert
+über (score, type, id). In ``snippet`` sind Fundstellen mit den
+Steuerzeichen HIGHLIGHT_START/HIGHLIGHT_END (\\x02/\\x03) markiert – der
+Text ist nicht HTML-escaped, der Client setzt die Markierungen selbst um.
+
+Einrichten/Neuaufbau (idempotent):
+    python search_index.py            # fehlende Strukturen anlegen
+    python search_index.py --rebuild  # SQLite: Index aus den Quelltabellen neu füllen
+"""
+import base64
+import json
+import re
+from collections import namedtuple
+
+from sqlalchemy import text
+
+
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+MAX_LIMIT = 50
+SNIPPET_WORDS = 16
+
+# {r} = Zeilen-Präfix: "NEW." im Trigger, "t." in Abfragen, "" in generierten Spalten
+Source = namedtuple("Source", "doc_type code table title body parent project")
+
+SOURCES = (
+    Source("scene", 1, "scene", "{r}title", "{r}content", "{r}chapter_id",
+           "(SELECT project_id FROM chapter WHERE id = {r}chapter_id)"),
+    Source("scene_note", 2, "scene_note", "{r}title", "{r}content", "{r}scene_id",
+           "(SELECT c.project_id FROM scene s JOIN chapter c ON c.id = s.chapter_id WHERE s.id = {r}scene_id)"),
+    Source("chapter_note", 3, "chapter_note", "{r}title", "{r}content", "{r}chapter_id",
+           "(SELECT project_id FROM chapter WHERE id = {r}chapter_id)"),
+    Source("character_note", 4, "character_note", "{r}title", "{r}content", "{r}character_id",
+           "(SELECT project_id FROM \"character\" WHERE id = {r}character_id)"),
+    Source("worldnode_note", 5, "worldnode_note", "{r}title", "{r}content", "{r}worldnode_id",
+           "(SELECT project_id FROM worldnode WHERE id = {r}worldnode_id)"),
+    Source("character", 6, "\"character\"", "{r}name",
+           "COALESCE({r}summary, '') || ' ' || COALESCE({r}profile_json, '')", "NULL", "{r}project_id"),
+    Source("worldnode", 7, "worldnode", "{r}title", "{r}summary", "NULL", "{r}project_id"),
+)
+SOURCES_BY_TYPE = {s.doc_type: s for s in SOURCES}
+
+# rowid = id * ROWID_SPACE + code (SQLite)
+ROWID_SPACE = 8
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchUnavailable(RuntimeError):
+    """Index nicht eingerichtet (z.B. SQLite ohne FTS5)"""
+
+
+def _fmt(expr, r):
+    return expr.format(r=r)
+
+
+def _columns(source):
+    """Quellspalten, deren Änderung den Index betrifft (für UPDATE OF)"""
+    return sorted(set(re.findall(r"\{r\}(\w+)", source.title + " " + source.body)))
+
+
+# ---------- Einrichtung ----------
+
+def ensure_search_index(conn):
+    """Legt fehlende Index-Strukturen an. True, wenn etwas neu angelegt wurde."""
+    if conn.dialect.name == "postgresql":
+        return _ensure_postgres(conn)
+    return _ensure_sqlite(conn)
+
+
+def _ensure_sqlite(conn):
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    )).first()
+    created = False
+    if not exists:
+        conn.execute(text("""
+            CREATE VIRTUAL TABLE search_index USING fts5(
+                doc_type UNINDEXED, doc_id UNINDEXED, project_id UNINDEXED, parent_id UNINDEXED,
+                title, body,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+        """))
+        created = True
+    for s in SOURCES:
+        rowid = f"{{r}}id * {ROWID_SPACE} + {s.code}"
+        values = (f"{_fmt(rowid, 'NEW.')}, '{s.doc_type}', NEW.id, {_fmt(s.project, 'NEW.')}, "
+                  f"{_fmt(s.parent, 'NEW.')}, {_fmt(s.title, 'NEW.')}, {_fmt(s.body, 'NEW.')}")
+        insert = ("INSERT INTO search_index (rowid, doc_type, doc_id, project_id, parent_id, title, body) "
+                  f"VALUES ({values});")
+        delete = f"DELETE FROM search_index WHERE rowid = {_fmt(rowid, 'OLD.')};"
+        name = s.doc_type
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS search_{name}_ai AFTER INSERT ON {s.table}
+            BEGIN {insert} END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS search_{name}_au AFTER UPDATE OF {', '.join(_columns(s))} ON {s.table}
+            BEGIN {delete} {insert} END
+        """))
+        conn.execute(text(f"""
+            CREATE TRIGGER IF NOT EXISTS search_{name}_ad AFTER DELETE ON {s.table}
+            BEGIN {delete} END
+        """))
+    return created
+
+
+def _ensure_postgres(conn):
+    created = False
+    for s in SOURCES:
+        table_name = s.table.strip('"')
+        has_column = conn.execute(text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_name = :table AND column_name = 'search_tsv'
+        """), {"table": table_name}).first()
+        if not has_column:
+            title = _fmt(s.title, "")
+            body = _fmt(s.body, "")
+            conn.execute(text(f"""
+                ALTER TABLE {s.table} ADD COLUMN search_tsv tsvector GENERATED ALWAYS AS (
+                    setweight(to_tsvector('simple', COALESCE({title}, '')), 'A') ||
+                    setweight(to_tsvector('simple', COALESCE({body}, '')), 'B')
+                ) STORED
+            """))
+            created = True
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table_name}_search_tsv ON {s.table} USING GIN (search_tsv)"
+        ))
+    return created
+
+
+def rebuild_search_index(conn):
+    """
+    Füllt den Index komplett neu aus den Quelltabellen (SQLite).
+    Auf Postgres rechnet die DB die generierten Spalten selbst – dort reicht
+    ensure_search_index. Gibt die Anzahl indizierter Dokumente zurück.
+    """
+    ensure_search_index(conn)
+    if conn.dialect.name == "postgresql":
+        return 0
+    conn.execute(text("DELETE FROM search_index"))
+    total = 0
+    for s in SOURCES:
+        rowid = f"t.id * {ROWID_SPACE} + {s.code}"
+        result = conn.execute(text(f"""
+            INSERT INTO search_index (rowid, doc_type, doc_id, project_id, parent_id, title, body)
+            SELECT {rowid}, '{s.doc_type}', t.id, {_fmt(s.project, 't.')}, {_fmt(s.parent, 't.')},
+                   {_fmt(s.title, 't.')}, {_fmt(s.body, 't.')}
+            FROM {s.table} t
+        """))
+        total += result.rowcount
+    return total
+
+
+# ---------- Suche ----------
+
+def encode_cursor(row):
+    raw = json.dumps([row["score"], row["type"], row["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Cursor -> (score, type, id); ValueError bei ungültigem Cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        score, doc_type, doc_id = json.loads(raw)
+        return float(score), str(doc_type), int(doc_id)
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+
+
+def search(conn, project_id, query, limit=20, cursor=None, types=None):
+    """
+    Rangierte Treffer eines Projekts: (results, next_cursor).
+    ``types`` schränkt auf bestimmte Dokumenttypen ein (siehe SOURCES);
+    unbekannte Typen -> ValueError.
+    """
+    unknown = [t for t in (types or ()) if t not in SOURCES_BY_TYPE]
+    if unknown:
+        raise ValueError(f"unknown types: {', '.join(unknown)}")
+    tokens = _TOKEN.findall(query or "")
+    if not tokens:
+        return [], None
+    limit = max(1, min(int(limit), MAX_LIMIT))
+    types = list(dict.fromkeys(types or SOURCES_BY_TYPE))
+    after = decode_cursor(cursor) if cursor else None
+    if conn.dialect.name == "postgresql":
+        rows = _search_postgres(conn, project_id, tokens, limit + 1, after, types)
+    else:
+        rows = _search_sqlite(conn, project_id, tokens, limit + 1, after, types)
+    results = [dict(r) for r in rows[:limit]]
+    next_cursor = encode_cursor(results[-1]) if len(rows) > limit else None
+    return results, next_cursor
+
+
+def _keyset(after):
+    """WHERE-Zusatz + Parameter für die Seite nach ``after`` (score, type, id)"""
+    if after is None:
+        return "", {}
+    score, doc_type, doc_id = after
+    clause = """
+        AND (score < :after_score
+             OR (score = :after_score AND (type > :after_type
+                                           OR (type = :after_type AND id > :after_id))))
+    """
+    return clause, {"after_score": score, "after_type": doc_type, "after_id": doc_id}
+
+
+def _search_sqlite(conn, project_id, tokens, limit, after, types):
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    )).first()
+    if not exists:
+        raise SearchUnavailable("search_index missing")
+    # Jeder Begriff muss vorkommen, der letzte auch als Präfix (Suche beim Tippen)
+    match = " ".join(f'"{t}"' for t in tokens[:-1]) + f' "{tokens[-1]}"*'
+    type_params = {f"type{i}": t for i, t in enumerate(types)}
+    type_list = ", ".join(f":{k}" for k in type_params)
+    keyset, keyset_params = _keyset(after)
+    sql = text(f"""
+        SELECT * FROM (
+            SELECT doc_type AS type, CAST(doc_id AS INTEGER) AS id, parent_id, title,
+                   -bm25(search_index, 0, 0, 0, 0, 4.0, 1.0) AS score,
+                   snippet(search_index, 5, :hl_start, :hl_end, '…', {SNIPPET_WORDS}) AS snippet
+            FROM search_index
+            WHERE search_index MATCH :match AND project_id = :pid AND doc_type IN ({type_list})
+        )
+        WHERE 1 = 1 {keyset}
+        ORDER BY score DESC, type ASC, id ASC
+        LIMIT :limit
+    """)
+    params = {"match": match.strip(), "pid": project_id, "limit": limit,
+              "hl_start": HIGHLIGHT_START, "hl_end": HIGHLIGHT_END,
+              **type_params, **keyset_params}
+    return conn.execute(sql, params).mappings().all()
+
+
+def _search_postgres(conn, project_id, tokens, limit, after, types):
+    tsquery = " & ".join(tokens[:-1] + [tokens[-1] + ":*"])
+    keyset, keyset_params = _keyset(after)
+    branches = []
+    for s in (SOURCES_BY_TYPE[t] for t in types):
+        branches.append(f"""
+            SELECT '{s.doc_type}' AS type, t.id, {_fmt(s.parent, 't.')} AS parent_id,
+                   {_fmt(s.title, 't.')} AS title, ts_rank_cd(t.search_tsv, q.query) AS score
+            FROM {s.table} t, q
+            WHERE t.search_tsv @@ q.query AND {_fmt(s.project, 't.')} = :pid
+        """)
+    headline_joins = "\n".join(
+        f"LEFT JOIN {s.table} {s.doc_type}_src ON page.type = '{s.doc_type}' AND {s.doc_type}_src.id = page.id"
+        for s in (SOURCES_BY_TYPE[t] for t in types)
+    )
+    body_expr = "COALESCE(" + ", ".join(
+        _fmt(SOURCES_BY_TYPE[t].body, f"{t}_src.") for t in types
+    ) + ")"
+    sql = text(f"""
+        WITH q AS (SELECT to_tsquery('simple', :tsquery) AS query),
+        page AS (
+            SELECT * FROM ({' UNION ALL '.join(branches)}) hits
+            WHERE 1 = 1 {keyset}
+            ORDER BY score DESC, type ASC, id ASC
+            LIMIT :limit
+        )
+        SELECT page.type, page.id, page.parent_id, page.title, page.score,
+               ts_headline('simple', COALESCE({body_expr}, ''), q.query,
+                           :headline_opts) AS snippet
+        FROM page
+        CROSS JOIN q
+        {headline_joins}
+        ORDER BY page.score DESC, page.type ASC, page.id ASC
+    """)
+    params = {"tsquery": tsquery, "pid": project_id, "limit": limit,
+              "headline_opts": (f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, "
+                                f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}"),
+              **keyset_params}
+    return conn.execute(sql, params).mappings().all()
+
+
+def main(argv=None):
+    import argparse
+    from sqlalchemy import create_engine
+
+    try:
+        from backend.auto_migrate import get_database_uri
+    except ImportError:
+        from auto_migrate import get_database_uri
+
+    parser = argparse.ArgumentParser(description="Volltext-Index einrichten / neu aufbauen")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Index komplett aus den Quelltabellen neu füllen (SQLite)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(get_database_uri())
+    with engine.begin() as conn:
+        if args.rebuild:
+            count = rebuild_search_index(conn)
+            print(f"✅ Indexed {count} documents")
+        else:
+            created = ensure_search_index(conn)
+            print("✅ Search index created" if created else "✅ Search index up to date")
+
+
+if __name__ == "__main__":
+    main()
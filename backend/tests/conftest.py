@@ -0,0 +1,51 @@
+# backend/tests/conftest.py
+"""Gemeinsame Fixtures: App auf einer frischen SQLite-DB, angemeldeter User"""
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+
+try:
+    from backend.extensions import db
+    from backend.models import User
+except ImportError:
+    from extensions import db
+    from models import User
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "app.db"))
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.delenv("SCENE_WRITE_BEHIND_SECONDS", raising=False)
+    try:
+        from backend.app import create_app
+    except ImportError:
+        from app import create_app
+    return create_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def headers(app):
+    with app.app_context():
+        user = User(email="autor@example.com", name="Autor", active=True, fs_uniquifier="autor")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    token = jwt.encode({"user_id": user_id, "exp": datetime.utcnow() + timedelta(hours=1)},
+                       app.config["SECRET_KEY"], algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def project(client, headers):
+    """Projekt mit einem Kapitel: {"id", "chapter_id"}"""
+    pid = client.post("/api/projects", json={"title": "Roman"}, headers=headers).get_json()["id"]
+    cid = client.post(f"/api/projects/{pid}/chapters", json={"title": "Eins"},
+                      headers=headers).get_json()["id"]
+    return {"id": pid, "chapter_id": cid}
@@ -0,0 +1,77 @@
+# backend/tests/test_context_packer.py
+"""Token-Budget des Schreibgeist-Kontexts: Auswahl, Auszüge, Bericht"""
+try:
+    from backend.context_packer import GAP, Block, estimate_tokens, excerpt, pack
+except ImportError:
+    from context_packer import GAP, Block, estimate_tokens, excerpt, pack
+
+
+def _paragraphs(*topics, words=60):
+    return "\n\n".join(f"{topic} " + "füllwort " * words for topic in topics)
+
+
+def _scene(key, body, recency=0.0):
+    return Block("scene", key, f"Szene {key}", f"## Szene {key}", body, recency=recency)
+
+
+def test_excerpt_keeps_first_and_relevant_paragraphs():
+    body = _paragraphs("anfang", "wetter", "leuchtturm", "wetter", "ende")
+    text = excerpt(body, 3 * estimate_tokens(body) // 5, {"leuchtturm"})
+    parts = text.split("\n\n")
+
+    assert parts[0].startswith("anfang")
+    assert any(p.startswith("leuchtturm") for p in parts)
+    assert GAP in parts and parts[-1] == GAP
+    assert estimate_tokens(text) <= 3 * estimate_tokens(body) // 5
+
+
+def test_excerpt_cuts_single_paragraph_at_sentence():
+    body = "Erster Satz ist kurz. " * 200
+    text = excerpt(body, 130, set())
+    assert text.endswith(f"kurz. {GAP}")  # nur ein Absatz → keine Lücke dahinter
+    assert estimate_tokens(text) <= 130
+
+
+def test_pack_stays_within_budget_and_keeps_order():
+    blocks = [_scene(i, _paragraphs("leuchtturm" if i == 3 else "wald", "wiese", "see"), recency=i / 10)
+              for i in range(6)]
+    budget = estimate_tokens(blocks[0].render()) * 3
+    packed, report = pack(blocks, budget, "Was passiert am Leuchtturm?")
+
+    assert report["used"] <= budget
+    assert [b.key for b, _ in packed] == sorted(b.key for b, _ in packed)
+    statuses = {r["id"]: r["status"] for r in report["blocks"]}
+    assert statuses[3] == "full"  # relevantester Block zuerst eingeplant
+    assert "omitted" in statuses.values()
+    assert report["blocks"][-1]["status"] == "omitted"  # ausgelassene am Ende des Berichts
+    for block, text in packed:
+        assert text.startswith(block.header)
+
+
+def test_capped_pinned_blocks_come_before_large_current_scene():
+    profile = Block("character", 1, "Anna", "## Anna", _paragraphs("rolle", "aussehen"), pinned=True,
+                    max_tokens=estimate_tokens(_paragraphs("rolle")) + 20)
+    current = Block("scene", 9, "Aktuell", "## Aktuelle Szene", _paragraphs(*["satz"] * 40), pinned=True)
+    budget = 600
+    packed, report = pack([current, profile], budget, "")
+    statuses = {r["id"]: (r["status"], r["tokens"]) for r in report["blocks"]}
+
+    assert statuses[1][0] == "excerpt" and statuses[1][1] <= profile.max_tokens
+    assert statuses[9][0] == "excerpt"
+    assert [b.key for b, _ in packed] == [9, 1]
+    assert report["used"] <= budget
+
+
+def test_stable_blocks_ignore_query():
+    def packed_text(query):
+        block = Block("character", 1, "Anna", "## Anna", _paragraphs("anfang", "wald", "leuchtturm", "see"),
+                      max_tokens=250, stable=True)
+        return pack([block], 1000, query)[0][0][1]
+
+    assert packed_text("leuchtturm") == packed_text("wald")
+
+
+def test_block_omitted_when_budget_too_small_for_excerpt():
+    packed, report = pack([_scene(1, _paragraphs("wald", "see"))], 50, "")
+    assert packed == []
+    assert report["used"] == 0 and report["blocks"][0]["status"] == "omitted"
@@ -0,0 +1,48 @@
+# backend/tests/test_fieldsets.py
+"""Sparse Fieldsets (?fields= / ?exclude=)"""
+import pytest
+
+try:
+    from backend.fieldsets import FieldsetError, parse_fields
+except ImportError:
+    from fieldsets import FieldsetError, parse_fields
+
+SPEC = dict.fromkeys(("id", "title", "content", "status", "revision"))
+DEFAULT = ("id", "title", "content", "status")
+
+
+def test_default_without_parameters():
+    assert parse_fields({}, SPEC, DEFAULT) == list(DEFAULT)
+
+
+def test_fields_follow_spec_order_and_keep_id():
+    assert parse_fields({"fields": "status, title"}, SPEC, DEFAULT) == ["id", "title", "status"]
+    # Felder außerhalb des Defaults sind auf Anfrage erlaubt
+    assert parse_fields({"fields": "revision"}, SPEC, DEFAULT) == ["id", "revision"]
+
+
+def test_exclude_never_drops_id():
+    assert parse_fields({"exclude": "content,id"}, SPEC, DEFAULT) == ["id", "title", "status"]
+    assert parse_fields({"fields": "title,content", "exclude": "content"}, SPEC, DEFAULT) == ["id", "title"]
+
+
+@pytest.mark.parametrize("args", [{"fields": "title,nope"}, {"exclude": "nope"}])
+def test_unknown_field_raises(args):
+    with pytest.raises(FieldsetError, match="unknown_field: nope"):
+        parse_fields(args, SPEC, DEFAULT)
+
+
+def test_endpoint_selects_fields_and_rejects_unknown(client, headers, project):
+    url = f"/api/chapters/{project['chapter_id']}/scenes"
+    client.post(url, json={"title": "A", "content": "Text"}, headers=headers)
+
+    r = client.get(url, query_string={"fields": "title"}, headers=headers)
+    assert r.status_code == 200
+    assert [set(s) for s in r.get_json()] == [{"id", "title"}]
+
+    r = client.get(url, query_string={"exclude": "content"}, headers=headers)
+    assert "content" not in r.get_json()[0] and "status" in r.get_json()[0]
+
+    r = client.get(url, query_string={"fields": "title,secret"}, headers=headers)
+    assert r.status_code == 400
+    assert "unknown_field: secret" in r.get_data(as_text=True)
@@ -0,0 +1,46 @@
+# backend/tests/test_import_pool.py
+"""ImportPool: ein Prozess pro Import, Timeouts treffen nur den eigenen Import"""
+import threading
+import time
+
+import pytest
+
+try:
+    from backend.word_import import ImportPool
+except ImportError:
+    from word_import import ImportPool
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+def _fail():
+    raise ValueError("kaputt")
+
+
+def test_timeout_only_stops_its_own_import():
+    pool = ImportPool(processes=2)
+    results = {}
+
+    def other():
+        results["other"] = pool.run(_sleep, 2.0)
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        pool.run(_sleep, 60, timeout=1.0)
+    assert time.monotonic() - started < 10
+    thread.join(30)
+    assert results == {"other": 2.0}
+
+
+def test_exceptions_reach_the_caller():
+    with pytest.raises(ValueError, match="kaputt"):
+        ImportPool(processes=1).run(_fail)
+
+
+def test_inline_without_processes():
+    assert ImportPool(processes=0).run(_sleep, 0) == 0
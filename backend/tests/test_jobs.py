@@ -0,0 +1,130 @@
+# backend/tests/test_jobs.py
+"""JobRunner: Ergebnis, Grenzen, Timeout und Abbrechen (Tabelle llm_job)"""
+import threading
+import time
+
+import pytest
+
+try:
+    from backend.extensions import db
+    from backend.jobs import FINAL_STATES, JobLimitExceeded, JobQueueFull, JobRunner
+    from backend.models import User
+except ImportError:
+    from extensions import db
+    from jobs import FINAL_STATES, JobLimitExceeded, JobQueueFull, JobRunner
+    from models import User
+
+USER = 1
+
+
+@pytest.fixture
+def engine(app):
+    """Engine mit zwei Usern (llm_job.user_id ist ein Fremdschlüssel)"""
+    with app.app_context():
+        for uid in (USER, USER + 1):
+            db.session.add(User(id=uid, email=f"u{uid}@example.com", name=f"U{uid}",
+                                active=True, fs_uniquifier=f"u{uid}"))
+        db.session.commit()
+        return db.engine
+
+
+@pytest.fixture
+def runners():
+    made = []
+
+    def make(engine, **kwargs):
+        made.append(JobRunner(engine, **kwargs))
+        return made[-1]
+
+    yield make
+    for runner in made:
+        runner._executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _wait(runner, job_id, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id, USER)
+        if job["status"] in FINAL_STATES:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} nicht fertig: {job}")
+
+
+def test_result_and_failure_are_stored(engine, runners):
+    runner = runners(engine, kinds=("t",))
+    ok = runner.submit(USER, "t", lambda: ({"text": "fertig"}, 200))
+    bad = runner.submit(USER, "t", lambda: 1 / 0)
+
+    job = _wait(runner, ok)
+    assert (job["status"], job["status_code"], job["result"]) == ("succeeded", 200, {"text": "fertig"})
+    job = _wait(runner, bad)
+    assert (job["status"], job["status_code"]) == ("failed", 500)
+    assert job["result"]["error"].startswith("job_error: division by zero")
+    assert runner.get(ok, USER + 1) is None  # fremde Jobs bleiben unsichtbar
+
+
+def test_per_user_limit_counts_only_own_kinds(engine, runners):
+    release = threading.Event()
+    runner = runners(engine, per_user=1, kinds=("a",))
+    other = runners(engine, per_user=1, kinds=("b",))
+    first = runner.submit(USER, "a", lambda: (release.wait(5), ({}, 200))[1])
+
+    with pytest.raises(JobLimitExceeded):
+        runner.submit(USER, "a", lambda: ({}, 200))
+    runner.submit(USER + 1, "a", lambda: ({}, 200))  # anderer User
+    second = other.submit(USER, "b", lambda: ({}, 200))  # andere Job-Art
+
+    release.set()
+    assert _wait(runner, first)["status"] == "succeeded"
+    assert _wait(other, second)["status"] == "succeeded"
+    assert runner.rejected == 1
+
+
+def test_queue_full(engine, runners):
+    release = threading.Event()
+    runner = runners(engine, max_workers=1, max_queue=1, per_user=10, kinds=("q",))
+    runner.submit(USER, "q", lambda: (release.wait(5), ({}, 200))[1])
+    runner.submit(USER, "q", lambda: ({}, 200))
+    with pytest.raises(JobQueueFull):
+        runner.submit(USER, "q", lambda: ({}, 200))
+    release.set()
+
+
+def test_late_result_after_timeout_is_discarded(engine, runners):
+    runner = runners(engine, timeout=0.2, kinds=("slow",))
+    job_id = runner.submit(USER, "slow", lambda: (time.sleep(0.5), ({"text": "zu spät"}, 200))[1])
+
+    time.sleep(0.3)
+    assert runner.get(job_id, USER)["status"] == "timed_out"
+    time.sleep(0.4)
+    job = runner.get(job_id, USER)
+    assert job["status"] == "timed_out" and job["result"] is None
+
+
+def test_cancel_queued_job_never_runs(engine, runners):
+    release = threading.Event()
+    ran, done = [], []
+    runner = runners(engine, max_workers=1, per_user=10, kinds=("c",))
+    blocker = runner.submit(USER, "c", lambda: (release.wait(5), ({}, 200))[1])
+    queued = runner.submit(USER, "c", lambda: (ran.append(1), ({}, 200))[1], on_done=lambda: done.append(1))
+
+    assert runner.cancel(queued, USER)["status"] == "cancelled"
+    release.set()
+    _wait(runner, blocker)
+    time.sleep(0.1)
+    assert ran == [] and done == [1]
+    assert runner.get(queued, USER)["status"] == "cancelled"
+
+
+def test_cancel_running_job_discards_result(engine, runners):
+    started, release = threading.Event(), threading.Event()
+    runner = runners(engine, kinds=("r",))
+    job_id = runner.submit(USER, "r", lambda: (started.set(), release.wait(5), ({"text": "x"}, 200))[2])
+
+    assert started.wait(5)
+    runner.cancel(job_id, USER)
+    release.set()
+    time.sleep(0.1)
+    job = runner.get(job_id, USER)
+    assert job["status"] == "cancelled" and job["result"] is None
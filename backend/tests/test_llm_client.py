@@ -0,0 +1,73 @@
+# backend/tests/test_llm_client.py
+"""CircuitBreaker: Zustandswechsel closed → open → half_open → closed/open"""
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    from backend import llm_client
+except ImportError:
+    import llm_client
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Steuerbare Uhr statt time.monotonic"""
+    now = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(llm_client, "time", SimpleNamespace(monotonic=lambda: now.t))
+    return now
+
+
+def _breaker(**kwargs):
+    return llm_client.CircuitBreaker(**{"failures": 3, "window": 60, "slow_seconds": 10, "cooldown": 30, **kwargs})
+
+
+def test_opens_after_failures_within_window(clock):
+    breaker = _breaker()
+    breaker.record(False, 1)
+    breaker.record(True, 11)  # langsam zählt als Fehler
+    breaker.record(True, 1)
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record(False, 1)
+    assert breaker.state == "open" and breaker.trips == 1
+    assert not breaker.allow()
+
+
+def test_failures_outside_window_expire(clock):
+    breaker = _breaker()
+    breaker.record(False, 1)
+    breaker.record(False, 1)
+    clock.t += 61
+    breaker.record(False, 1)
+    assert breaker.state == "closed"
+
+
+def test_half_open_allows_one_probe(clock):
+    breaker = _breaker(failures=1)
+    breaker.record(False, 1)
+    clock.t += 29
+    assert not breaker.allow()
+
+    clock.t += 1
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # nur ein Probe-Call gleichzeitig
+
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+def test_probe_result_closes_or_reopens(clock):
+    breaker = _breaker(failures=1)
+    breaker.record(False, 1)
+    clock.t += 30
+    assert breaker.allow()
+    breaker.record(True, 11)  # zu langsam → wieder offen, Cooldown neu
+    assert breaker.state == "open" and breaker.trips == 2
+    assert not breaker.allow()
+
+    clock.t += 30
+    assert breaker.allow()
+    breaker.record(True, 1)
+    assert breaker.state == "closed" and breaker.allow() and breaker.allow()
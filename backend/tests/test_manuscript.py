@@ -0,0 +1,53 @@
+# backend/tests/test_manuscript.py
+"""Manuskript-Endpoint: ganzes Buch als NDJSON in Buchreihenfolge"""
+import json
+
+
+def _events(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_manuscript_streams_book_order(client, headers, project):
+    first = project["chapter_id"]
+    second = client.post(f"/api/projects/{project['id']}/chapters", json={"title": "Zwei"},
+                         headers=headers).get_json()["id"]
+    empty = client.post(f"/api/projects/{project['id']}/chapters", json={"title": "Leer"},
+                        headers=headers).get_json()["id"]
+    a = client.post(f"/api/chapters/{second}/scenes", json={"title": "A", "content": "Erster Satz."},
+                    headers=headers).get_json()["id"]
+    b = client.post(f"/api/chapters/{first}/scenes", json={"title": "B", "content": "Zweiter"},
+                    headers=headers).get_json()["id"]
+    client.put(f"/api/scenes/{b}", json={"content": "Zweiter Satz, geändert."}, headers=headers)
+
+    r = client.get(f"/api/projects/{project['id']}/manuscript", headers=headers)
+    assert r.status_code == 200
+    assert r.mimetype == "application/x-ndjson"
+    events = _events(r)
+
+    assert events[0]["type"] == "project" and events[0]["title"] == "Roman"
+    assert [(e["type"], e["id"]) for e in events[1:-1]] == [
+        ("chapter", first), ("scene", b), ("chapter", second), ("scene", a), ("chapter", empty)]
+    # Gepufferte Saves sind im Stream schon enthalten
+    assert events[2]["content"] == "Zweiter Satz, geändert."
+    assert events[-1] == {"type": "end", "chapters": 3, "scenes": 2}
+
+
+def test_manuscript_of_foreign_project_is_hidden(app, client, headers, project):
+    try:
+        from backend.extensions import db
+        from backend.models import User
+    except ImportError:
+        from extensions import db
+        from models import User
+    from datetime import datetime, timedelta
+    import jwt
+
+    with app.app_context():
+        other = User(email="fremd@example.com", name="Fremd", active=True, fs_uniquifier="fremd")
+        db.session.add(other)
+        db.session.commit()
+        token = jwt.encode({"user_id": other.id, "exp": datetime.utcnow() + timedelta(hours=1)},
+                           app.config["SECRET_KEY"], algorithm="HS256")
+
+    r = client.get(f"/api/projects/{project['id']}/manuscript", headers={"Authorization": f"Bearer {token}"})
+    assert r.status_code == 404
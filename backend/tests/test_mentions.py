@@ -0,0 +1,90 @@
+# backend/tests/test_mentions.py
+"""Aliasse und Matcher des Erwähnungs-Index, Neuaufbau nach Charakteränderungen"""
+import time
+
+try:
+    from backend.mentions import ProjectMatcher, character_aliases
+except ImportError:
+    from mentions import ProjectMatcher, character_aliases
+
+
+def test_first_name_fallback():
+    assert character_aliases("Anna Berg", None) == ["Anna Berg", "Anna"]
+    assert character_aliases("The Narrator", None) == ["The Narrator"]
+    assert character_aliases("Dr. Weber", None) == ["Dr. Weber"]
+    assert character_aliases("Jo Mahler", None) == ["Jo Mahler"]
+    # Explizit gepflegte Vornamen gelten weiterhin
+    assert character_aliases("Dr. Weber", '{"basic": {"first_name": "Eva"}}') == ["Dr. Weber", "Eva"]
+
+
+def test_title_does_not_match_other_characters():
+    matcher = ProjectMatcher([(1, "Dr. Weber", None), (2, "Dr. Lang", None)])
+    hits = matcher.find("Dr. Lang kam spät, Dr. Weber gar nicht.")
+    assert [(h[0], h[3]) for h in hits] == [(2, "Dr. Lang"), (1, "Dr. Weber")]
+
+
+def test_longest_alias_wins_across_characters():
+    matcher = ProjectMatcher([(1, "Anna", None), (2, "Anna Berg", None)])
+    assert [h[0] for h in matcher.find("Anna Berg lachte.")] == [2]
+
+
+def _wait_for_mention_jobs(app, timeout=10):
+    runner = app.extensions["mention_jobs"]
+    deadline = time.monotonic() + timeout
+    while runner.stats()["pending"] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert not runner.stats()["pending"]
+
+
+def test_new_character_reindexes_other_characters(app, client, headers, project):
+    client.post(f"/api/chapters/{project['chapter_id']}/scenes",
+                json={"content": "Anna Berg lachte. Später kam Berg."}, headers=headers)
+    berg = client.post(f"/api/projects/{project['id']}/characters", json={"name": "Berg"},
+                       headers=headers).get_json()["id"]
+    _wait_for_mention_jobs(app)
+    assert len(client.get(f"/api/characters/{berg}/mentions", headers=headers).get_json()) == 2
+
+    # Der neue, längere Alias übernimmt den ersten Treffer von Berg
+    anna = client.post(f"/api/projects/{project['id']}/characters", json={"name": "Anna Berg"},
+                       headers=headers).get_json()["id"]
+    _wait_for_mention_jobs(app)
+    assert [m["text"] for m in client.get(f"/api/characters/{anna}/mentions", headers=headers).get_json()] \
+        == ["Anna Berg"]
+    assert [m["start"] for m in client.get(f"/api/characters/{berg}/mentions", headers=headers).get_json()] \
+        == [29]
+
+    # Umbenennen gibt den Treffer zurück
+    client.patch(f"/api/characters/{anna}", json={"name": "Bruno"}, headers=headers)
+    _wait_for_mention_jobs(app)
+    assert len(client.get(f"/api/characters/{berg}/mentions", headers=headers).get_json()) == 2
+    assert client.get(f"/api/characters/{anna}/mentions", headers=headers).get_json() == []
+
+
+def test_mention_backfill_runs_once(app, client, headers, project):
+    try:
+        from backend.auto_migrate import auto_migrate
+        from backend.extensions import db
+    except ImportError:
+        from auto_migrate import auto_migrate
+        from extensions import db
+    from sqlalchemy import text
+
+    client.post(f"/api/chapters/{project['chapter_id']}/scenes", json={"content": "Berg kam."}, headers=headers)
+    client.post(f"/api/projects/{project['id']}/characters", json={"name": "Berg"}, headers=headers)
+    _wait_for_mention_jobs(app)
+    with app.app_context():
+        # Bestehende Installation vor dem Backfill
+        db.session.execute(text("DELETE FROM character_mention"))
+        db.session.execute(text("DELETE FROM schema_migration"))
+        db.session.commit()
+
+        auto_migrate()
+        assert db.session.execute(text("SELECT COUNT(*) FROM character_mention")).scalar() == 1
+        assert db.session.execute(text("SELECT name FROM schema_migration ORDER BY name")).scalars().all() \
+            == ["character_mention_index", "scene_entity_backfill"]
+
+        # Ein leerer Index ist kein Grund für einen erneuten Aufbau
+        db.session.execute(text("DELETE FROM character_mention"))
+        db.session.commit()
+        auto_migrate()
+        assert db.session.execute(text("SELECT COUNT(*) FROM character_mention")).scalar() == 0
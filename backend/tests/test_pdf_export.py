@@ -0,0 +1,83 @@
+# backend/tests/test_pdf_export.py
+"""
+PDF-Export: Aufbau der Datei aus PdfPageWriter (xref, Seitenbaum,
+Seitenzahlen) und Schreiben der Seiten während des Setzens.
+"""
+import io
+import re
+import zlib
+
+try:
+    from backend import pdf_export
+except ImportError:
+    import pdf_export
+
+
+def _chapters(n, words=300):
+    for i in range(n):
+        yield {"title": f"Kapitel {i + 1}",
+               "paragraphs": [{"text": "Grüße „zitat“ — " + "wort " * words, "first": j == 0,
+                               "scene_break": j == 3} for j in range(6)]}
+
+
+def _page_streams(data):
+    """Inhalts-Streams in Seitenreihenfolge (Objekt-Nummern laut /Kids)"""
+    kids = re.search(rb"/Type /Pages /Count \d+ /Kids \[([^\]]*)\]", data).group(1)
+    streams = []
+    for page_id in re.findall(rb"(\d+) 0 R", kids):
+        page = re.search(rb"\n%s 0 obj\n(.*?)\nendobj" % page_id, data, re.S).group(1)
+        contents_id = re.search(rb"/Contents (\d+) 0 R", page).group(1)
+        stream = re.search(rb"\n%s 0 obj\n.*?stream\n(.*?)\nendstream" % contents_id, data, re.S).group(1)
+        streams.append(zlib.decompress(stream).decode("latin-1"))
+    return streams
+
+
+def test_build_pdf_writes_consistent_file():
+    out = io.BytesIO()
+    stats = pdf_export.build_pdf(out, "Titel", "Novel", _chapters(3))
+    data = out.getvalue()
+
+    assert data.startswith(b"%PDF-1.4")
+    xref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    assert data[xref:].startswith(b"xref\n")
+    size = int(re.search(rb"/Size (\d+)", data).group(1))
+    entries = data[xref:].split(b"\n")[3:2 + size]
+    for obj_id, entry in enumerate(entries, 1):
+        assert data[int(entry[:10]):].startswith(b"%d 0 obj" % obj_id)
+
+    streams = _page_streams(data)
+    assert stats == {"pages": len(streams), "chapters": 3, "reused": 0}
+    assert len(streams) > 4
+    # Keine Seitenzahl auf der Titelseite, danach fortlaufend
+    assert ") Tj ET Q" not in streams[0]
+    for number, stream in enumerate(streams[1:], 2):
+        assert stream.endswith("(%d) Tj ET Q" % number)
+
+
+def test_pages_are_written_while_laying_out():
+    out = io.BytesIO()
+    written = []
+    pdf_export.build_pdf(out, "Titel", "Novel", _chapters(4),
+                         on_chapter=lambda done, reused: written.append(out.tell()))
+
+    assert written == sorted(written)
+    assert len(set(written)) == 4
+    # Nach dem letzten Kapitel fehlen nur noch Seitenbaum, Fonts und xref
+    assert out.tell() - written[-1] < 2048
+
+
+def test_cached_sections_give_same_file():
+    class Cache(dict):
+        def get(self, key):
+            return dict.get(self, key)
+
+        def put(self, key, value):
+            self[key] = value
+
+    cache = Cache()
+    first, second = io.BytesIO(), io.BytesIO()
+    pdf_export.build_pdf(first, "Titel", "Novel", _chapters(2), cache)
+    stats = pdf_export.build_pdf(second, "Titel", "Novel", _chapters(2), cache)
+
+    assert stats["reused"] == 2
+    assert first.getvalue() == second.getvalue()
@@ -0,0 +1,86 @@
+# backend/tests/test_response_cache.py
+"""Antwort-Cache: TTL, LRU, DB-Ebene und ?nocache=1 am Endpunkt"""
+from types import SimpleNamespace
+
+import pytest
+
+try:
+    from backend import fake_anthropic, response_cache
+    from backend.extensions import db
+    from backend.response_cache import ResponseCache, cache_key
+except ImportError:
+    import fake_anthropic
+    import response_cache
+    from extensions import db
+    from response_cache import ResponseCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Steuerbare Uhr statt time.monotonic"""
+    now = SimpleNamespace(t=1000.0)
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(monotonic=lambda: now.t))
+    return now
+
+
+def test_key_separates_parts():
+    assert cache_key("m", "ab", "de", "c") != cache_key("m", "a", "de", "bc")
+    assert cache_key("m", "s", "de", "text") == cache_key("m", "s", "de", "text")
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = ResponseCache(ttl=60)
+    cache.put("k", "suggest_title", {"suggestions": ["A"]})
+    clock.t += 59
+    assert cache.get("k") == {"suggestions": ["A"]}
+    clock.t += 2
+    assert cache.get("k") is None
+    assert cache.stats() == {"entries": 0, "hits": 1, "db_hits": 0, "misses": 1, "bypassed": 0,
+                             "hit_ratio": 0.5, "db_tier": False}
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "t", {"v": 1})
+    cache.put("b", "t", {"v": 2})
+    cache.get("a")  # a ist jetzt jünger als b
+    cache.put("c", "t", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1} and cache.get("c") == {"v": 3}
+
+
+def test_db_tier_survives_new_process(app, clock):
+    with app.app_context():
+        engine = db.engine
+    ResponseCache(engine, db_tier=True, ttl=60).put("k", "extract_character", {"extracted": {"name": "Anna"}})
+
+    fresh = ResponseCache(engine, db_tier=True, ttl=60)
+    assert fresh.get("k") == {"extracted": {"name": "Anna"}}
+    assert fresh.get("k") == {"extracted": {"name": "Anna"}}  # jetzt aus dem Speicher
+    assert (fresh.db_hits, fresh.hits) == (1, 1)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    server = fake_anthropic.serve(port=0, reply='["Nebel", "Ufer"]', chunk_size=4, delay=0)
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "fake")
+    yield server
+    server.shutdown()
+
+
+def test_suggest_title_cached_unless_nocache(fake_api, app, client, headers, project):
+    cid = project["chapter_id"]
+    client.post(f"/api/chapters/{cid}/scenes", json={"title": "A", "content": "Nebel am Ufer."}, headers=headers)
+    url = f"/api/chapters/{cid}/suggest-title"
+
+    first = client.post(url, headers=headers).get_json()
+    second = client.post(url, headers=headers).get_json()
+    assert first == {"suggestions": ["Nebel", "Ufer"]}
+    assert second == dict(first, cached=True)
+    assert fake_api.handler.requests == 1
+
+    third = client.post(f"{url}?nocache=1", headers=headers).get_json()
+    assert third == first and fake_api.handler.requests == 2
+    assert app.extensions["llm_responses"].stats()["bypassed"] == 1
@@ -0,0 +1,78 @@
+# backend/tests/test_scene_delta.py
+"""Textoperationen des Delta-Autosaves (Offsets in UTF-16-Code-Units)"""
+import pytest
+
+try:
+    from backend.scene_delta import MAX_OPS, DeltaError, apply_ops, content_revision
+except ImportError:
+    from scene_delta import MAX_OPS, DeltaError, apply_ops, content_revision
+
+
+def test_ops_apply_in_order():
+    ops = [{"at": 0, "del": 3, "ins": "Ein"}, {"at": 3, "del": 0, "ins": "e"}, {"at": 9, "ins": "!"}]
+    assert apply_ops("Der Hund.", ops) == "Eine Hund!."
+
+
+def test_offsets_count_utf16_units():
+    # "😀" belegt zwei Code-Units wie in JavaScript
+    assert apply_ops("a😀b", [{"at": 3, "del": 1, "ins": "c"}]) == "a😀c"
+    assert apply_ops("a😀b", [{"at": 1, "del": 2, "ins": "🙂"}]) == "a🙂b"
+    assert apply_ops("ä😀", [{"at": 3, "ins": "!"}]) == "ä😀!"
+
+
+@pytest.mark.parametrize("op", [
+    {"at": 2, "del": 0, "ins": "x"},       # zwischen die Hälften eines Paars
+    {"at": 1, "del": 1, "ins": ""},        # nur das erste Surrogat löschen
+    {"at": 0, "del": 0, "ins": "\ud83d"},  # einzelnes Surrogat einfügen
+])
+def test_split_surrogate_pair_is_rejected(op):
+    with pytest.raises(DeltaError):
+        apply_ops("a😀b", [op])
+
+
+@pytest.mark.parametrize("op", [
+    {"at": -1, "del": 0},
+    {"at": 2, "del": 2},
+    {"at": 5},
+    {"at": True, "del": 0},
+    {"at": "1"},
+    {"at": 0, "ins": 3},
+    "x",
+])
+def test_invalid_ops_are_rejected(op):
+    with pytest.raises(DeltaError):
+        apply_ops("abc", [op])
+
+
+def test_op_count_is_limited():
+    assert apply_ops("", [{"at": i, "ins": "x"} for i in range(MAX_OPS)]) == "x" * MAX_OPS
+    with pytest.raises(DeltaError):
+        apply_ops("", [{"at": 0, "ins": "x"}] * (MAX_OPS + 1))
+    with pytest.raises(DeltaError):
+        apply_ops("", {"at": 0, "ins": "x"})
+
+
+def test_revision_depends_only_on_content():
+    assert content_revision(None) == content_revision("")
+    assert content_revision("a") != content_revision("b")
+    assert len(content_revision("a")) == 16
+
+
+def test_patch_endpoint_maps_errors(client, headers, project):
+    sid = client.post(f"/api/chapters/{project['chapter_id']}/scenes", json={"content": "a😀b"},
+                      headers=headers).get_json()["id"]
+    url = f"/api/scenes/{sid}/content"
+    revision = content_revision("a😀b")
+
+    r = client.patch(url, json={"base_revision": revision, "ops": [{"at": 2, "ins": "x"}]}, headers=headers)
+    assert r.status_code == 400
+
+    r = client.patch(url, json={"base_revision": revision, "ops": [{"at": 3, "del": 1, "ins": "c"}]},
+                     headers=headers)
+    assert r.status_code == 200
+    assert r.get_json()["revision"] == content_revision("a😀c")
+
+    # Alte Basis-Revision: Konflikt statt Überschreiben
+    r = client.patch(url, json={"base_revision": revision, "ops": []}, headers=headers)
+    assert r.status_code == 409
+    assert r.get_json()["revision"] == content_revision("a😀c")
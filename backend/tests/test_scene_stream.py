@@ -0,0 +1,84 @@
+# backend/tests/test_scene_stream.py
+"""
+Schreibgeist-Streaming: Parser für <scene>-Tags in beliebig zerstückelten
+Chunks und der SSE-Endpoint gegen den lokalen Fake der Anthropic-API.
+"""
+import json
+
+import pytest
+
+try:
+    from backend import fake_anthropic
+    from backend.scene_stream import SceneStreamParser, split_reply
+except ImportError:
+    import fake_anthropic
+    from scene_stream import SceneStreamParser, split_reply
+
+REPLY = "Vorschlag: <scene>Es war Nacht.</scene> Passt das?"
+
+
+def _run(chunks):
+    parser = SceneStreamParser()
+    events = []
+    for chunk in chunks:
+        events.extend(parser.feed(chunk))
+    events.extend(parser.close())
+    return events
+
+
+def _summary(events):
+    text = "".join(p["text"] for e, p in events if e == "text")
+    scene = "".join(p["text"] for e, p in events if e == "scene_delta")
+    markers = [e for e, _ in events if e in ("scene_start", "scene_end")]
+    return text, scene, markers
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 7, 100])
+def test_tags_split_across_chunks(size):
+    events = _run([REPLY[i:i + size] for i in range(0, len(REPLY), size)])
+    assert _summary(events) == ("Vorschlag: Es war Nacht. Passt das?", "Es war Nacht.",
+                                ["scene_start", "scene_end"])
+    # Kein Tag-Fragment landet im Anzeigetext
+    assert all("<" not in p["text"] for e, p in events if e == "text")
+
+
+def test_incomplete_tag_is_text_and_open_scene_is_closed():
+    assert _summary(_run(["a <sce", "x"])) == ("a <scex", "", [])
+    assert _summary(_run(["<scene>offen", " bis zum Ende </sc"])) == \
+        ("offen bis zum Ende </sc", "offen bis zum Ende </sc", ["scene_start", "scene_end"])
+
+
+def test_split_reply_matches_blocking_endpoint():
+    assert split_reply(REPLY) == ("Vorschlag: Es war Nacht. Passt das?", "Es war Nacht.")
+    assert split_reply("nur Text") == ("nur Text", None)
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    server = fake_anthropic.serve(port=0, reply=REPLY, chunk_size=4, delay=0)
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "fake")
+    yield server
+    server.shutdown()
+
+
+def test_stream_endpoint_against_fake_api(fake_api, app, client, headers, project):
+    r = client.post(f"/api/projects/{project['id']}/schreibgeist/stream", headers=headers,
+                    json={"messages": [{"role": "user", "text": "Schreib was."}], "model": "haiku"})
+    assert r.status_code == 200
+    assert r.mimetype == "text/event-stream"
+
+    events = []
+    for block in r.get_data(as_text=True).strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+
+    names = [e for e, _ in events]
+    assert names[-1] == "done" and "error" not in names
+    assert names.index("scene_start") < names.index("scene_end")
+    text, scene, _ = _summary(events[:-1])
+    done = events[-1][1]
+    assert text == done["message"] == "Vorschlag: Es war Nacht. Passt das?"
+    assert scene == done["scene_content"] == "Es war Nacht."
+    assert done["usage"]["output_tokens"] > 0
+    assert fake_api.handler.requests == 1
@@ -0,0 +1,67 @@
+# backend/tests/test_search_index.py
+"""Volltextsuche: Typ-Filter, Keyset-Cursor, Fehlerfälle (SQLite-Weg)"""
+import pytest
+
+try:
+    from backend import search_index
+except ImportError:
+    import search_index
+
+
+def _scenes(client, headers, project, contents):
+    for i, content in enumerate(contents):
+        client.post(f"/api/chapters/{project['chapter_id']}/scenes",
+                    json={"title": f"Szene {i}", "content": content, "order_index": i}, headers=headers)
+
+
+def test_unknown_types_are_rejected_before_querying():
+    with pytest.raises(ValueError, match="unknown types: bogus"):
+        search_index.search(None, 1, "anna", types=["bogus"])
+    with pytest.raises(ValueError):
+        search_index.search(None, 1, "anna", types=["scene", "bogus"])
+
+
+def test_unknown_types_return_400(client, headers, project):
+    r = client.get(f"/api/projects/{project['id']}/search?q=anna&types=bogus", headers=headers)
+    assert r.status_code == 400
+
+
+def test_types_filter(client, headers, project):
+    _scenes(client, headers, project, ["Anna geht."])
+    client.post(f"/api/projects/{project['id']}/characters", json={"name": "Anna"}, headers=headers)
+
+    def types(query):
+        r = client.get(f"/api/projects/{project['id']}/search?q=anna{query}", headers=headers)
+        assert r.status_code == 200
+        return sorted(hit["type"] for hit in r.get_json()["results"])
+
+    assert types("") == ["character", "scene"]
+    assert types("&types=scene") == ["scene"]
+    assert types("&types=character,scene") == ["character", "scene"]
+
+
+def test_cursor_pages_through_all_hits(client, headers, project):
+    _scenes(client, headers, project, [f"Anna {'Anna ' * i}ruft." for i in range(7)])
+    seen, cursor = [], None
+    for _ in range(10):
+        url = f"/api/projects/{project['id']}/search?q=anna&limit=3"
+        r = client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=headers).get_json()
+        seen += [hit["id"] for hit in r["results"]]
+        cursor = r["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_cursor_round_trip_and_invalid_cursor():
+    row = {"score": 1.5, "type": "scene", "id": 42}
+    assert search_index.decode_cursor(search_index.encode_cursor(row)) == (1.5, "scene", 42)
+    with pytest.raises(ValueError):
+        search_index.decode_cursor("kein-cursor")
+
+
+def test_prefix_match_on_last_term(client, headers, project):
+    _scenes(client, headers, project, ["Der Leuchtturm stand im Nebel."])
+    r = client.get(f"/api/projects/{project['id']}/search?q=leucht", headers=headers).get_json()
+    assert len(r["results"]) == 1
+    assert "\x02" in r["results"][0]["snippet"]
@@ -0,0 +1,36 @@
+# backend/tests/test_word_counts.py
+"""Delta-Buchung der Kapitel-/Projektzähler beim Schreiben einer Szene"""
+from types import SimpleNamespace
+
+try:
+    from backend.word_counts import apply_scene_counts
+except ImportError:
+    from word_counts import apply_scene_counts
+
+
+class _Conn:
+    def __init__(self, dialect, stored):
+        self.dialect = SimpleNamespace(name=dialect)
+        self.stored = stored
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return SimpleNamespace(mappings=lambda: SimpleNamespace(first=lambda: self.stored))
+
+
+def test_stored_counts_are_locked_on_postgres():
+    conn = _Conn("postgresql", {"chapter_id": 7, "words": 10, "chars": 50})
+    apply_scene_counts(conn, 1, 12, 60)
+
+    select, updates = conn.statements[0], conn.statements[1:]
+    assert select[0].rstrip().endswith("FOR UPDATE")
+    assert [p for _, p in updates] == [{"chapter_id": 7, "words": 2, "chars": 10}] * 2
+
+
+def test_no_lock_clause_on_sqlite():
+    conn = _Conn("sqlite", {"chapter_id": 7, "words": 10, "chars": 50})
+    apply_scene_counts(conn, 1, 10, 50)
+
+    assert "FOR UPDATE" not in conn.statements[0][0]
+    assert len(conn.statements) == 1  # kein Delta, keine Updates
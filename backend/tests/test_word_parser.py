@@ -0,0 +1,46 @@
+# backend/tests/test_word_parser.py
+"""
+Streaming-Parser gegen python-docx auf dem generierten Korpus aus
+bench_word_parser.py (kleine Dateien, läuft in Sekunden).
+"""
+import io
+
+import pytest
+
+try:
+    from backend import word_parser
+    from backend.bench_word_parser import build_corpus, parse_events, shape, _rss_growth_kb
+except ImportError:
+    import word_parser
+    from bench_word_parser import build_corpus, parse_events, shape, _rss_growth_kb
+
+CORPUS = build_corpus(paragraph_sizes=(300,), seed=1)
+
+
+@pytest.mark.parametrize("name,data,expected,paragraphs", CORPUS, ids=[c[0] for c in CORPUS])
+def test_streaming_matches_python_docx(name, data, expected, paragraphs):
+    reference = word_parser.parse_word_document(io.BytesIO(data))
+    streamed = word_parser.parse_word_document_streaming(io.BytesIO(data))
+    assert streamed == reference
+
+
+@pytest.mark.parametrize("name,data,expected,paragraphs", CORPUS, ids=[c[0] for c in CORPUS])
+def test_events_match_generated_structure(name, data, expected, paragraphs):
+    got, read = parse_events(data)
+    assert got == expected
+    assert read == paragraphs
+    assert shape(word_parser.parse_word_document_streaming(io.BytesIO(data))["chapters"]) == expected
+
+
+def test_broken_file_raises_value_error():
+    _, data, _, _ = CORPUS[0]
+    with pytest.raises(ValueError):
+        word_parser.parse_word_document_streaming(io.BytesIO(data[: len(data) // 2]))
+
+
+def test_rss_measurement_sees_control_allocation():
+    small = _rss_growth_kb(4 * 1024, "control")
+    if small is None:
+        pytest.skip("RSS-Spitze lässt sich hier nicht messen")
+    large = _rss_growth_kb(40 * 1024, "control")
+    assert 0.75 * 36 * 1024 < large - small < 1.25 * 36 * 1024
@@ -0,0 +1,135 @@
+# backend/tests/test_write_buffer.py
+"""
+Write-Behind-Puffer mit mehreren Workern: zwei App-Instanzen (je ein eigener
+Puffer, wie zwei Gunicorn-Worker) auf derselben SQLite-DB.
+"""
+from datetime import datetime, timedelta
+
+import jwt
+import pytest
+from sqlalchemy import text
+
+try:
+    from backend.extensions import db
+    from backend.models import User
+    from backend.write_buffer import SceneWriteBuffer
+except ImportError:
+    from extensions import db
+    from models import User
+    from write_buffer import SceneWriteBuffer
+
+
+@pytest.fixture
+def workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "app.db"))
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    # Langes Fenster: geflusht wird nur explizit im Test
+    monkeypatch.setenv("SCENE_WRITE_BEHIND_SECONDS", "600")
+    try:
+        from backend.app import create_app
+    except ImportError:
+        from app import create_app
+    apps = [create_app(), create_app()]
+    yield apps
+    for app in apps:
+        app.extensions["scene_write_buffer"].close()
+
+
+@pytest.fixture
+def scene(workers):
+    app = workers[0]
+    with app.app_context():
+        user = User(email="a@example.com", name="A", active=True, fs_uniquifier="u1")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    token = jwt.encode({"user_id": user_id, "exp": datetime.utcnow() + timedelta(hours=1)},
+                       app.config["SECRET_KEY"], algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+    pid = client.post("/api/projects", json={"title": "P"}, headers=headers).get_json()["id"]
+    cid = client.post(f"/api/projects/{pid}/chapters", json={"title": "K"}, headers=headers).get_json()["id"]
+    sid = client.post(f"/api/chapters/{cid}/scenes", json={"content": "null"},
+                      headers=headers).get_json()["id"]
+    return {"headers": headers, "project_id": pid, "chapter_id": cid, "scene_id": sid}
+
+
+def _db_row(app, sql, **params):
+    with app.app_context():
+        return db.session.execute(text(sql), params).mappings().first()
+
+
+def test_stale_buffer_does_not_overwrite_newer_save(workers, scene):
+    a, b = workers
+    sid, headers = scene["scene_id"], scene["headers"]
+
+    # Worker A puffert einen Save, danach speichert Worker B auf demselben Stand
+    r = a.test_client().put(f"/api/scenes/{sid}", json={"content": "eins"}, headers=headers)
+    assert r.status_code == 200
+    stale_revision = r.get_json()["revision"]
+    r = b.test_client().put(f"/api/scenes/{sid}", json={"content": "zwei drei vier"}, headers=headers)
+    assert r.status_code == 200
+
+    b.extensions["scene_write_buffer"].flush_all()
+    a.extensions["scene_write_buffer"].flush_all()
+
+    row = _db_row(a, "SELECT content, word_count FROM scene WHERE id = :id", id=sid)
+    assert row["content"] == "zwei drei vier"
+    assert a.extensions["scene_write_buffer"].stats()["conflicts"] == 1
+    # Zähler gehören zum geschriebenen Stand, der verworfene Flush hat nichts gebucht
+    chapter = _db_row(a, "SELECT word_count FROM chapter WHERE id = :id", id=scene["chapter_id"])
+    assert chapter["word_count"] == row["word_count"] == 3
+
+    # Der Client von Worker A sieht beim nächsten Delta-Save den Konflikt
+    r = a.test_client().patch(f"/api/scenes/{sid}/content", headers=headers,
+                              json={"base_revision": stale_revision, "ops": [{"at": 0, "del": 0, "ins": "x"}]})
+    assert r.status_code == 409
+
+
+def test_saves_on_one_worker_are_written(workers, scene):
+    a, _ = workers
+    sid, headers = scene["scene_id"], scene["headers"]
+    client = a.test_client()
+    client.put(f"/api/scenes/{sid}", json={"content": "eins"}, headers=headers)
+    r = client.put(f"/api/scenes/{sid}", json={"content": "eins zwei"}, headers=headers)
+
+    a.extensions["scene_write_buffer"].flush_all()
+
+    row = _db_row(a, "SELECT content, revision FROM scene WHERE id = :id", id=sid)
+    assert row["content"] == "eins zwei"
+    assert row["revision"] == r.get_json()["revision"]
+    assert a.extensions["scene_write_buffer"].stats()["conflicts"] == 0
+
+
+def test_entry_stays_visible_while_flushing():
+    seen = []
+
+    def writer(scene_id, updates, base_revision):
+        seen.append(buffer.get(scene_id))
+        return True
+
+    buffer = SceneWriteBuffer(writer, window=600)
+    buffer.stage(1, 10, 100, {"id": 1, "content": "neu", "revision": "r1"}, {"content": "neu"}, "r0")
+    buffer.flush(scene_id=1)
+
+    assert seen == [{"id": 1, "content": "neu", "revision": "r1"}]
+    assert buffer.get(1) is None
+
+
+def test_requeued_entry_keeps_base_revision():
+    calls = []
+
+    def writer(scene_id, updates, base_revision):
+        calls.append((dict(updates), base_revision))
+        if len(calls) == 1:
+            # Während des fehlschlagenden Flushs kommt ein neuer Save
+            buffer.stage(1, 10, 100, {"id": 1, "revision": "r2"}, {"title": "B"}, "r1")
+            raise RuntimeError("DB weg")
+        return True
+
+    buffer = SceneWriteBuffer(writer, window=600)
+    buffer.stage(1, 10, 100, {"id": 1, "revision": "r1"}, {"content": "A"}, "r0")
+    buffer.flush_all()
+    buffer.flush_all()
+
+    assert calls[1] == ({"content": "A", "title": "B"}, "r0")
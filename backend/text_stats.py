@@ -0,0 +1,83 @@
+# backend/text_stats.py
+"""
+Abgeleitete Szenen-Felder, die beim Schreiben berechnet und gespeichert
+werden, damit Übersichten nie den vollen Szenentext lesen müssen:
+
+- revision:   Hash über den Inhalt (Delta-Autosave, siehe scene_delta)
+- preview:    whitespace-kollabierter, gekürzter Anfang des Texts
+- word_count: Anzahl Wörter
+- char_count: Anzahl Zeichen (inkl. Leerzeichen)
+"""
+import re
+
+from sqlalchemy import text
+
+try:
+    from backend.scene_delta import content_revision
+except ImportError:
+    from scene_delta import content_revision
+
+
+PREVIEW_LENGTH = 400
+
+_WS = re.compile(r"\s+")
+
+
+def scene_preview(content) -> str:
+    """Vorschau wie im Editor: Whitespace kollabiert, max. PREVIEW_LENGTH Zeichen"""
+    collapsed = _WS.sub(" ", content or "").strip()
+    if len(collapsed) <= PREVIEW_LENGTH:
+        return collapsed
+    return collapsed[:PREVIEW_LENGTH - 1].rstrip() + "…"
+
+
+def count_words(content) -> int:
+    return len((content or "").split())
+
+
+def count_chars(content) -> int:
+    return len(content or "")
+
+
+def derived_scene_fields(content) -> dict:
+    """Alle gespeicherten Ableitungen aus dem Szenentext"""
+    return {
+        "revision": content_revision(content),
+        "preview": scene_preview(content),
+        "word_count": count_words(content),
+        "char_count": count_chars(content),
+    }
+
+
+def backfill_scene_fields(conn, batch_size=200, only_missing=True):
+    """
+    Berechnet die abgeleiteten Felder für bestehende Szenen nach.
+    Liest die Szenen batchweise (Keyset über id), damit der Speicher flach bleibt.
+    Gibt die Anzahl aktualisierter Szenen zurück.
+    """
+    where = "AND (preview IS NULL OR char_count IS NULL)" if only_missing else ""
+    last_id = 0
+    updated = 0
+    while True:
+        rows = conn.execute(text(f"""
+            SELECT id, content FROM scene
+            WHERE id > :last_id {where}
+            ORDER BY id ASC
+            LIMIT :limit
+        """), {"last_id": last_id, "limit": batch_size}).all()
+        if not rows:
+            break
+        params = []
+        for scene_id, content in rows:
+            fields = derived_scene_fields(content)
+            fields["id"] = scene_id
+            params.append(fields)
+        conn.execute(text("""
+            UPDATE scene
+            SET revision = :revision, preview = :preview,
+                word_count = :word_count, char_count = :char_count
+            WHERE id = :id
+        """), params)
+        updated += len(rows)
+        last_id = rows[-1][0]
+    return updated
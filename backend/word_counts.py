@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# backend/word_counts.py
+"""
+Materialisierte Wort-/Zeichenzähler für Kapitel und Projekte.
+
+Jede Szene speichert word_count/char_count beim Schreiben (siehe text_stats).
+chapter.word_count/char_count und project.word_count/char_count sind die
+Summen darüber und werden inkrementell per Delta gepflegt – nie neu
+summiert. Invariante:
+
+    chapter.word_count = SUM(COALESCE(scene.word_count, 0)) der Kapitel-Szenen
+    project.word_count = SUM(chapter.word_count) der Projekt-Kapitel
+
+Die Deltas sind atomare ``SET x = x + :delta``-Updates, parallele Saves
+verschiedener Szenen zählen also korrekt. Gleichzeitige Saves derselben
+Szene serialisiert apply_scene_counts über eine Zeilensperre (Postgres:
+``FOR UPDATE``; SQLite schreibt ohnehin nur seriell). Sollte doch etwas
+auseinanderlaufen (z.B. Schreiben an der App vorbei), stellt der Rebuild den
+Stand aus den Szenen wieder her:
+
+    python word_counts.py                 # alle Projekte
+    python word_counts.py --project 42    # ein Projekt
+    python word_counts.py --rescan        # vorher Szenen-Zähler aus content neu berechnen
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+
+_CHAPTER_DELTA_SQL = text("""
+    UPDATE chapter
+    SET word_count = COALESCE(word_count, 0) + :words,
+        char_count = COALESCE(char_count, 0) + :chars
+    WHERE id = :chapter_id
+""")
+
+_PROJECT_DELTA_SQL = text("""
+    UPDATE project
+    SET word_count = COALESCE(word_count, 0) + :words,
+        char_count = COALESCE(char_count, 0) + :chars
+    WHERE id = (SELECT project_id FROM chapter WHERE id = :chapter_id)
+""")
+
+_STORED_SCENE_SQL = """
+    SELECT chapter_id, COALESCE(word_count, 0) AS words, COALESCE(char_count, 0) AS chars
+    FROM scene
+    WHERE id = :id
+"""
+
+
+@contextmanager
+def write_transaction(engine):
+    """
+    Schreibende Verbindung mit echter Transaktion: Szenen-Update und Zähler-
+    Delta werden gemeinsam committet oder verworfen (die App läuft sonst im
+    AUTOCOMMIT, dort ist ``engine.begin()`` keine Transaktion).
+    """
+    isolation = "READ COMMITTED" if engine.dialect.name == "postgresql" else "SERIALIZABLE"
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level=isolation)
+        with conn.begin():
+            yield conn
+
+
+def apply_delta(conn, chapter_id, words, chars):
+    """Verschiebt die Summen von Kapitel und Projekt um das Delta"""
+    if not words and not chars:
+        return
+    params = {"chapter_id": chapter_id, "words": words, "chars": chars}
+    conn.execute(_CHAPTER_DELTA_SQL, params)
+    conn.execute(_PROJECT_DELTA_SQL, params)
+
+
+def apply_scene_counts(conn, scene_id, word_count, char_count):
+    """
+    Vor dem Schreiben einer Szene aufrufen: bucht die Differenz zwischen den
+    gespeicherten und den neuen Zählern auf Kapitel und Projekt.
+    Für DELETE mit 0/0 aufrufen.
+
+    In derselben Transaktion wie das Szenen-Update aufrufen (write_transaction):
+    auf Postgres bleibt die Szenenzeile bis zum Commit gesperrt, ein paralleler
+    Save derselben Szene liest die Zähler erst danach und bucht sein Delta
+    gegen den neuen Stand.
+    """
+    lock = " FOR UPDATE" if conn.dialect.name == "postgresql" else ""
+    stored = conn.execute(text(_STORED_SCENE_SQL + lock), {"id": scene_id}).mappings().first()
+    if not stored:
+        return
+    apply_delta(conn, stored["chapter_id"],
+                (word_count or 0) - stored["words"], (char_count or 0) - stored["chars"])
+
+
+def rebuild_counts(conn, project_id=None):
+    """
+    Berechnet Kapitel- und Projektsummen aus den gespeicherten Szenen-Zählern neu.
+    Gibt die Anzahl neu berechneter Kapitel zurück.
+    """
+    chapter_where = "WHERE project_id = :pid" if project_id is not None else ""
+    project_where = "WHERE id = :pid" if project_id is not None else ""
+    params = {"pid": project_id}
+    result = conn.execute(text(f"""
+        UPDATE chapter
+        SET word_count = (SELECT COALESCE(SUM(s.word_count), 0) FROM scene s WHERE s.chapter_id = chapter.id),
+            char_count = (SELECT COALESCE(SUM(s.char_count), 0) FROM scene s WHERE s.chapter_id = chapter.id)
+        {chapter_where}
+    """), params)
+    conn.execute(text(f"""
+        UPDATE project
+        SET word_count = (SELECT COALESCE(SUM(c.word_count), 0) FROM chapter c WHERE c.project_id = project.id),
+            char_count = (SELECT COALESCE(SUM(c.char_count), 0) FROM chapter c WHERE c.project_id = project.id)
+        {project_where}
+    """), params)
+    return result.rowcount
+
+
+def main(argv=None):
+    import argparse
+    from sqlalchemy import create_engine
+
+    try:
+        from backend.auto_migrate import get_database_uri
+        from backend.text_stats import backfill_scene_fields
+    except ImportError:
+        from auto_migrate import get_database_uri
+        from text_stats import backfill_scene_fields
+
+    parser = argparse.ArgumentParser(description="Wort-/Zeichenzähler neu aufbauen")
+    parser.add_argument("--project", type=int, default=None, help="nur dieses Projekt")
+    parser.add_argument("--rescan", action="store_true",
+                        help="Szenen-Zähler vorher aus dem Szenentext neu berechnen (alle Szenen)")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(get_database_uri())
+    with engine.begin() as conn:
+        if args.rescan:
+            scenes = backfill_scene_fields(conn, only_missing=False)
+            print(f"✅ Recomputed counts for {scenes} scenes")
+        chapters = rebuild_counts(conn, args.project)
+        print(f"✅ Rebuilt word/char counts for {chapters} chapters")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+# backend/word_import.py
+"""
+Schreibt ein importiertes Word-Dokument als neues Projekt in die DB.
+
+Projekt, Kapitel und Szenen entstehen in EINER expliziten Transaktion – die
+App läuft sonst im AUTOCOMMIT; schlägt der Import fehl (kaputte Datei, DB-
+Fehler), bleibt nichts zurück und es muss kein halbes Projekt gelöscht werden.
+
+Statt pro Kapitel ein ORM-Flush für die ID und pro Szene ein INSERT:
+- Kapitel gesammelt als ein INSERT … RETURNING id (insertmanyvalues)
+- Szenen per executemany in Batches zu ``batch_size``
+- Kapitel-/Projekt-Zähler und prompt_revision am Ende in je einem Update
+
+Ein Buch mit 400 Szenen braucht so eine Handvoll Round-Trips statt ~800.
+
+Die ORM-Listener (models.py) laufen bei Core-Inserts nicht, ihre Wirkung
+wird hier nachgebildet: abgeleitete Szenenfelder (text_stats), Wort-/Zeichen-
+summen (word_counts) und prompt_revision (prompt_prefix). Mentions gibt es in
+einem neuen Projekt noch keine (keine Charaktere); der Suchindex wird per
+DB-Trigger gepflegt (search_index).
+
+Große Dateien laufen als Job (POST /api/projects?async=1): Das Projekt wird
+sofort mit ``import_status = 'importing'`` angelegt, die hochgeladene Datei
+auf Platte gespoolt und in einem Worker-Prozess (ImportPool) geparst und
+geschrieben – parallel zu anderen Importen, ohne GIL und Gunicorn-Timeout;
+jeder Import hat seinen eigenen Prozess, ein Timeout trifft nur ihn.
+Der Fortschritt (gelesene Absätze, geschriebene Kapitel/Szenen) landet über
+jobs.ProgressReporter im Job; ein Abbruch verwirft die Transaktion.
+"""
+import multiprocessing
+import threading
+import time
+
+from sqlalchemy import create_engine, event, insert, text
+
+try:
+    from backend.models import Project, Chapter, Scene
+    from backend.text_stats import derived_scene_fields
+    from backend.word_parser import iter_word_events
+    from backend.jobs import ProgressReporter
+except ImportError:
+    from models import Project, Chapter, Scene
+    from text_stats import derived_scene_fields
+    from word_parser import iter_word_events
+    from jobs import ProgressReporter
+
+
+BATCH_SIZE = 500
+
+_CHAPTER_COUNTS_SQL = text("""
+    UPDATE chapter SET word_count = :words, char_count = :chars WHERE id = :id
+""")
+
+_PROJECT_COUNTS_SQL = text("""
+    UPDATE project
+    SET word_count = :words, char_count = :chars,
+        prompt_revision = COALESCE(prompt_revision, 0) + 1,
+        import_status = NULL
+    WHERE id = :pid
+""")
+
+
+def import_connection(engine):
+    """Schreibende Verbindung mit eigener Transaktion (statt AUTOCOMMIT)"""
+    isolation = "READ COMMITTED" if engine.dialect.name == "postgresql" else "SERIALIZABLE"
+    return engine.connect().execution_options(isolation_level=isolation)
+
+
+class _ImportWriter:
+    """Puffert Kapitel/Szenen aus iter_word_events und schreibt sie batchweise"""
+
+    def __init__(self, conn, project_id, batch_size):
+        self.conn = conn
+        self.project_id = project_id
+        self.batch_size = batch_size
+        self.pending_chapters = []   # Parameter noch nicht geschriebener Kapitel
+        self.pending_scenes = []     # (Kapitel-Nr., Parameter)
+        self.chapter_ids = []        # Kapitel-Nr. -> id
+        self.counts = []             # Kapitel-Nr. -> [Wörter, Zeichen]
+        self.scenes = 0
+
+    @property
+    def chapters(self):
+        return len(self.chapter_ids)
+
+    def chapter(self, ev):
+        self.pending_chapters.append({
+            "project_id": self.project_id,
+            "title": ev.get("title") or "Kapitel",
+            "order_index": ev.get("order_index", 0),
+        })
+        self.counts.append([0, 0])
+
+    def scene(self, ev):
+        content = ev.get("content", "")
+        params = {
+            "title": ev.get("title") or "Szene",
+            "content": content,
+            "order_index": ev.get("order_index", 0),
+        }
+        params.update(derived_scene_fields(content))
+        no = len(self.counts) - 1
+        self.counts[no][0] += params["word_count"]
+        self.counts[no][1] += params["char_count"]
+        self.pending_scenes.append((no, params))
+        if len(self.pending_scenes) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.pending_chapters:
+            table = Chapter.__table__
+            # Ohne sort_by_parameter_order: SQLite würde sonst Zeile für Zeile
+            # einfügen. order_index ist pro Import eindeutig und ordnet die IDs zu.
+            rows = self.conn.execute(
+                insert(table).returning(table.c.id, table.c.order_index),
+                self.pending_chapters,
+            )
+            ids = {row.order_index: row.id for row in rows}
+            self.chapter_ids.extend(ids[params["order_index"]] for params in self.pending_chapters)
+            self.pending_chapters = []
+        if self.pending_scenes:
+            batch = []
+            for no, params in self.pending_scenes:
+                params["chapter_id"] = self.chapter_ids[no]
+                batch.append(params)
+            self.conn.execute(insert(Scene.__table__), batch)
+            self.scenes += len(batch)
+            self.pending_scenes = []
+
+    def finish(self):
+        self.flush()
+        chapter_counts = [{"id": cid, "words": words, "chars": chars}
+                          for cid, (words, chars) in zip(self.chapter_ids, self.counts)
+                          if words or chars]
+        if chapter_counts:
+            self.conn.execute(_CHAPTER_COUNTS_SQL, chapter_counts)
+        updated = self.conn.execute(_PROJECT_COUNTS_SQL, {
+            "pid": self.project_id,
+            "words": sum(c[0] for c in self.counts),
+            "chars": sum(c[1] for c in self.counts),
+        }).rowcount
+        if not updated:
+            # Projekt wurde während eines Import-Jobs gelöscht
+            raise RuntimeError("Projekt existiert nicht mehr")
+
+
+def _write_document(conn, project_id, file_stream, stats, batch_size, progress=None):
+    """Liest das Dokument und schreibt Kapitel/Szenen über ``conn`` (offene Transaktion)"""
+    writer = _ImportWriter(conn, project_id, batch_size)
+
+    def report(stage, force=False):
+        if progress is not None:
+            progress({"stage": stage, "paragraphs": stats["paragraphs"],
+                      "chapters": writer.chapters, "scenes": writer.scenes}, force=force)
+
+    job = progress
+    events = iter_word_events(file_stream, stats)
+    report("parsing", force=True)
+    if conn.dialect.name == "sqlite":
+        # SQLite sperrt ab dem ersten INSERT die ganze DB, auch für den Fortschritt
+        # und Polls anderer Jobs – dort erst vollständig lesen, dann ohne weitere
+        # Meldungen schreiben (die Schreibphase ist kurz)
+        buffered = []
+        for ev in events:
+            buffered.append(ev)
+            report("parsing")
+        report("writing", force=True)
+        events = buffered
+        progress = None
+    for ev in events:
+        if ev["type"] == "chapter":
+            writer.chapter(ev)
+        else:
+            writer.scene(ev)
+        report("importing")
+    writer.flush()
+    report("committing", force=True)
+    if job is not None:
+        # Letzte Prüfung in der Import-Transaktion: ein inzwischen abgebrochener
+        # oder abgelaufener Job committet nichts mehr
+        job.check(conn)
+    writer.finish()
+    return writer
+
+
+class _RoundTrips:
+    """Zählt Statements auf einer Verbindung"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(self.conn, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.conn, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def _stats(stats, writer, rows, round_trips, seconds):
+    stats.update({
+        "chapters": writer.chapters,
+        "scenes": writer.scenes,
+        "rows": rows,
+        "round_trips": round_trips,
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds, 1) if seconds > 0 else None,
+    })
+    return stats
+
+
+def import_word_project(engine, user_id, title, description, file_stream, batch_size=BATCH_SIZE):
+    """
+    Legt das Projekt an und importiert das Dokument (alles oder nichts).
+    Gibt (project_id, stats) zurück; stats enthält paragraphs, chapters,
+    scenes, rows, round_trips, seconds und rows_per_sec.
+    """
+    stats = {"paragraphs": 0}
+    started = time.perf_counter()
+    with import_connection(engine) as conn, _RoundTrips(conn) as trips:
+        with conn.begin():
+            table = Project.__table__
+            project_id = conn.execute(
+                insert(table).values(user_id=user_id, title=title, description=description)
+                .returning(table.c.id)
+            ).scalar_one()
+            writer = _write_document(conn, project_id, file_stream, stats, batch_size)
+    seconds = time.perf_counter() - started
+    rows = 1 + writer.chapters + writer.scenes
+    return project_id, _stats(stats, writer, rows, trips.count, seconds)
+
+
+def import_into_project(engine, project_id, file_stream, batch_size=BATCH_SIZE, progress=None):
+    """
+    Importiert in ein bestehendes (leeres) Projekt im Zustand 'importing';
+    setzt import_status mit dem Commit zurück. ``progress`` siehe
+    jobs.ProgressReporter.
+    """
+    stats = {"paragraphs": 0}
+    started = time.perf_counter()
+    with import_connection(engine) as conn, _RoundTrips(conn) as trips:
+        with conn.begin():
+            writer = _write_document(conn, project_id, file_stream, stats, batch_size, progress)
+    seconds = time.perf_counter() - started
+    return _stats(stats, writer, writer.chapters + writer.scenes, trips.count, seconds)
+
+
+# ---------- Import-Jobs in Worker-Prozessen ----------
+
+_engines = {}
+
+
+def _process_engine(db_url):
+    """Eine Engine pro Worker-Prozess und DB (wie in der App im AUTOCOMMIT)"""
+    engine = _engines.get(db_url)
+    if engine is None:
+        engine = _engines[db_url] = create_engine(db_url, isolation_level="AUTOCOMMIT", pool_pre_ping=True)
+    return engine
+
+
+def run_import_job(db_url, job_id, project_id, path, progress_interval=0.5, batch_size=BATCH_SIZE):
+    """Einstieg im Worker-Prozess: gespoolte Datei ``path`` in das Projekt importieren"""
+    engine = _process_engine(db_url)
+    progress = ProgressReporter(engine, job_id, progress_interval)
+    with open(path, "rb") as f:
+        stats = import_into_project(engine, project_id, f, batch_size, progress)
+    progress(dict(stats, stage="done"), force=True)
+    return stats
+
+
+def _run_in_child(conn, fn, args):
+    """Einstieg im Import-Prozess: Ergebnis oder Exception über die Pipe zurück"""
+    try:
+        result = ("ok", fn(*args))
+    except BaseException as e:
+        result = ("error", e)
+    try:
+        conn.send(result)
+    except Exception as e:
+        # Exception nicht picklebar
+        conn.send(("error", RuntimeError(f"{type(result[1]).__name__}: {e}")))
+    finally:
+        conn.close()
+
+
+class ImportPool:
+    """
+    Führt jeden Import in einem eigenen Prozess aus (spawn statt fork – die
+    Gunicorn-Worker haben Threads), höchstens ``processes`` gleichzeitig.
+    Ein Timeout beendet nur den Prozess dieses Imports. Mit processes=0
+    läuft der Import im aufrufenden Thread.
+    """
+
+    def __init__(self, processes=2):
+        self.processes = processes
+        self._slots = threading.BoundedSemaphore(max(processes, 1))
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def run(self, fn, *args, timeout=None):
+        """
+        ``fn(*args)`` in einem neuen Prozess. Exceptions aus ``fn`` werden im
+        Aufrufer erneut geworfen; nach ``timeout`` Sekunden wird der Prozess
+        beendet und TimeoutError geworfen.
+        """
+        if self.processes <= 0:
+            return fn(*args)
+        ctx = multiprocessing.get_context("spawn")
+        with self._slots:
+            receiver, sender = ctx.Pipe(duplex=False)
+            process = ctx.Process(target=_run_in_child, args=(sender, fn, args),
+                                  name="word-import", daemon=True)
+            process.start()
+            sender.close()  # sonst merkt recv() das Ende des Prozesses nicht
+            with self._lock:
+                self._running.add(process)
+            try:
+                if not receiver.poll(timeout):
+                    raise TimeoutError(f"Import nach {timeout}s abgebrochen")
+                try:
+                    state, value = receiver.recv()
+                except EOFError:
+                    # Prozess ohne Ergebnis beendet (z.B. OOM-Killer)
+                    process.join()
+                    raise RuntimeError(f"Import-Prozess beendet (Exit-Code {process.exitcode})")
+            finally:
+                receiver.close()
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+                with self._lock:
+                    self._running.discard(process)
+        if state == "error":
+            raise value
+        return value
+
+    def shutdown(self):
+        with self._lock:
+            running = list(self._running)
+        for process in running:
+            process.terminate()
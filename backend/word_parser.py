@@ -1,10 +1,59 @@
 # backend/word_parser.py
 """
 Word-Dokument Parser für automatische Kapitel- und Szenen-Erkennung
+
+- parse_word_document:           python-docx, lädt das ganze Dokument (Referenz)
+- parse_word_document_streaming: liest word/document.xml per iterparse direkt
+                                 aus dem ZIP, ein Durchlauf, gleiches Ergebnis
+- iter_word_events:              dieselbe Erkennung als Ereignisse
+                                 (Kapitel/Szene), z.B. für den Import
 """
+import os
+import posixpath
 import re
+import shutil
+import tempfile
+import zipfile
+import zlib
 from docx import Document
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
+
+# Patterns für Kapitel-Erkennung
+CHAPTER_PATTERNS = [
+    re.compile(r'^(Kapitel|Chapter|Teil|Part)\s+(\d+|[IVXLCDM]+)[\s:]*(.*)$', re.IGNORECASE),
+    re.compile(r'^(\d+)\.?\s+(.+)$'),  # "1. Titel" oder "1 Titel"
+]
+
+# Scene separator patterns
+SCENE_SEPARATOR_PATTERN = re.compile(r'^\s*[\*\-_]{3,}\s*$')
+
+
+def chapter_heading(style_name: str, text: str) -> tuple:
+    """
+    Prüft ob ein Absatz (Style-Name, gestrippter Text) eine Kapitel-Überschrift
+    ist. Returns (is_chapter, title)
+    """
+    # Check if it's a heading style
+    if style_name.startswith('Heading 1') or style_name.startswith('Heading 2'):
+        return True, text
+
+    # Check if it matches chapter patterns
+    if not text:
+        return False, None
+
+    for pattern in CHAPTER_PATTERNS:
+        match = pattern.match(text)
+        if match:
+            # Extrahiere Titel
+            if len(match.groups()) >= 3:
+                title = match.group(3).strip() or f"{match.group(1)} {match.group(2)}"
+            elif len(match.groups()) >= 2:
+                title = match.group(2).strip()
+            else:
+                title = text
+            return True, title
+
+    return False, None
 
 
 def parse_word_document(file_stream) -> Dict[str, Any]:
@@ -45,39 +94,9 @@ def parse_word_document(file_stream) -> Dict[str, Any]:
     current_scene_content = []
     scene_counter = 0
 
-    # Patterns für Kapitel-Erkennung
-    chapter_patterns = [
-        re.compile(r'^(Kapitel|Chapter|Teil|Part)\s+(\d+|[IVXLCDM]+)[\s:]*(.*)$', re.IGNORECASE),
-        re.compile(r'^(\d+)\.?\s+(.+)$'),  # "1. Titel" oder "1 Titel"
-    ]
-
-    # Scene separator patterns
-    scene_separator_pattern = re.compile(r'^\s*[\*\-_]{3,}\s*$')
-
     def is_chapter_heading(paragraph) -> tuple:
         """Prüft ob Paragraph eine Kapitel-Überschrift ist. Returns (is_chapter, title)"""
-        # Check if it's a heading style
-        if paragraph.style.name.startswith('Heading 1') or paragraph.style.name.startswith('Heading 2'):
-            return True, paragraph.text.strip()
-
-        # Check if it matches chapter patterns
-        text = paragraph.text.strip()
-        if not text:
-            return False, None
-
-        for pattern in chapter_patterns:
-            match = pattern.match(text)
-            if match:
-                # Extrahiere Titel
-                if len(match.groups()) >= 3:
-                    title = match.group(3).strip() or f"{match.group(1)} {match.group(2)}"
-                elif len(match.groups()) >= 2:
-                    title = match.group(2).strip()
-                else:
-                    title = text
-                return True, title
-
-        return False, None
+        return chapter_heading(paragraph.style.name, paragraph.text.strip())
 
     def save_current_scene():
         """Speichert die aktuelle Szene"""
@@ -129,7 +148,7 @@ def parse_word_document(file_stream) -> Dict[str, Any]:
             continue
 
         # Prüfe ob Szenen-Separator (***  oder ---)
-        if scene_separator_pattern.match(text):
+        if SCENE_SEPARATOR_PATTERN.match(text):
             save_current_scene()
             continue
 
@@ -187,3 +206,267 @@ def extract_plain_text(file_stream) -> str:
         return '\n\n'.join(para.text.strip() for para in doc.paragraphs if para.text.strip())
     except Exception as e:
         raise ValueError(f"Konnte Word-Dokument nicht lesen: {str(e)}")
+
+
+# ---------- Streaming-Parser (ohne python-docx-Objektbaum) ----------
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_PKG_RELS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CONTENT_TYPES = "{http://schemas.openxmlformats.org/package/2006/content-types}"
+_WML_DOCUMENT_MAIN = "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+
+# Wie docx.styles.BabelFish: interne Namen ("heading 1") -> UI-Namen ("Heading 1")
+_UI_STYLE_NAMES = {
+    "caption": "Caption", "footer": "Footer", "header": "Header",
+    **{f"heading {i}": f"Heading {i}" for i in range(1, 10)},
+}
+
+# Text-Elemente eines Runs wie in python-docx (CT_R.text)
+_RUN_TEXT = {_W + "t", _W + "tab", _W + "br", _W + "cr", _W + "noBreakHyphen", _W + "ptab"}
+
+
+def _seekable(file_stream):
+    """zipfile braucht seek(); nicht seekbare Streams werden in eine Temp-Datei gespoolt"""
+    try:
+        if file_stream.seekable():
+            return file_stream, False
+    except (AttributeError, ValueError):
+        pass
+    spooled = tempfile.TemporaryFile()
+    shutil.copyfileobj(file_stream, spooled, 1024 * 1024)
+    spooled.seek(0)
+    return spooled, True
+
+
+def _rels(zf, part_path):
+    """Beziehungen eines Parts als Liste (Typ, Ziel-Pfad im ZIP)"""
+    from lxml import etree
+
+    folder, name = posixpath.split(part_path)
+    rels_path = posixpath.join(folder, "_rels", name + ".rels")
+    try:
+        root = etree.fromstring(zf.read(rels_path))
+    except KeyError:
+        return []
+    out = []
+    for rel in root.iter(_PKG_RELS + "Relationship"):
+        if rel.get("TargetMode") == "External":
+            continue
+        target = rel.get("Target", "")
+        path = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        out.append((rel.get("Type", ""), path))
+    return out
+
+
+def _content_type(zf, part_path):
+    from lxml import etree
+
+    root = etree.fromstring(zf.read("[Content_Types].xml"))
+    for override in root.iter(_CONTENT_TYPES + "Override"):
+        if override.get("PartName", "").lstrip("/").lower() == part_path.lower():
+            return override.get("ContentType")
+    ext = posixpath.splitext(part_path)[1].lstrip(".").lower()
+    for default in root.iter(_CONTENT_TYPES + "Default"):
+        if default.get("Extension", "").lower() == ext:
+            return default.get("ContentType")
+    return None
+
+
+def load_style_map(styles_xml: bytes):
+    """
+    Absatz-Styles aus styles.xml: ({styleId: UI-Name}, Name des Standard-Absatz-Styles).
+    Wie python-docx: erster Style mit der ID gewinnt, Styles anderen Typs zählen
+    nicht, Standard ist der letzte mit w:default.
+    """
+    from lxml import etree
+
+    root = etree.fromstring(styles_xml)
+    seen = set()
+    names = {}
+    default = None
+    for style in root.iterchildren(_W + "style"):
+        style_id = style.get(_W + "styleId")
+        name_el = style.find(_W + "name")
+        name = name_el.get(_W + "val") if name_el is not None else None
+        name = _UI_STYLE_NAMES.get(name, name)
+        is_paragraph = style.get(_W + "type") == "paragraph"
+        if style_id is not None and style_id not in seen:
+            seen.add(style_id)
+            if is_paragraph:
+                names[style_id] = name
+        if is_paragraph and style.get(_W + "default") in ("1", "true", "on"):
+            default = name
+    return names, default
+
+
+def _paragraph_text(p) -> str:
+    """Wie python-docx Paragraph.text: direkte Runs und Runs in Hyperlinks"""
+    parts = []
+    for child in p.iterchildren(_W + "r", _W + "hyperlink"):
+        runs = child.iterchildren(_W + "r") if child.tag == _W + "hyperlink" else (child,)
+        for r in runs:
+            for e in r.iterchildren():
+                tag = e.tag
+                if tag not in _RUN_TEXT:
+                    continue
+                if tag == _W + "t":
+                    parts.append(e.text or "")
+                elif tag == _W + "br":
+                    parts.append("\n" if e.get(_W + "type", "textWrapping") == "textWrapping" else "")
+                elif tag == _W + "cr":
+                    parts.append("\n")
+                elif tag == _W + "noBreakHyphen":
+                    parts.append("-")
+                else:
+                    parts.append("\t")
+    return "".join(parts)
+
+
+def iter_paragraphs(file_stream) -> Iterator[tuple]:
+    """
+    (Style-Name, Text) aller Absätze direkt im Body – dieselben wie
+    python-docx ``doc.paragraphs``. Verarbeitete Elemente werden sofort
+    freigegeben, der Speicher wächst nicht mit der Dokumentgröße.
+    """
+    from lxml import etree
+
+    stream, spooled = _seekable(file_stream)
+    try:
+        try:
+            zf = zipfile.ZipFile(stream)
+            doc_path = next((path for rel_type, path in _rels(zf, "")
+                             if rel_type.endswith("/officeDocument")), None)
+            if doc_path is None:
+                raise ValueError("kein Hauptdokument gefunden")
+            content_type = _content_type(zf, doc_path)
+            if content_type != _WML_DOCUMENT_MAIN:
+                raise ValueError(f"kein Word-Dokument, Content-Type ist '{content_type}'")
+            styles_path = next((path for rel_type, path in _rels(zf, doc_path)
+                                if rel_type.endswith("/styles")), None)
+            if styles_path is not None:
+                styles_xml = zf.read(styles_path)
+            else:
+                # python-docx legt dann seine Standard-Styles an
+                import docx
+                with open(os.path.join(os.path.dirname(docx.__file__), "templates", "default-styles.xml"),
+                          "rb") as f:
+                    styles_xml = f.read()
+            style_names, default_name = load_style_map(styles_xml)
+            document = zf.open(doc_path)
+        except Exception as e:
+            raise ValueError(f"Konnte Word-Dokument nicht lesen: {str(e)}")
+
+        body = _W + "body"
+        try:
+            with document:
+                for _, el in etree.iterparse(document, events=("end",), tag=(_W + "p", _W + "tbl", _W + "sdt")):
+                    parent = el.getparent()
+                    if parent is None or parent.tag != body:
+                        continue  # Absätze in Tabellen usw. – werden mit dem Container freigegeben
+                    if el.tag == _W + "p":
+                        style_id = None
+                        ppr = el.find(_W + "pPr")
+                        if ppr is not None:
+                            pstyle = ppr.find(_W + "pStyle")
+                            if pstyle is not None:
+                                style_id = pstyle.get(_W + "val")
+                        name = style_names.get(style_id, default_name) if style_id else default_name
+                        # python-docx würde bei einem Style ohne Namen abbrechen; hier zählt er als normaler Absatz
+                        yield name or "", _paragraph_text(el)
+                    el.clear()
+                    while el.getprevious() is not None:
+                        del parent[0]
+        except (etree.LxmlError, zipfile.BadZipFile, zlib.error, EOFError) as e:
+            # Kaputtes XML oder ein abgeschnittenes Archiv fällt erst beim Lesen auf
+            raise ValueError(f"Konnte Word-Dokument nicht lesen: {str(e)}")
+    finally:
+        if spooled:
+            stream.close()
+
+
+def iter_word_events(file_stream, stats: Optional[Dict[str, int]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Kapitel- und Szenen-Ereignisse in einem Durchlauf, gleiche Erkennung wie
+    parse_word_document:
+        {"type": "chapter", "title", "order_index"}
+        {"type": "scene", "title", "content", "order_index"}  (gehört zum letzten Kapitel)
+    Ein Kapitel wird erst mit seiner ersten Szene gemeldet (leere Kapitel entfallen).
+    ``stats["paragraphs"]`` zählt die gelesenen Absätze mit.
+    """
+    if stats is not None:
+        stats.setdefault("paragraphs", 0)
+    chapter = None            # aktuelles Kapitel, noch nicht gemeldet solange ohne Szene
+    chapter_emitted = False
+    chapter_count = 0
+    scene_counter = 0
+    scene_content = []
+    any_scene = False
+    # Für die Rückfall-Fälle (keine Kapitel / nur leere Kapitel) – nur bis zur ersten Szene gehalten
+    all_texts = []
+
+    def finish_scene():
+        nonlocal scene_counter, scene_content, chapter_emitted, any_scene
+        events = []
+        if chapter is not None and scene_content:
+            content = '\n\n'.join(scene_content).strip()
+            if content:
+                first_line = scene_content[0].strip()
+                scene_title = f"Szene {scene_counter + 1}"
+                if first_line and len(first_line) <= 60:
+                    scene_title = first_line
+                elif first_line:
+                    scene_title = first_line[:57] + "..."
+                if not chapter_emitted:
+                    events.append(dict(chapter, type="chapter"))
+                    chapter_emitted = True
+                events.append({"type": "scene", "title": scene_title, "content": content,
+                               "order_index": scene_counter})
+                scene_counter += 1
+                any_scene = True
+        scene_content = []
+        return events
+
+    for style_name, raw in iter_paragraphs(file_stream):
+        if stats is not None:
+            stats["paragraphs"] += 1
+        text = raw.strip()
+        if not text:
+            continue
+        if any_scene:
+            all_texts.clear()
+        else:
+            all_texts.append(text)
+
+        is_chapter, chapter_title = chapter_heading(style_name, text)
+        if is_chapter:
+            yield from finish_scene()
+            chapter = {"title": chapter_title, "order_index": chapter_count}
+            chapter_count += 1
+            chapter_emitted = False
+            scene_counter = 0
+            continue
+
+        if SCENE_SEPARATOR_PATTERN.match(text):
+            yield from finish_scene()
+            continue
+
+        scene_content.append(text)
+
+    yield from finish_scene()
+
+    if not any_scene and all_texts:
+        # Keine Kapitel erkannt oder alle leer: alles als eine Szene
+        yield {"type": "chapter", "title": "Kapitel 1", "order_index": 0}
+        yield {"type": "scene", "title": "Szene 1", "content": '\n\n'.join(all_texts), "order_index": 0}
+
+
+def parse_word_document_streaming(file_stream) -> Dict[str, Any]:
+    """Wie parse_word_document, aber per iter_word_events (ein Durchlauf, wenig Speicher)"""
+    chapters = []
+    for event in iter_word_events(file_stream):
+        if event["type"] == "chapter":
+            chapters.append({"title": event["title"], "order_index": event["order_index"], "scenes": []})
+        else:
+            chapters[-1]["scenes"].append({"title": event["title"], "content": event["content"],
+                                           "order_index": event["order_index"]})
+    return {"chapters": chapters}
@@ -0,0 +1,189 @@
+# backend/write_buffer.py
+"""
+Optionaler Write-Behind-Puffer für Szenen-Inhalte.
+
+Beim Tippen speichert der Editor dieselbe Szene mehrmals innerhalb weniger
+Sekunden. Mit aktiviertem Puffer (``SCENE_WRITE_BEHIND_SECONDS`` > 0)
+werden diese Saves pro Szene im Prozess zusammengefasst und nur der
+letzte Stand geschrieben – ein UPDATE pro Fenster statt pro Keystroke-Pause.
+
+Geflusht wird:
+- wenn das Fenster abläuft (Hintergrund-Thread, Fenster startet mit dem
+  ersten ungeschriebenen Save)
+- bevor dieselbe Szene gelesen oder anders als über den Puffer
+  geschrieben wird (get_scene, list_scenes, Projekt-Reads, ...)
+- beim regulären Beenden des Prozesses (atexit, z.B. Gunicorn SIGTERM)
+
+Haltbarkeit – bitte beachten:
+- Der Client bekommt ein 200, bevor die Daten in der DB sind. Stirbt der
+  Worker hart (SIGKILL, OOM, Stromausfall), gehen höchstens die Saves des
+  laufenden Fensters verloren.
+- Der Puffer ist pro Prozess. Andere Gunicorn-Worker sehen gepufferte
+  Änderungen erst nach dem Flush, d.h. bis zu einem Fenster später.
+  Lesen über denselben Worker ist immer konsistent, auch während ein
+  Flush läuft (der Eintrag bleibt bis zum Commit sichtbar).
+- Geflusht wird per Compare-and-Swap gegen die Revision, auf der der erste
+  gepufferte Save aufsetzt (``base_revision``). Hat inzwischen ein anderer
+  Worker die Szene gespeichert, gewinnt dessen Stand: der Eintrag wird
+  verworfen (``conflicts``), der nächste PATCH des Clients bekommt ein 409.
+- Schlägt ein Flush fehl, bleibt der Eintrag erhalten und wird beim
+  nächsten Tick erneut versucht.
+Standardmäßig ist der Puffer aus (Write-Through wie bisher).
+"""
+import atexit
+import os
+import threading
+import time
+
+
+class _Entry:
+    __slots__ = ("scene_id", "chapter_id", "project_id", "row", "base_revision", "updates",
+                 "deadline", "saves")
+
+    def __init__(self, scene_id, chapter_id, project_id, row, base_revision, deadline):
+        self.scene_id = scene_id
+        self.chapter_id = chapter_id
+        self.project_id = project_id
+        self.row = row
+        self.base_revision = base_revision
+        self.updates = {}
+        self.deadline = deadline
+        self.saves = 0
+
+
+class SceneWriteBuffer:
+    """
+    Puffert Spalten-Updates pro Szene. ``writer(scene_id, updates, base_revision)``
+    schreibt die zusammengefassten Updates in die DB, sofern die Szene noch auf
+    ``base_revision`` steht, und gibt zurück, ob geschrieben wurde (wird von
+    app.py gestellt).
+    """
+
+    def __init__(self, writer, window=0.0):
+        self.writer = writer
+        self.window = float(window)
+        self._entries = {}
+        self._inflight = {}          # scene_id -> Eintrag, dessen Flush gerade läuft
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.staged = 0
+        self.flushed = 0
+        self.failures = 0
+        self.conflicts = 0
+
+    @property
+    def enabled(self):
+        return self.window > 0
+
+    def start(self):
+        """Startet den Flush-Thread und den atexit-Hook"""
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="scene-write-buffer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self):
+        self._stop.set()
+        self.flush_all()
+
+    def get(self, scene_id):
+        """Letzter (evtl. noch ungeschriebener) Stand der Szene oder None"""
+        with self._lock:
+            entry = self._entries.get(scene_id) or self._inflight.get(scene_id)
+            return dict(entry.row) if entry else None
+
+    def stage(self, scene_id, chapter_id, project_id, row, updates, base_revision):
+        """
+        Merkt den neuen Stand vor; ``row`` ist der komplette Stand nach dem
+        Update, ``base_revision`` die Revision davor (zählt nur beim ersten
+        Save eines Fensters).
+        """
+        with self._lock:
+            entry = self._entries.get(scene_id)
+            if entry is None:
+                entry = _Entry(scene_id, chapter_id, project_id, row, base_revision,
+                               time.monotonic() + self.window)
+                self._entries[scene_id] = entry
+            entry.row = dict(row)
+            entry.updates.update(updates)
+            entry.saves += 1
+            self.staged += 1
+
+    def discard(self, scene_id):
+        with self._lock:
+            self._entries.pop(scene_id, None)
+
+    def flush(self, scene_id=None, chapter_id=None, project_id=None):
+        """Schreibt alle passenden Einträge sofort (Read-your-writes)"""
+        def match(e):
+            return ((scene_id is not None and e.scene_id == scene_id)
+                    or (chapter_id is not None and e.chapter_id == chapter_id)
+                    or (project_id is not None and e.project_id == project_id))
+        self._flush_matching(match)
+
+    def flush_all(self):
+        self._flush_matching(lambda e: True)
+
+    def _flush_expired(self):
+        now = time.monotonic()
+        self._flush_matching(lambda e: e.deadline <= now)
+
+    def _flush_matching(self, predicate):
+        if not self._entries:
+            return
+        with self._flush_lock:
+            with self._lock:
+                batch = [e for e in self._entries.values() if predicate(e)]
+                for e in batch:
+                    del self._entries[e.scene_id]
+                    self._inflight[e.scene_id] = e
+            for e in batch:
+                try:
+                    if self.writer(e.scene_id, e.updates, e.base_revision):
+                        self.flushed += 1
+                    else:
+                        self.conflicts += 1
+                        print(f"[WriteBuffer] Szene {e.scene_id} wurde inzwischen anders gespeichert, "
+                              f"{e.saves} gepufferte Saves verworfen", flush=True)
+                except Exception as ex:
+                    self.failures += 1
+                    print(f"[WriteBuffer] Flush von Szene {e.scene_id} fehlgeschlagen: {ex}", flush=True)
+                    self._requeue(e)
+                finally:
+                    with self._lock:
+                        if self._inflight.get(e.scene_id) is e:
+                            del self._inflight[e.scene_id]
+
+    def _requeue(self, entry):
+        with self._lock:
+            newer = self._entries.get(entry.scene_id)
+            if newer is None:
+                entry.deadline = time.monotonic() + self.window
+                self._entries[entry.scene_id] = entry
+            else:
+                # Neuere Saves gewinnen, ältere Spalten ergänzen; geschrieben
+                # wird weiter gegen die Revision vor dem älteren Eintrag
+                merged = dict(entry.updates)
+                merged.update(newer.updates)
+                newer.updates = merged
+                newer.base_revision = entry.base_revision
+                newer.saves += entry.saves
+
+    def _run(self):
+        tick = min(max(self.window / 2, 0.05), 1.0)
+        while not self._stop.wait(tick):
+            self._flush_expired()
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._entries)
+        return {"enabled": self.enabled, "window": self.window, "pending": pending,
+                "staged": self.staged, "flushed": self.flushed, "failures": self.failures,
+                "conflicts": self.conflicts}
+
+
+def buffer_from_env(writer):
+    return SceneWriteBuffer(writer, window=float(os.getenv("SCENE_WRITE_BEHIND_SECONDS", "0")))
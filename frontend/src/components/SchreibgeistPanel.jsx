@@ -1,6 +1,7 @@
 import { useState, useRef, useEffect, useCallback } from 'react';
 import axios from 'axios';
 import ReactMarkdown from 'react-markdown';
+import { postSSE } from '../utils/sse';
 import '../styles/schreibgeist.css';
 
 const WELCOME = 'Hallo! Ich bin Schreibgeist. Wähle Charaktere, Orte oder die aktuelle Szene als Kontext und stell mir Fragen zu deinem Buch!';
@@ -157,6 +158,10 @@ export default function SchreibgeistPanel({ projectId, currentScene, onApplyToSc
   const [model,           setModel]           = useState('sonnet');
   const messagesEndRef = useRef(null);
   const textareaRef = useRef(null);
+  const abortRef = useRef(null);
+
+  // Laufende Antwort abbrechen, wenn das Panel geschlossen wird (Backend bricht den Upstream ab)
+  useEffect(() => () => abortRef.current?.abort(), []);
 
   useEffect(() => { messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' }); }, [messages, isTyping]);
 
@@ -193,24 +198,49 @@ export default function SchreibgeistPanel({ projectId, currentScene, onApplyToSc
         model,
       };
 
-      const r = await axios.post(`/api/projects/${projectId}/schreibgeist`, payload);
-      if (r.data?.error) {
-        setMessages(p => [...p, aiMsg(
-          r.data.error === 'api_key_missing'
-            ? 'ANTHROPIC_API_KEY fehlt in backend/.env.'
-            : `Fehler: ${r.data.error}`
-        )]);
+      // Antwort wird live aufgebaut: erste Tokens ersetzen den Tipp-Indikator
+      const reply = aiMsg('');
+      let streamed = '';
+      let shown = false;
+      let final = null;
+      let streamError = null;
+      const show = (patch) => {
+        if (!shown) {
+          shown = true;
+          setIsTyping(false);
+          setMessages(p => [...p, { ...reply, ...patch }]);
+        } else {
+          setMessages(p => p.map(m => (m.id === reply.id ? { ...m, ...patch } : m)));
+        }
+      };
+
+      abortRef.current = new AbortController();
+      await postSSE(`/api/projects/${projectId}/schreibgeist/stream`, payload, (event, data) => {
+        if (event === 'text') {
+          streamed += data.text;
+          show({ text: streamed });
+        } else if (event === 'done') {
+          final = data;
+        } else if (event === 'error') {
+          streamError = data.error;
+        }
+      }, { signal: abortRef.current.signal });
+
+      if (final) {
+        show({ text: final.message || '(Keine Antwort)', sceneContent: final.scene_content || null });
       } else {
-        const sceneContent = r.data?.scene_content || null;
-        setMessages(p => [...p, { ...aiMsg(r.data.message || '(Keine Antwort)'), sceneContent }]);
+        show({ text: streamed ? `${streamed}\n\nFehler: ${streamError || 'Antwort unvollständig'}`
+                             : `Fehler: ${streamError || 'Keine Antwort'}` });
       }
     } catch (e) {
+      if (e.name === 'AbortError' || e.status === 401) return;  // 401: Weiterleitung zum Login läuft
       setMessages(p => [...p, aiMsg(
-        e.response?.data?.error === 'api_key_missing'
+        e.data?.error === 'api_key_missing'
           ? 'ANTHROPIC_API_KEY fehlt in backend/.env.'
           : 'Schreibgeist ist gerade nicht erreichbar. Bitte versuche es erneut.'
       )]);
     } finally {
+      abortRef.current = null;
       setIsTyping(false);
     }
   };
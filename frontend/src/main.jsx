@@ -34,14 +34,11 @@ import './styles/NotFound.css';
 import axios from 'axios'
 import './i18n' // Initialize i18n
 
-// API Base URL Configuration
-const API_BASE = (import.meta.env.VITE_API_BASE_URL || '').replace(/\/+$/, '')
-function joinUrl(base, path){ if(!base) return path; const p=('/'+String(path||'')).replace(/\/{2,}/g,'/'); return base+p }
+import { apiUrl, handleUnauthorized } from './utils/api'
+
+// API Base URL Configuration (VITE_API_BASE_URL)
 axios.interceptors.request.use(cfg=>{
-  const url = cfg.url || ''
-  if(/^https?:\/\//i.test(url)) return cfg
-  const startsWithApi = url.startsWith('/api') || url.startsWith('api')
-  if(API_BASE && startsWithApi){ cfg.url = joinUrl(API_BASE, url.replace(/^\/?api/, '/api')) }
+  cfg.url = apiUrl(cfg.url)
   return cfg
 })
 
@@ -51,16 +48,7 @@ axios.interceptors.response.use(
   error => {
     if (error.response?.status === 401) {
       // Token expired or invalid - clear auth and redirect to login
-      localStorage.removeItem('token')
-      localStorage.removeItem('user')
-      delete axios.defaults.headers.common['Authorization']
-
-      // Only redirect if not already on login/auth pages
-      const currentPath = window.location.pathname
-      const authPages = ['/login', '/forgot-password', '/reset-password', '/confirm-email', '/']
-      if (!authPages.includes(currentPath)) {
-        window.location.href = '/login?session=expired'
-      }
+      handleUnauthorized()
     }
     return Promise.reject(error)
   }
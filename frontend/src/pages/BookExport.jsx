@@ -3,7 +3,7 @@ import { useParams } from "react-router-dom";
 import axios from "axios";
 import { useTranslation } from "react-i18next";
 import { parseEpigrams } from "../utils/epigramParser";
-import { escapeHtml, smartQuotes, paragraphsHTML } from "../utils/exportUtils";
+import { escapeHtml, smartQuotes, paragraphsHTML, parseManuscript } from "../utils/exportUtils";
 import "../styles/bookexport.css";
 
 const escReg = (s) => s.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
@@ -35,6 +35,8 @@ export default function BookExport() {
   const [chapters, setChapters] = useState([]);
   const [loading, setLoading] = useState(true);
   const [previewZoom, setPreviewZoom] = useState(1);
+  // PDF-Export-Job: null oder { done, total }
+  const [pdfProgress, setPdfProgress] = useState(null);
 
   // Update zoom in iframe document
   useEffect(() => {
@@ -66,27 +68,13 @@ export default function BookExport() {
   useEffect(() => {
     async function loadBookData() {
       try {
-        const projectRes = await axios.get(`/api/projects/${pid}`);
-        const proj = projectRes.data;
+        // Ganzes Manuskript in einem Request (NDJSON-Stream)
+        const res = await axios.get(`/api/projects/${pid}/manuscript`, {
+          responseType: "text",
+          transformResponse: (data) => data,
+        });
+        const { project: proj, chapters: chaptersWithScenes } = parseManuscript(res.data || "");
         setProject(proj);
-
-        const chaptersRes = await axios.get(`/api/projects/${pid}/chapters`);
-        const chaps = chaptersRes.data || [];
-
-        const chaptersWithScenes = await Promise.all(
-          chaps.map(async (ch) => {
-            const scenesRes = await axios.get(`/api/chapters/${ch.id}/scenes`);
-            const scenes = scenesRes.data || [];
-            const scenesWithContent = await Promise.all(
-              scenes.map(async (sc) => {
-                const sceneRes = await axios.get(`/api/scenes/${sc.id}`);
-                return sceneRes.data;
-              })
-            );
-            return { ...ch, scenes: scenesWithContent };
-          })
-        );
-
         setChapters(chaptersWithScenes);
         setLoading(false);
       } catch (e) {
@@ -348,18 +336,31 @@ export default function BookExport() {
           .replace(/[^a-z0-9]+/gi, "_")
           .replace(/^_+|_+$/g, "") || "book";
 
-      // Send HTML to backend for PDF generation
-      const response = await axios.post(
-        `/api/projects/${pid}/export-pdf`,
-        { html: srcDoc },
+      // Backend liest das Buch selbst aus der DB (gleiches Layout wie die Vorschau)
+      // und setzt es als Hintergrund-Job; unveränderte Kapitel kommen aus dem Cache
+      setPdfProgress({ done: 0, total: 0 });
+      const { data: started } = await axios.post(
+        `/api/projects/${pid}/export-pdf?async=1`,
         {
-          responseType: 'blob',
-          headers: {
-            'Content-Type': 'application/json'
-          }
+          locale,
+          chapter_label: t("export.chapter", "Chapter"),
+          subtitle: t("export.subtitle", "Novel"),
         }
       );
 
+      let job;
+      for (;;) {
+        await new Promise((resolve) => setTimeout(resolve, 500));
+        ({ data: job } = await axios.get(`/api/jobs/${started.job_id}`));
+        if (job.progress) {
+          setPdfProgress({ done: job.progress.chapters_done, total: job.progress.chapters_total });
+        }
+        if (job.status !== "queued" && job.status !== "running") break;
+      }
+      if (job.status !== "succeeded") throw new Error(`PDF job ${job.status}`);
+
+      const response = await axios.get(`/api/jobs/${started.job_id}/file`, { responseType: 'blob' });
+
       // Create download link
       const blob = new Blob([response.data], { type: 'application/pdf' });
       const url = URL.createObjectURL(blob);
@@ -371,6 +372,8 @@ export default function BookExport() {
     } catch (error) {
       console.error('Error generating PDF:', error);
       alert(t("export.pdfError", "Error generating PDF. Please try again."));
+    } finally {
+      setPdfProgress(null);
     }
   };
 
@@ -485,8 +488,10 @@ export default function BookExport() {
         </div>
 
         <div className="export-actions">
-          <button className="btn primary" onClick={savePDF} style={{ width: "100%" }}>
-            💾 {t("export.savePdf", "Save as PDF")}
+          <button className="btn primary" onClick={savePDF} disabled={!!pdfProgress} style={{ width: "100%" }}>
+            💾 {pdfProgress
+              ? t("export.pdfProgress", "Creating PDF… {{done}}/{{total}}", pdfProgress)
+              : t("export.savePdf", "Save as PDF")}
           </button>
           <button className="btn" onClick={handleExportHTML} style={{ width: "100%" }}>
             📥 {t("export.downloadHtml", "Download HTML")}
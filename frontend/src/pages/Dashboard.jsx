@@ -21,6 +21,7 @@ export default function Dashboard(){
   const [showCreateModal, setShowCreateModal] = useState(false);
   const [openMenuId, setOpenMenuId] = useState(null);
   const menuRef = useRef(null);
+  const followedImports = useRef(new Set());
 
   async function load(){
     try {
@@ -35,6 +36,14 @@ export default function Dashboard(){
   }
   useEffect(()=>{ load(); }, []);
 
+  // Importe, deren Job diese Seite nicht verfolgt (z.B. nach Reload): Liste neu laden, bis sie fertig sind
+  useEffect(() => {
+    const pending = projects.some(p => p.import_status === 'importing' && !followedImports.current.has(p.id));
+    if (!pending) return;
+    const timer = setTimeout(load, 3000);
+    return () => clearTimeout(timer);
+  }, [projects]);
+
   // Menü schließen bei Klick außerhalb
   useEffect(() => {
     function handleClickOutside(event) {
@@ -73,7 +82,8 @@ export default function Dashboard(){
         formData.append('title', title);
         formData.append('file', file);
 
-        response = await axios.post('/api/projects', formData, {
+        // Import läuft als Hintergrund-Job: Projekt erscheint sofort im Zustand "importing"
+        response = await axios.post('/api/projects?async=1', formData, {
           headers: { 'Content-Type': 'multipart/form-data' }
         });
       } else {
@@ -81,8 +91,11 @@ export default function Dashboard(){
         response = await axios.post('/api/projects', { title });
       }
 
-      setProjects([response.data, ...projects]);
+      setProjects(prev => [response.data, ...prev]);
       setShowCreateModal(false);
+      if (response.data.job_id) {
+        followImport(response.data.id, response.data.job_id);
+      }
     } catch (err) {
       console.error('Create project failed', err);
       const errorMsg = err.response?.data?.error || t('dashboard.createFailed');
@@ -91,6 +104,30 @@ export default function Dashboard(){
     }
   }
 
+  async function followImport(projectId, jobId) {
+    followedImports.current.add(projectId);
+    const update = (patch) => setProjects(prev => prev.map(x => x.id === projectId ? { ...x, ...patch } : x));
+    let job;
+    try {
+      for (;;) {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        ({ data: job } = await axios.get(`/api/jobs/${jobId}`));
+        if (job.progress) update({ import_progress: job.progress });
+        if (job.status !== 'queued' && job.status !== 'running') break;
+      }
+    } catch (err) {
+      console.error('Import job polling failed', err);
+      return;
+    }
+    if (job.status === 'succeeded') {
+      update({ import_status: null, import_progress: null });
+    } else {
+      // Fehlgeschlagener/abgebrochener Import: Backend hat das Projekt wieder entfernt
+      setProjects(prev => prev.filter(x => x.id !== projectId));
+      alert(job.result?.error || t('dashboard.importFailed'));
+    }
+  }
+
   async function renameProject(p){
     setOpenMenuId(null);
     setPromptModal({
@@ -152,8 +189,8 @@ export default function Dashboard(){
                 key={p.id}
                 className="project-card"
                 data-testid={`project-card-${p.id}`}
-                onClick={() => navigate(`/app/project/${p.id}`)}
-                style={{ cursor: 'pointer' }}
+                onClick={() => p.import_status !== 'importing' && navigate(`/app/project/${p.id}`)}
+                style={{ cursor: p.import_status === 'importing' ? 'progress' : 'pointer' }}
               >
                 {/* Cover links (2:3) */}
                 <div className="project-cover" data-testid={`project-cover-${p.id}`}>
@@ -217,9 +254,18 @@ export default function Dashboard(){
                       )}
                     </div>
                   </div>
-                  <p className={`project-description ${!p.description ? 'placeholder' : ''}`}>
-                    {p.description || t('dashboard.noDescription')}
-                  </p>
+                  {p.import_status === 'importing' ? (
+                    <p className="project-description placeholder" data-testid={`project-importing-${p.id}`}>
+                      {t('dashboard.importProgress', {
+                        paragraphs: p.import_progress?.paragraphs ?? 0,
+                        scenes: p.import_progress?.scenes ?? 0,
+                      })}
+                    </p>
+                  ) : (
+                    <p className={`project-description ${!p.description ? 'placeholder' : ''}`}>
+                      {p.description || t('dashboard.noDescription')}
+                    </p>
+                  )}
                 </div>
               </article>
             ))}
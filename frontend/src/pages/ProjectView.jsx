@@ -11,6 +11,7 @@ import SchreibgeistPanel from '../components/SchreibgeistPanel';
 import SceneManifestPanel from '../components/SceneManifestPanel';
 import SceneStatusDropdown, { STATUS_OPTIONS } from '../components/SceneStatusDropdown';
 import EpigramHighlight from '../components/EpigramHighlight';
+import { diffOps } from '../utils/sceneDelta';
 import { useTranslation } from 'react-i18next';
 import '../styles/epigram.css';
 
@@ -69,7 +70,7 @@ export default function ProjectView() {
 
   // Autosave & Snapshot (Szene)
   const saveTimer = useRef(null);
-  const snapshotRef = useRef({ id: null, title: '', content: '', status: 'Idea' });
+  const snapshotRef = useRef({ id: null, title: '', content: '', status: 'Idea', revision: null });
   const textareaRef = useRef(null);
 
   // Debounce (Kapitel)
@@ -87,7 +88,7 @@ export default function ProjectView() {
     setSceneTitle('');
     setSceneContent('');
     setSceneStatus('Idea');
-    snapshotRef.current = { id: null, title: '', content: '', status: 'Idea' };
+    snapshotRef.current = { id: null, title: '', content: '', status: 'Idea', revision: null };
   }
 
   // exakt ein Kapitel expandieren
@@ -170,17 +171,76 @@ export default function ProjectView() {
   async function saveSceneNow(id, title, content, status) {
     if (!id) return;
     try {
-      await axios.put(`/api/scenes/${id}`, { title, content, status });
-      snapshotRef.current = { id, title, content, status };
+      const revision = await saveSceneDelta(id, title, content, status);
+      snapshotRef.current = { id, title, content, status, revision };
       setLastSavedAt(new Date());
       if (activeChapterId) patchSceneInTree(activeChapterId, id, { title, status });
       const txt = (content || '').replace(/\s+/g, ' ').trim();
       setScenePreviewById(prev => ({ ...prev, [id]: txt }));
     } catch (err) {
-      console.warn('Save failed', err);
+      if (err?.response?.status === 409) await resolveSceneConflict(id, title, content, status);
+      else console.warn('Save failed', err);
     }
   }
 
+  // Delta-Autosave: nur die Änderung gegen die letzte Revision senden.
+  // 409 (inzwischen anderswo gespeichert) geht an resolveSceneConflict;
+  // den vollständigen PUT gibt es nur, wenn der Server die Ops ablehnt (400)
+  async function saveSceneDelta(id, title, content, status) {
+    const snap = snapshotRef.current;
+    if (snap.id === id && snap.revision) {
+      try {
+        let revision = snap.revision;
+        if (content !== snap.content) {
+          const r = await axios.patch(`/api/scenes/${id}/content`, {
+            base_revision: snap.revision,
+            ops: diffOps(snap.content, content)
+          });
+          revision = r.data?.revision;
+        }
+        if (title !== snap.title || status !== snap.status) {
+          await axios.put(`/api/scenes/${id}`, { title, status });
+        }
+        if (revision) return revision;
+      } catch (err) {
+        if (err?.response?.status !== 400) throw err;
+        console.warn('Delta save rejected, falling back to full save', err);
+      }
+    }
+    const r = await axios.put(`/api/scenes/${id}`, { title, content, status });
+    return r.data?.revision || null;
+  }
+
+  // Die Szene wurde inzwischen anderswo gespeichert (anderer Tab, anderes
+  // Gerät): Serverstand laden und fragen, welche Fassung gilt
+  async function resolveSceneConflict(id, title, content, status) {
+    let server;
+    try {
+      server = (await axios.get(`/api/scenes/${id}`)).data || {};
+    } catch (err) {
+      console.warn('Conflict reload failed', err);
+      return;
+    }
+    const stored = {
+      id, title: server.title || '', content: server.content || '',
+      status: server.status || 'Idea', revision: server.revision || null
+    };
+    snapshotRef.current = stored;
+    if (window.confirm(t('writing.errors.sceneConflict'))) {
+      // Eigene Fassung behalten: als Delta gegen den neuen Serverstand speichern
+      await saveSceneNow(id, title, content, status);
+      return;
+    }
+    if (activeSceneId === id) {
+      setSceneTitle(stored.title);
+      setSceneContent(stored.content);
+      setSceneStatus(stored.status);
+    }
+    if (activeChapterId) patchSceneInTree(activeChapterId, id, { title: stored.title, status: stored.status });
+    const txt = stored.content.replace(/\s+/g, ' ').trim();
+    setScenePreviewById(prev => ({ ...prev, [id]: txt }));
+  }
+
   async function flushIfDirty() {
     const snap = snapshotRef.current;
     if (activeSceneId && (sceneTitle !== snap.title || sceneContent !== snap.content || sceneStatus !== snap.status)) {
@@ -251,15 +311,12 @@ export default function ProjectView() {
     const missing = list.filter(s => scenePreviewById[s.id] === undefined);
     if (!missing.length) return;
     try {
-      const results = await Promise.all(
-        missing.map(s => axios.get(`/api/scenes/${s.id}`))
-      );
+      // Gespeicherte Vorschauen aller Szenen des Kapitels in einem Request
+      const r = await axios.get(`/api/chapters/${chapterId}/scene-previews`);
       setScenePreviewById(prev => {
         const next = { ...prev };
-        results.forEach((r, i) => {
-          const sc = r.data || {};
-          const txt = (sc.content || '').replace(/\s+/g, ' ').trim();
-          next[missing[i].id] = txt;
+        (r.data || []).forEach(sc => {
+          if (next[sc.id] === undefined) next[sc.id] = sc.preview || '';
         });
         return next;
       });
@@ -298,7 +355,7 @@ export default function ProjectView() {
       setSceneContent(s.content || '');
       setSceneStatus(s.status || 'Idea');
       setSceneManifest(s.context_manifest || { character_ids: [], location_ids: [] });
-      snapshotRef.current = { id: s.id, title: s.title || '', content: s.content || '', status: s.status || 'Idea' };
+      snapshotRef.current = { id: s.id, title: s.title || '', content: s.content || '', status: s.status || 'Idea', revision: s.revision || null };
       patchSceneInTree(chapterId, s.id, { title: s.title || '', status: s.status || 'Idea' });
       const txt = (s.content || '').replace(/\s+/g, ' ').trim();
       setScenePreviewById(prev => ({ ...prev, [s.id]: txt }));
@@ -0,0 +1,37 @@
+import axios from 'axios';
+
+// API Base URL Configuration
+const API_BASE = (import.meta.env.VITE_API_BASE_URL || '').replace(/\/+$/, '');
+
+function joinUrl(base, path) {
+  if (!base) return path;
+  const p = ('/' + String(path || '')).replace(/\/{2,}/g, '/');
+  return base + p;
+}
+
+/**
+ * Setzt VITE_API_BASE_URL vor relative /api-Pfade – für axios (Interceptor
+ * in main.jsx) und fetch (postSSE). Absolute URLs bleiben unverändert.
+ */
+export function apiUrl(url) {
+  if (!url || /^https?:\/\//i.test(url)) return url;
+  const startsWithApi = url.startsWith('/api') || url.startsWith('api');
+  if (API_BASE && startsWithApi) return joinUrl(API_BASE, url.replace(/^\/?api/, '/api'));
+  return url;
+}
+
+/**
+ * Token abgelaufen oder ungültig: Anmeldung verwerfen und zum Login leiten.
+ */
+export function handleUnauthorized() {
+  localStorage.removeItem('token');
+  localStorage.removeItem('user');
+  delete axios.defaults.headers.common['Authorization'];
+
+  // Only redirect if not already on login/auth pages
+  const currentPath = window.location.pathname;
+  const authPages = ['/login', '/forgot-password', '/reset-password', '/confirm-email', '/'];
+  if (!authPages.includes(currentPath)) {
+    window.location.href = '/login?session=expired';
+  }
+}
@@ -26,3 +26,25 @@ export function paragraphsHTML(text, firstIsDropcap = false, locale = "en") {
     })
     .join("\n");
 }
+
+// Parse the NDJSON stream of GET /api/projects/:id/manuscript into
+// { project, chapters: [{ ...chapter, scenes: [...] }] } (book order is kept).
+export function parseManuscript(ndjson = "") {
+  let project = null;
+  const chapters = [];
+  const byId = new Map();
+  for (const line of ndjson.split("\n")) {
+    if (!line.trim()) continue;
+    const { type, ...item } = JSON.parse(line);
+    if (type === "project") {
+      project = item;
+    } else if (type === "chapter") {
+      const ch = { ...item, scenes: [] };
+      byId.set(ch.id, ch);
+      chapters.push(ch);
+    } else if (type === "scene") {
+      byId.get(item.chapter_id)?.scenes.push(item);
+    }
+  }
+  return { project, chapters };
+}
@@ -1,5 +1,5 @@
 ﻿import { describe, it, expect } from "vitest";
-import { paragraphsHTML, escapeHtml, smartQuotes } from "./exportUtils";
+import { paragraphsHTML, escapeHtml, smartQuotes, parseManuscript } from "./exportUtils";
 
 describe("paragraphsHTML - paragraph splitting", () => {
   it("EC-02: single newline creates two paragraphs", () => {
@@ -78,4 +78,22 @@ describe("smartQuotes", () => {
   it("quote directly after a word character becomes closing quote", () => {
     expect(smartQuotes('word"', "en")).toBe("word”");
   });
-});
\ No newline at end of file
+});
+
+describe("parseManuscript - NDJSON manuscript stream", () => {
+  it("groups scenes under their chapters in stream order", () => {
+    const ndjson = [
+      '{"type":"project","id":1,"title":"Buch"}',
+      '{"type":"chapter","id":2,"title":"Eins","order_index":0}',
+      '{"type":"scene","id":5,"chapter_id":2,"title":"A","content":"x"}',
+      '{"type":"chapter","id":1,"title":"Zwei","order_index":1}',
+      '{"type":"end","chapters":2,"scenes":1}',
+      "",
+    ].join("\n");
+    const { project, chapters } = parseManuscript(ndjson);
+    expect(project.title).toBe("Buch");
+    expect(chapters.map((c) => c.title)).toEqual(["Eins", "Zwei"]);
+    expect(chapters[0].scenes.map((s) => s.id)).toEqual([5]);
+    expect(chapters[1].scenes).toEqual([]);
+  });
+});
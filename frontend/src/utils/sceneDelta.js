@@ -0,0 +1,48 @@
+/**
+ * Scene Delta Utility
+ * Builds text operations for the delta autosave endpoint
+ * (PATCH /api/scenes/:id/content)
+ */
+
+/**
+ * Compute a single splice operation that turns `oldText` into `newText`.
+ * Offsets are UTF-16 code units (JS string indices), matching the backend.
+ * @param {string} oldText - Last saved text
+ * @param {string} newText - Current editor text
+ * @returns {Array} Array with zero or one op: { at, del, ins }
+ */
+export function diffOps(oldText, newText) {
+  const a = oldText || '';
+  const b = newText || '';
+  if (a === b) return [];
+
+  const max = Math.min(a.length, b.length);
+  let start = 0;
+  while (start < max && a.charCodeAt(start) === b.charCodeAt(start)) start++;
+
+  let endA = a.length;
+  let endB = b.length;
+  while (endA > start && endB > start && a.charCodeAt(endA - 1) === b.charCodeAt(endB - 1)) {
+    endA--;
+    endB--;
+  }
+
+  // Never split a surrogate pair (emoji etc.)
+  if (start > 0 && isHighSurrogate(a.charCodeAt(start - 1))) start--;
+  if (endA < a.length && isLowSurrogate(a.charCodeAt(endA))) {
+    endA++;
+    endB++;
+  }
+  if (endA < start) endA = start;
+  if (endB < start) endB = start;
+
+  return [{ at: start, del: endA - start, ins: b.slice(start, endB) }];
+}
+
+function isHighSurrogate(code) {
+  return code >= 0xd800 && code <= 0xdbff;
+}
+
+function isLowSurrogate(code) {
+  return code >= 0xdc00 && code <= 0xdfff;
+}
@@ -0,0 +1,35 @@
+import { describe, it, expect } from "vitest";
+import { diffOps } from "./sceneDelta";
+
+function apply(text, ops) {
+  return ops.reduce((t, op) => t.slice(0, op.at) + op.ins + t.slice(op.at + op.del), text);
+}
+
+describe("diffOps", () => {
+  it("returns no ops for identical text", () => {
+    expect(diffOps("alpha", "alpha")).toEqual([]);
+  });
+
+  it("builds an insert in the middle", () => {
+    expect(diffOps("alpha beta", "alpha gamma beta")).toEqual([{ at: 6, del: 0, ins: "gamma " }]);
+  });
+
+  it("builds a delete at the end", () => {
+    expect(diffOps("alpha beta", "alpha")).toEqual([{ at: 5, del: 5, ins: "" }]);
+  });
+
+  it("handles empty old / new text", () => {
+    expect(apply("", diffOps("", "neu"))).toBe("neu");
+    expect(apply("alt", diffOps("alt", ""))).toBe("");
+  });
+
+  it("handles repeated characters", () => {
+    expect(apply("aaaa", diffOps("aaaa", "aaaaaa"))).toBe("aaaaaa");
+  });
+
+  it("does not split surrogate pairs", () => {
+    const ops = diffOps("a😀b", "a😃b");
+    expect(ops).toEqual([{ at: 1, del: 2, ins: "😃" }]);
+    expect(apply("a😀b", ops)).toBe("a😃b");
+  });
+});
@@ -0,0 +1,66 @@
+import axios from 'axios';
+import { apiUrl, handleUnauthorized } from './api';
+
+/**
+ * Inkrementeller Parser für Server-Sent Events.
+ * push(text) kann beliebig zerstückelte Chunks bekommen; vollständige
+ * Events werden als onEvent(name, data) gemeldet (data = JSON, sonst String).
+ */
+export function createSSEParser(onEvent) {
+  let buffer = '';
+  return function push(text) {
+    buffer += text.replace(/\r\n/g, '\n');
+    let idx;
+    while ((idx = buffer.indexOf('\n\n')) >= 0) {
+      const block = buffer.slice(0, idx);
+      buffer = buffer.slice(idx + 2);
+      let name = 'message';
+      const dataLines = [];
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) name = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).replace(/^ /, ''));
+      }
+      if (!dataLines.length) continue;
+      const raw = dataLines.join('\n');
+      let data = raw;
+      try { data = JSON.parse(raw); } catch { /* kein JSON */ }
+      onEvent(name, data);
+    }
+  };
+}
+
+/**
+ * POST mit SSE-Antwort (EventSource kann kein POST). Nutzt Auth-Header und
+ * API-Basis-URL wie axios; 401 meldet ab wie der axios-Interceptor.
+ * Abbrechen über signal (AbortController) schließt die Verbindung.
+ * Nicht-2xx-Antworten werfen einen Error mit .status und .data.
+ */
+export async function postSSE(url, body, onEvent, { signal } = {}) {
+  const auth = axios.defaults.headers.common['Authorization'];
+  const res = await fetch(apiUrl(url), {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+      ...(auth ? { Authorization: auth } : {}),
+    },
+    body: JSON.stringify(body),
+    signal,
+  });
+  if (!res.ok) {
+    if (res.status === 401) handleUnauthorized();
+    const err = new Error(`HTTP ${res.status}`);
+    err.status = res.status;
+    try { err.data = await res.json(); } catch { err.data = null; }
+    throw err;
+  }
+  const push = createSSEParser(onEvent);
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    push(decoder.decode(value, { stream: true }));
+  }
+  push(decoder.decode());
+}
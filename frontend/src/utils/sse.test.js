@@ -0,0 +1,47 @@
+import { describe, it, expect, vi, afterEach } from "vitest";
+import { createSSEParser, postSSE } from "./sse";
+
+function collect() {
+  const events = [];
+  const push = createSSEParser((name, data) => events.push([name, data]));
+  return { events, push };
+}
+
+describe("createSSEParser", () => {
+  it("parses named JSON events", () => {
+    const { events, push } = collect();
+    push('event: text\ndata: {"text": "Hallo"}\n\nevent: done\ndata: {"message": "Hallo"}\n\n');
+    expect(events).toEqual([["text", { text: "Hallo" }], ["done", { message: "Hallo" }]]);
+  });
+
+  it("handles events split across chunks", () => {
+    const { events, push } = collect();
+    push("event: te");
+    push('xt\ndata: {"te');
+    expect(events).toEqual([]);
+    push('xt": "a"}\n');
+    push("\n");
+    expect(events).toEqual([["text", { text: "a" }]]);
+  });
+
+  it("defaults to message and keeps non-JSON data as string", () => {
+    const { events, push } = collect();
+    push("data: plain\r\n\r\n");
+    expect(events).toEqual([["message", "plain"]]);
+  });
+});
+
+describe("postSSE", () => {
+  afterEach(() => vi.unstubAllGlobals());
+
+  it("logs out on 401 like the axios interceptor", async () => {
+    const storage = { token: "t", user: "{}" };
+    vi.stubGlobal("localStorage", { removeItem: (k) => delete storage[k] });
+    vi.stubGlobal("window", { location: { pathname: "/app/projects/1", href: "" } });
+    vi.stubGlobal("fetch", vi.fn(async () => ({ ok: false, status: 401, json: async () => ({ error: "unauthorized" }) })));
+
+    await expect(postSSE("/api/x", {}, () => {})).rejects.toMatchObject({ status: 401 });
+    expect(storage).toEqual({});
+    expect(window.location.href).toBe("/login?session=expired");
+  });
+});